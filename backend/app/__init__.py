@@ -24,20 +24,59 @@ def create_app() -> Flask:
         }
     })
 
+    # OTIMIZAÇÃO: PRAGMAs do SQLite (WAL, busy_timeout...) ou pool do banco servidor
+    from . import database
+    database.init_app(app)
     db.init_app(app)
+    # OTIMIZAÇÃO: Latência por rota, PokéAPI, banco e cache em /api/metrics (Prometheus)
+    from .metrics import metrics
+    with app.app_context():
+        database.register_pragmas(app, db.engine)
+        metrics.init_app(app, db.engine)
     jwt.init_app(app)
 
+    from .cache import cache
+    from .cache_store import disk_cache
+    from .singleflight import flights
+    from .refresh import refresher
+    from .upstream import upstream
+    from .user_cache import user_cache
+    upstream.init_app(app)
+    cache.init_app(app)
+    disk_cache.init_app(app)
+    flights.init_app(app)
+    refresher.init_app(app)
+    user_cache.init_app(app)
+
     # Blueprints
     from .routes import api_bp
     from .pokeapi import poke_bp
     from .auth import auth_bp
+    # OTIMIZAÇÃO: Sprites pela mesma origem, com cache em disco e headers imutáveis
+    from .sprites import sprite_store, sprites_bp
+    sprite_store.init_app(app)
 
     app.register_blueprint(api_bp, url_prefix="/api")
     app.register_blueprint(poke_bp, url_prefix="/api")
     app.register_blueprint(auth_bp, url_prefix="/api/auth")
+    app.register_blueprint(sprites_bp, url_prefix="/api")
 
-    with app.app_context():
-        db.create_all()
+    from .catalog import sync_catalog_command
+    from .importer import import_reference_command
+    from .migrations import db_upgrade_command, ensure_current
+    app.cli.add_command(sync_catalog_command)
+    app.cli.add_command(db_upgrade_command)
+    app.cli.add_command(import_reference_command)
+
+    # OTIMIZAÇÃO: Em produção as migrações rodam uma vez antes do fork (start.sh) e os
+    # workers sobem sem DDL; com DB_AUTO_MIGRATE=1 (desenvolvimento), uma consulta confere pendências
+    if app.config.get("DB_AUTO_MIGRATE"):
+        with app.app_context():
+            ensure_current()
+
+    # OTIMIZAÇÃO: Snapshot do cache e aquecimento opcional (CACHE_WARM), ver warmup.py
+    from .warmup import warmer
+    warmer.init_app(app)
 
     return app
 
@@ -1,13 +1,66 @@
+import base64
+import time
+from datetime import datetime
+from functools import wraps
+from typing import Optional, Tuple
+
 from flask import Blueprint, request, jsonify
 from werkzeug.security import generate_password_hash, check_password_hash
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_access_token, jwt_required, get_jwt, get_jwt_identity
+from sqlalchemy import and_, or_, text
 
-from . import db
-from .models import Usuario, TipoPokemon
-import requests
+from . import db, importer, jwt
+from .models import Usuario
+from .user_cache import user_cache, user_snapshot
 
 auth_bp = Blueprint("auth", __name__)
 
+# Claims de perfil gravadas no token: as rotas autorizam sem consultar o banco
+PROFILE_CLAIMS = ("nome", "email", "login", "isAdmin")
+
+
+def _issue_token(snapshot: dict) -> str:
+    claims = {key: snapshot[key] for key in PROFILE_CLAIMS}
+    claims["tokenVersao"] = snapshot["tokenVersao"]
+    return create_access_token(identity=str(snapshot["id"]), additional_claims=claims)
+
+
+def _user_response(snapshot: dict) -> dict:
+    return {"id": snapshot["id"], **{key: snapshot[key] for key in PROFILE_CLAIMS}}
+
+
+@jwt.token_in_blocklist_loader
+def _token_revoked(jwt_header: dict, jwt_payload: dict) -> bool:
+    """Revogado se o usuário não existe mais ou se a TokenVersao mudou depois da emissão"""
+    user = user_cache.get(int(jwt_payload["sub"]))
+    return user is None or jwt_payload.get("tokenVersao", 0) != user["tokenVersao"]
+
+
+@jwt.revoked_token_loader
+def _revoked_response(jwt_header: dict, jwt_payload: dict):
+    return jsonify({"msg": "Sessão expirada. Faça login novamente."}), 401
+
+
+def _current_profile() -> dict:
+    """Perfil do usuário logado a partir das claims (tokens antigos, sem elas, vão ao cache)"""
+    claims = get_jwt()
+    if all(key in claims for key in PROFILE_CLAIMS):
+        return {"id": int(claims["sub"]), **{key: claims[key] for key in PROFILE_CLAIMS}}
+    return _user_response(user_cache.get(int(claims["sub"])))
+
+
+def admin_required(msg: str = "Acesso negado. Apenas administradores podem acessar esta área."):
+    """Como @jwt_required(), exigindo a claim isAdmin"""
+    def decorator(fn):
+        @wraps(fn)
+        @jwt_required()
+        def wrapper(*args, **kwargs):
+            if not _current_profile()["isAdmin"]:
+                return jsonify({"msg": msg}), 403
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
 
 @auth_bp.post("/register")
 def register():
@@ -34,17 +87,12 @@ def register():
     )
     db.session.add(user)
     db.session.commit()
-    token = create_access_token(identity=str(user.IDUsuario))
+    snapshot = user_snapshot(user)
+    user_cache.put(user.IDUsuario, snapshot)
     return jsonify({
         "msg": "Usuário criado",
-        "access_token": token,
-        "user": {
-            "id": user.IDUsuario,
-            "nome": user.Nome,
-            "email": user.Email,
-            "login": user.Login,
-            "isAdmin": user.IsAdmin,
-        }
+        "access_token": _issue_token(snapshot),
+        "user": _user_response(snapshot),
     }), 201
 
 
@@ -67,20 +115,13 @@ def seed_user():
 @auth_bp.post("/seed/types")
 def seed_types():
     """Carrega tipos da PokéAPI na tabela TipoPokemon se ainda não existirem."""
-    resp = requests.get("https://pokeapi.co/api/v2/type")
-    resp.raise_for_status()
-    data = resp.json()
-    created = 0
-    for t in data.get("results", []):
-        name = t.get("name")
-        if not name:
-            continue
-        # Descricao armazenada em pt-br? manter o slug como descricao por simplicidade
-        if not db.session.scalar(db.select(TipoPokemon).filter_by(Descricao=name)):
-            db.session.add(TipoPokemon(Descricao=name))
-            created += 1
-    db.session.commit()
-    return jsonify({"msg": "Tipos carregados", "novos": created})
+    try:
+        summary = importer.run_import("types")
+    except importer.ImportInProgress as exc:
+        return jsonify({"msg": str(exc)}), 409
+    except importer.SourceError as exc:
+        return jsonify({"msg": str(exc), "detalhe": exc.detalhe}), 502
+    return jsonify({"msg": "Tipos carregados", **summary})
 
 
 @auth_bp.post("/login")
@@ -95,28 +136,15 @@ def login():
     if not user or not check_password_hash(user.Senha, senha):
         return jsonify({"msg": "Credenciais inválidas"}), 401
 
-    token = create_access_token(identity=str(user.IDUsuario))
-    return jsonify({"access_token": token, "user": {
-        "id": user.IDUsuario,
-        "nome": user.Nome,
-        "email": user.Email,
-        "login": user.Login,
-        "isAdmin": user.IsAdmin,
-    }})
+    snapshot = user_snapshot(user)
+    user_cache.put(user.IDUsuario, snapshot)
+    return jsonify({"access_token": _issue_token(snapshot), "user": _user_response(snapshot)})
 
 
 @auth_bp.get("/me")
 @jwt_required()
 def me():
-    user_id = int(get_jwt_identity())
-    user = db.session.get(Usuario, user_id)
-    return jsonify({
-        "id": user.IDUsuario,
-        "nome": user.Nome,
-        "email": user.Email,
-        "login": user.Login,
-        "isAdmin": user.IsAdmin,
-    })
+    return jsonify(_current_profile())
 
 
 @auth_bp.post("/reset-password")
@@ -139,45 +167,106 @@ def reset_password():
     if not user:
         return jsonify({"msg": "Usuário não encontrado"}), 404
 
-    # Atualizar senha
+    # Atualizar senha e revogar os tokens emitidos antes da troca
     user.Senha = generate_password_hash(nova_senha)
+    user.TokenVersao = (user.TokenVersao or 0) + 1
     db.session.commit()
+    user_cache.invalidate(user.IDUsuario)
 
     return jsonify({"msg": "Senha alterada com sucesso"}), 200
 
 
-@auth_bp.get("/users")
-@jwt_required()
-def list_users():
-    """Lista todos os usuários cadastrados (apenas admin)"""
-    current_user_id = int(get_jwt_identity())
-    current_user = db.session.get(Usuario, current_user_id)
+USERS_PAGE_DEFAULT = 50
+USERS_PAGE_MAX = 200
+# Estimativa do total de usuários, recalculada no máximo a cada N segundos
+_COUNT_TTL_SECONDS = 60
+_user_count: Tuple[float, int] = (0.0, 0)
+
+
+def _encode_cursor(dt: datetime, user_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{dt.isoformat()}|{user_id}".encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Optional[Tuple[datetime, int]]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        dt, user_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(dt), int(user_id)
+    except (ValueError, UnicodeDecodeError):
+        return None
 
-    # Apenas admin pode listar usuários
-    if not current_user or not current_user.IsAdmin:
-        return jsonify({"msg": "Acesso negado. Apenas administradores podem acessar esta área."}), 403
 
-    users = db.session.scalars(db.select(Usuario).order_by(Usuario.DtInclusao.desc())).all()
+def _estimate_user_count() -> int:
+    """Total aproximado: estatística do PostgreSQL ou COUNT(*) memorizado por alguns segundos"""
+    global _user_count
+    checked_at, count = _user_count
+    if time.monotonic() - checked_at < _COUNT_TTL_SECONDS:
+        return count
+    count = -1
+    if db.engine.dialect.name == "postgresql":
+        count = int(db.session.scalar(
+            text("SELECT reltuples FROM pg_class WHERE relname = :name"), {"name": Usuario.__tablename__}
+        ) or -1)
+    if count < 0:
+        count = db.session.scalar(db.select(db.func.count()).select_from(Usuario))
+    _user_count = (time.monotonic(), count)
+    return count
+
+
+@auth_bp.get("/users")
+@admin_required()
+def list_users():
+    """Lista os usuários cadastrados (apenas admin), mais recentes primeiro.
+
+    Paginação por cursor (keyset) sobre (DtInclusao, IDUsuario): ?limit=50&cursor=<nextCursor>.
+    ?q= filtra por prefixo do nome ou do login. `totalEstimate` é aproximado.
+    """
+    try:
+        limit = min(USERS_PAGE_MAX, max(1, int(request.args.get("limit", USERS_PAGE_DEFAULT))))
+    except (TypeError, ValueError):
+        return jsonify({"msg": "limit deve ser um número inteiro"}), 400
+
+    query = db.select(Usuario.IDUsuario, Usuario.Nome, Usuario.DtInclusao)
+    cursor = request.args.get("cursor")
+    if cursor:
+        position = _decode_cursor(cursor)
+        if position is None:
+            return jsonify({"msg": "cursor inválido"}), 400
+        dt, user_id = position
+        query = query.where(or_(
+            Usuario.DtInclusao < dt,
+            and_(Usuario.DtInclusao == dt, Usuario.IDUsuario < user_id),
+        ))
+    q = request.args.get("q", "").strip()
+    if q:
+        pattern = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        query = query.where(or_(Usuario.Nome.ilike(pattern, escape="\\"),
+                                Usuario.Login.ilike(pattern, escape="\\")))
+
+    # Uma linha a mais só para saber se existe próxima página
+    rows = db.session.execute(
+        query.order_by(Usuario.DtInclusao.desc(), Usuario.IDUsuario.desc()).limit(limit + 1)
+    ).all()
+    page = rows[:limit]
+    next_cursor = _encode_cursor(page[-1].DtInclusao, page[-1].IDUsuario) if len(rows) > limit else None
 
     # Retorna apenas dados não sensíveis
-    return jsonify([{
-        "id": u.IDUsuario,
-        "nome": u.Nome,
-        "dtInclusao": u.DtInclusao.isoformat() if u.DtInclusao else None,
-    } for u in users]), 200
+    return jsonify({
+        "results": [{
+            "id": row.IDUsuario,
+            "nome": row.Nome,
+            "dtInclusao": row.DtInclusao.isoformat() if row.DtInclusao else None,
+        } for row in page],
+        "nextCursor": next_cursor,
+        "totalEstimate": _estimate_user_count(),
+    }), 200
 
 
 @auth_bp.delete("/users/<int:user_id>")
-@jwt_required()
+@admin_required("Acesso negado. Apenas administradores podem deletar usuários.")
 def delete_user(user_id: int):
     """Deleta um usuário (apenas admin, não pode deletar a si mesmo)"""
     current_user_id = int(get_jwt_identity())
-    current_user = db.session.get(Usuario, current_user_id)
-
-    # Apenas admin pode deletar usuários
-    if not current_user or not current_user.IsAdmin:
-        return jsonify({"msg": "Acesso negado. Apenas administradores podem deletar usuários."}), 403
-
     if current_user_id == user_id:
         return jsonify({"msg": "Você não pode deletar sua própria conta"}), 400
 
@@ -187,6 +276,7 @@ def delete_user(user_id: int):
 
     db.session.delete(user)
     db.session.commit()
+    user_cache.invalidate(user_id)
 
     return jsonify({"msg": "Usuário deletado com sucesso"}), 200
 
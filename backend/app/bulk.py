@@ -0,0 +1,17 @@
+"""INSERT que ignora linhas já existentes (violação de chave única), por dialeto."""
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+
+from . import db
+
+
+def insert_ignore(model):
+    """INSERT ... ON CONFLICT DO NOTHING (SQLite/PostgreSQL) ou INSERT IGNORE (MySQL)"""
+    dialect = db.engine.dialect.name
+    if dialect == "sqlite":
+        return sqlite.insert(model).on_conflict_do_nothing()
+    if dialect == "postgresql":
+        return postgresql.insert(model).on_conflict_do_nothing()
+    if dialect in ("mysql", "mariadb"):
+        return insert(model).prefix_with("IGNORE")
+    return insert(model)
@@ -0,0 +1,296 @@
+"""Cache em memória (por worker) para os dados da PokéAPI.
+
+LRU com limite de itens e de bytes, TTL por classe de chave, expiração ativa
+e contadores O(1) lidos diretamente por /api/cache/stats.
+
+Cada entrada tem dois prazos: o TTL "soft" (fresca) e o "hard" (TTL + janela de
+stale). Entre os dois o valor ainda é servido, marcado como stale, para que o
+chamador o revalide em segundo plano.
+"""
+import heapq
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+# Classes de chave reconhecidas pelo prefixo (a ordem importa: prefixos mais longos primeiro)
+KEY_CLASSES = (
+    ("notfound_", "negative"),
+    ("pokemon_detail_", "pokemon_detail"),
+    ("pokemon_list_", "pokemon_list"),
+    ("type_detail_", "type_detail"),
+    ("type_list", "type_list"),
+    ("species_", "species"),
+    ("evolution_chain_", "evolution_chain"),
+)
+
+# Janela extra (após o TTL) em que o valor ainda pode ser servido enquanto é revalidado
+DEFAULT_STALE_SECONDS = 24 * 3600
+
+DEFAULT_TTLS = {
+    "pokemon_list": 3600,
+    "pokemon_detail": 3600,
+    "type_list": 3600,
+    "type_detail": 3600,
+    "species": 86400,
+    "evolution_chain": 86400,
+    "negative": 300,
+    "other": 3600,
+}
+
+
+def key_class(key: str) -> str:
+    for prefix, name in KEY_CLASSES:
+        if key.startswith(prefix):
+            return name
+    return "other"
+
+
+def estimate_size(value: Any) -> int:
+    """Tamanho aproximado em bytes (JSON compacto), calculado uma vez na escrita"""
+    try:
+        return len(json.dumps(value, separators=(",", ":")))
+    except (TypeError, ValueError):
+        return len(repr(value))
+
+
+class _Entry:
+    __slots__ = ("value", "encoded", "size", "fresh_until", "expires_at", "key_class", "hits")
+
+    def __init__(self, value: Any, encoded: Optional[Dict[str, Any]], size: int,
+                 fresh_until: float, expires_at: float, klass: str):
+        self.value = value
+        # Respostas já serializadas por variante (ex.: "full", "card"), ver http_cache.py
+        self.encoded = encoded
+        self.size = size
+        self.fresh_until = fresh_until
+        self.expires_at = expires_at
+        self.key_class = klass
+        self.hits = 0
+
+
+class TTLCache:
+    """LRU thread-safe com orçamento de itens/bytes e TTL por classe de chave"""
+
+    def __init__(self, max_items: int = 5000, max_bytes: int = 64 * 1024 * 1024,
+                 ttls: Optional[Dict[str, int]] = None, stale_seconds: int = DEFAULT_STALE_SECONDS):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.stale_seconds = stale_seconds
+        self._lock = threading.Lock()
+        self._data: "OrderedDict[str, _Entry]" = OrderedDict()
+        # Heap (expira_em, chave) para expiração ativa; entradas obsoletas são ignoradas
+        self._expiry: List[Tuple[float, str]] = []
+        self._bytes = 0
+        self._by_class: Dict[str, int] = {name: 0 for name in self.ttls}
+        # Contadores por classe de chave: { classe: { hit, stale, miss, eviction, expiration } }
+        self._events: Dict[str, Dict[str, int]] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self) -> None:
+        # Uma thread do processo pai pode ter feito o fork com o lock na mão; no filho
+        # ela não existe mais e o lock nunca seria liberado
+        self._lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        """Lê limites e TTLs da configuração da app (CACHE_MAX_ITEMS, CACHE_TTL_<CLASSE>...)"""
+        self.max_items = app.config.get("CACHE_MAX_ITEMS", self.max_items)
+        self.max_bytes = app.config.get("CACHE_MAX_BYTES", self.max_bytes)
+        self.stale_seconds = app.config.get("CACHE_STALE_SECONDS", self.stale_seconds)
+        for name in list(self.ttls):
+            self.ttls[name] = app.config.get(f"CACHE_TTL_{name.upper()}", self.ttls[name])
+        app.extensions["pokeapi_cache"] = self
+
+    def ttl_for(self, key: str) -> int:
+        return self.ttls.get(key_class(key), self.ttls["other"])
+
+    def stale_for(self, key: str) -> int:
+        # Resultados negativos não são servidos vencidos
+        return 0 if key_class(key) == "negative" else self.stale_seconds
+
+    # ------------------------------------------------------------------ leitura/escrita
+    def get(self, key: str) -> Optional[Any]:
+        """Valor ainda fresco (dentro do TTL soft) ou None"""
+        value, stale = self.lookup(key)
+        return None if stale else value
+
+    def peek(self, key: str) -> Optional[Any]:
+        """Valor ainda dentro do TTL hard, sem contar hit/miss nem mexer na ordem do LRU"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry.expires_at <= time.monotonic():
+                return None
+            return entry.value
+
+    def lookup(self, key: str) -> Tuple[Optional[Any], bool]:
+        """Retorna (valor, stale). Valores stale continuam válidos até o TTL hard."""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                self._count(key_class(key), "miss")
+                return None, False
+            if entry.expires_at <= now:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                self._count(entry.key_class, "expiration")
+                self._count(entry.key_class, "miss")
+                return None, False
+            self._data.move_to_end(key)
+            entry.hits += 1
+            if entry.fresh_until <= now:
+                self.stale_hits += 1
+                self._count(entry.key_class, "stale")
+                return entry.value, True
+            self.hits += 1
+            self._count(entry.key_class, "hit")
+            return entry.value, False
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, stale: Optional[float] = None,
+            encoded: Optional[Dict[str, Any]] = None) -> None:
+        """Grava com TTL soft `ttl` e mais `stale` segundos servindo o valor vencido.
+
+        `encoded` guarda junto as respostas já serializadas; o tamanho delas entra no orçamento.
+        """
+        klass = key_class(key)
+        if encoded:
+            size = sum(e.size for e in encoded.values())
+        else:
+            size = estimate_size(value)
+        if size > self.max_bytes:
+            # Não cabe no cache: a versão anterior também sai, para ninguém ler o valor antigo
+            with self._lock:
+                if key in self._data:
+                    self._remove(key)
+            return
+        now = time.monotonic()
+        fresh_until = now + (ttl if ttl is not None else self.ttl_for(key))
+        expires_at = fresh_until + max(0.0, stale if stale is not None else self.stale_for(key))
+        with self._lock:
+            hits = 0
+            if key in self._data:
+                hits = self._data[key].hits
+                self._remove(key)
+            entry = self._data[key] = _Entry(value, encoded, size, fresh_until, expires_at, klass)
+            # Popularidade decai a cada renovação, para o ranking de chaves quentes se adaptar
+            entry.hits = hits // 2
+            self._bytes += size
+            self._by_class[klass] = self._by_class.get(klass, 0) + 1
+            heapq.heappush(self._expiry, (expires_at, key))
+            self._expire(now)
+            self._evict()
+
+    def encoded(self, key: str, variant: str, value: Any) -> Optional[Any]:
+        """Resposta serializada da variante, se a entrada atual ainda for `value`"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry.value is not value or not entry.encoded:
+                return None
+            return entry.encoded.get(variant)
+
+    def expiring_soon(self, within: float, min_hits: int = 1, limit: int = 50) -> List[str]:
+        """Chaves mais acessadas cujo TTL soft vence nos próximos `within` segundos"""
+        deadline = time.monotonic() + within
+        with self._lock:
+            candidates = [
+                (entry.hits, key) for key, entry in self._data.items()
+                if entry.fresh_until <= deadline and entry.hits >= min_hits
+            ]
+        candidates.sort(reverse=True)
+        return [key for _, key in candidates[:limit]]
+
+    def snapshot(self) -> List[list]:
+        """[chave, valor, TTL soft restante, TTL hard restante] das entradas válidas, da
+        menos para a mais recente (resultados negativos ficam de fora)"""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                [key, entry.value, entry.fresh_until - now, entry.expires_at - now]
+                for key, entry in self._data.items()
+                if entry.expires_at > now and entry.key_class != "negative"
+            ]
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+                return True
+            return False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._expiry.clear()
+            self._bytes = 0
+            self._by_class = {name: 0 for name in self._by_class}
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "items": len(self._data),
+                "bytes": self._bytes,
+                "max_items": self.max_items,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "hit_ratio": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "breakdown": dict(self._by_class),
+                "by_class": {klass: dict(counts) for klass, counts in self._events.items()},
+                "ttl_seconds": dict(self.ttls),
+                "stale_seconds": self.stale_seconds,
+            }
+
+    # ------------------------------------------------------------------ internos (com lock)
+    def _count(self, klass: str, event: str) -> None:
+        counts = self._events.get(klass)
+        if counts is None:
+            counts = self._events[klass] = dict.fromkeys(("hit", "stale", "miss", "eviction", "expiration"), 0)
+        counts[event] += 1
+
+    def _remove(self, key: str) -> None:
+        entry = self._data.pop(key)
+        self._bytes -= entry.size
+        self._by_class[entry.key_class] -= 1
+
+    def _expire(self, now: float) -> None:
+        """Remove as entradas vencidas pelo topo do heap (custo proporcional ao que expirou)"""
+        heap = self._expiry
+        while heap and heap[0][0] <= now:
+            expires_at, key = heapq.heappop(heap)
+            entry = self._data.get(key)
+            if entry is not None and entry.expires_at == expires_at:
+                self._remove(key)
+                self.expirations += 1
+                self._count(entry.key_class, "expiration")
+        # Regravações deixam itens obsoletos no heap; reconstrói quando crescer demais
+        if len(heap) > 2 * len(self._data) + 64:
+            self._expiry = [(e.expires_at, k) for k, e in self._data.items()]
+            heapq.heapify(self._expiry)
+
+    def _evict(self) -> None:
+        while self._data and (len(self._data) > self.max_items or self._bytes > self.max_bytes):
+            key = next(iter(self._data))
+            self._count(self._data[key].key_class, "eviction")
+            self._remove(key)
+            self.evictions += 1
+
+
+cache = TTLCache()
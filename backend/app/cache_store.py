@@ -0,0 +1,194 @@
+"""Segundo nível de cache em disco (SQLite), compartilhado entre os workers do gunicorn.
+
+Fica atrás do cache em memória: um miss no processo consulta o disco antes de ir
+à PokéAPI, e o conteúdo sobrevive a deploys/restarts enquanto o TTL for válido.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional, Tuple
+
+from .serving import cooperative
+
+logger = logging.getLogger(__name__)
+
+# Versão do layout da tabela (PRAGMA user_version). É só cache: em mudança de versão, recria.
+_SCHEMA_VERSION = 2
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    fresh_until REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_cache_entries_expires_at ON cache_entries (expires_at);
+CREATE INDEX IF NOT EXISTS ix_cache_entries_stored_at ON cache_entries (stored_at);
+"""
+
+
+class DiskCache:
+    """Tabela chave/valor em SQLite (WAL) com TTL, compactação e limite de tamanho.
+
+    Erros de I/O nunca derrubam a requisição: o cache em disco é apenas uma otimização.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_bytes: int = 256 * 1024 * 1024,
+                 compact_every: int = 500):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.compact_every = compact_every
+        self._local = threading.local()
+        self._shared: Optional[Tuple[int, sqlite3.Connection]] = None
+        self._writes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app) -> None:
+        self.path = app.config.get("CACHE_DB_PATH", self.path)
+        self.max_bytes = app.config.get("CACHE_DB_MAX_BYTES", self.max_bytes)
+        app.extensions["pokeapi_disk_cache"] = self
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _conn(self) -> sqlite3.Connection:
+        # No modo async o threading.local é por greenlet (uma conexão por requisição);
+        # como o sqlite3 não cede o controle, uma conexão por processo basta
+        if cooperative():
+            if self._shared is None or self._shared[0] != os.getpid():
+                self._shared = (os.getpid(), self._connect())
+            return self._shared[1]
+        # Uma conexão por thread e por processo (conexões não podem atravessar o fork)
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        conn = self._connect()
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")  # só tem efeito em arquivo novo
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if conn.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+            conn.execute("DROP TABLE IF EXISTS cache_entries")
+            conn.execute(f"PRAGMA user_version={_SCHEMA_VERSION}")
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def get(self, key: str) -> Optional[Tuple[Any, float, float]]:
+        """Retorna (valor, segundos até o TTL soft, segundos até o TTL hard) ou None.
+
+        O primeiro prazo fica negativo quando o valor já está stale.
+        """
+        if not self.enabled:
+            return None
+        try:
+            row = self._conn().execute(
+                "SELECT value, fresh_until, expires_at FROM cache_entries "
+                "WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            ).fetchone()
+        except sqlite3.Error as exc:
+            logger.warning("Cache em disco indisponível (get): %s", exc)
+            return None
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        now = time.time()
+        return json.loads(row[0]), row[1] - now, row[2] - now
+
+    def set(self, key: str, value: Any, ttl: float, stale: float = 0) -> None:
+        if not self.enabled:
+            return
+        encoded = json.dumps(value, separators=(",", ":"))
+        now = time.time()
+        try:
+            self._conn().execute(
+                "INSERT OR REPLACE INTO cache_entries "
+                "(key, value, size, stored_at, fresh_until, expires_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, encoded, len(encoded), now, now + ttl, now + ttl + max(0, stale)),
+            )
+        except sqlite3.Error as exc:
+            logger.warning("Cache em disco indisponível (set): %s", exc)
+            return
+        with self._lock:
+            self._writes += 1
+            due = self._writes % self.compact_every == 0
+        if due:
+            self.compact()
+
+    def delete(self, key: str) -> None:
+        if not self.enabled:
+            return
+        try:
+            self._conn().execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+        except sqlite3.Error as exc:
+            logger.warning("Cache em disco indisponível (delete): %s", exc)
+
+    def clear(self) -> None:
+        if not self.enabled:
+            return
+        try:
+            self._conn().execute("DELETE FROM cache_entries")
+        except sqlite3.Error as exc:
+            logger.warning("Cache em disco indisponível (clear): %s", exc)
+
+    def compact(self) -> int:
+        """Remove expirados e, acima do limite, os mais antigos. Retorna quantos removeu."""
+        if not self.enabled:
+            return 0
+        try:
+            conn = self._conn()
+            removed = conn.execute(
+                "DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),)
+            ).rowcount
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0]
+            if total > self.max_bytes:
+                # Apaga pelos mais antigos até ficar em ~90% do limite
+                excess = total - int(self.max_bytes * 0.9)
+                removed += conn.execute(
+                    """
+                    DELETE FROM cache_entries WHERE key IN (
+                        SELECT key FROM (
+                            SELECT key, size, SUM(size) OVER (ORDER BY stored_at, key) AS acc
+                            FROM cache_entries
+                        ) WHERE acc - size < ?
+                    )
+                    """,
+                    (excess,),
+                ).rowcount
+            if removed:
+                # Devolve as páginas livres ao sistema de arquivos
+                conn.execute("PRAGMA incremental_vacuum")
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            return removed
+        except sqlite3.Error as exc:
+            logger.warning("Falha ao compactar cache em disco: %s", exc)
+            return 0
+
+    def stats(self) -> dict:
+        if not self.enabled:
+            return {"enabled": False}
+        try:
+            items, total = self._conn().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries WHERE expires_at > ?",
+                (time.time(),),
+            ).fetchone()
+        except sqlite3.Error as exc:
+            return {"enabled": True, "error": str(exc)}
+        return {"enabled": True, "path": self.path, "items": items, "bytes": total,
+                "max_bytes": self.max_bytes, "hits": self.hits, "misses": self.misses}
+
+
+disk_cache = DiskCache()
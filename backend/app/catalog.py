@@ -0,0 +1,231 @@
+"""Catálogo local da PokéAPI (espécies, Pokémon/formas, tipos e pertinência a tipos).
+
+`flask sync-catalog` copia o catálogo para o banco; depois disso /api/pokemon,
+/api/type e /api/type/<nome> são respondidos por consultas indexadas locais, sem
+depender da latência nem da disponibilidade da PokéAPI. Sem catálogo sincronizado,
+as funções de consulta retornam None e as rotas continuam usando a PokéAPI.
+"""
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import delete, insert, select, update
+
+from . import db
+from .importer import import_rows, map_favorite_types
+from .models import CatalogoEspecie, CatalogoPokemon, CatalogoPokemonTipo, TipoPokemon
+from .search_index import id_from_url as _id_from_url, pokemon_index
+from .upstream import upstream
+
+# Evita consultar a existência do catálogo a cada requisição
+_READY_TTL_SECONDS = 60
+_ready: Tuple[float, bool] = (0.0, False)
+
+
+def _fetch_all(path: str) -> List[dict]:
+    resp = upstream.get(path, params={"limit": 100000, "offset": 0}, timeout=30)
+    resp.raise_for_status()
+    return resp.json().get("results", [])
+
+
+def _species_for(name: str, pokemon_id: int, species_by_name: Dict[str, int],
+                 species_ids: Set[int]) -> Optional[int]:
+    """Forma padrão tem o mesmo id da espécie; as demais ("charizard-mega-x") casam pelo prefixo"""
+    if pokemon_id in species_ids:
+        return pokemon_id
+    parts = name.split("-")
+    for size in range(len(parts) - 1, 0, -1):
+        species_id = species_by_name.get("-".join(parts[:size]))
+        if species_id is not None:
+            return species_id
+    return None
+
+
+def sync_catalog(full: bool = False) -> dict:
+    """Sincroniza o catálogo. Incremental por padrão: só insere o que falta e só
+    rebusca os tipos sem pertinências ou quando surgiram Pokémon novos."""
+    global _ready
+    summary = {"especies": 0, "pokemon": 0, "pokemon_atualizados": 0, "tipos": 0,
+               "tipos_sincronizados": 0, "pertinencias_novas": 0, "pertinencias_removidas": 0}
+
+    species = [(s["name"], _id_from_url(s["url"])) for s in _fetch_all("/pokemon-species")]
+    species_by_name = {name: sid for name, sid in species if sid}
+    existing_species = set(db.session.scalars(select(CatalogoEspecie.IDEspecie)))
+    new_species = [{"IDEspecie": sid, "Nome": name} for name, sid in species
+                   if sid and sid not in existing_species]
+    if new_species:
+        db.session.execute(insert(CatalogoEspecie), new_species)
+    summary["especies"] = len(new_species)
+    species_ids = existing_species | {row["IDEspecie"] for row in new_species}
+
+    now = datetime.utcnow()
+    existing = {row.IDPokemon: (row.Nome, row.Url)
+                for row in db.session.execute(select(CatalogoPokemon.IDPokemon, CatalogoPokemon.Nome,
+                                                     CatalogoPokemon.Url))}
+    new_rows, changed_rows = [], []
+    for p in _fetch_all("/pokemon"):
+        pid = _id_from_url(p["url"])
+        if pid is None:
+            continue
+        row = {"IDPokemon": pid, "Nome": p["name"], "Url": p["url"], "DtSincronizacao": now,
+               "IDEspecie": _species_for(p["name"], pid, species_by_name, species_ids)}
+        if pid not in existing:
+            new_rows.append(row)
+        elif full and existing[pid] != (p["name"], p["url"]):
+            changed_rows.append(row)
+    if new_rows:
+        db.session.execute(insert(CatalogoPokemon), new_rows)
+    if changed_rows:
+        db.session.execute(update(CatalogoPokemon), changed_rows)
+    summary["pokemon"] = len(new_rows)
+    summary["pokemon_atualizados"] = len(changed_rows)
+    known_ids = set(existing) | {row["IDPokemon"] for row in new_rows}
+
+    type_names = [t["name"] for t in _fetch_all("/type")]
+    summary["tipos"] = import_rows(TipoPokemon, "Descricao", [{"Descricao": name} for name in type_names])["novos"]
+    existing_types = dict(db.session.execute(select(TipoPokemon.Descricao, TipoPokemon.IDTipoPokemon)).all())
+
+    memberships: Dict[int, Set[Tuple[int, int]]] = {}
+    for tid, pid, slot in db.session.execute(
+        select(CatalogoPokemonTipo.IDTipoPokemon, CatalogoPokemonTipo.IDPokemon, CatalogoPokemonTipo.Slot)
+    ):
+        memberships.setdefault(tid, set()).add((pid, slot))
+
+    for name in type_names:
+        tid = existing_types[name]
+        current = memberships.get(tid, set())
+        if not (full or new_rows or not current):
+            continue
+        resp = upstream.get(f"/type/{name}", timeout=30)
+        resp.raise_for_status()
+        wanted = set()
+        for entry in resp.json().get("pokemon", []):
+            pid = _id_from_url((entry.get("pokemon") or {}).get("url"))
+            if pid in known_ids:
+                wanted.add((pid, entry.get("slot") or 1))
+        removed = current - wanted
+        added = wanted - current
+        if removed:
+            db.session.execute(
+                delete(CatalogoPokemonTipo).where(
+                    CatalogoPokemonTipo.IDTipoPokemon == tid,
+                    CatalogoPokemonTipo.IDPokemon.in_([pid for pid, _ in removed]),
+                )
+            )
+        # Mudança só de slot: o par (pokemon, tipo) foi removido acima e volta com o slot novo
+        if added:
+            db.session.execute(insert(CatalogoPokemonTipo), [
+                {"IDPokemon": pid, "IDTipoPokemon": tid, "Slot": slot} for pid, slot in added
+            ])
+        summary["tipos_sincronizados"] += 1
+        summary["pertinencias_novas"] += len(added)
+        summary["pertinencias_removidas"] += len(removed)
+
+    db.session.flush()
+    _ready = (0.0, False)
+    # Com as pertinências gravadas, os favoritos sem tipo já podem ser mapeados
+    summary["favoritos_mapeados"] = map_favorite_types() or 0
+    db.session.commit()
+    pokemon_index.invalidate()
+    return summary
+
+
+@click.command("sync-catalog")
+@click.option("--full", is_flag=True, help="Rebusca todos os tipos e atualiza nomes/URLs alterados.")
+@with_appcontext
+def sync_catalog_command(full: bool):
+    """Copia espécies, Pokémon, tipos e pertinências da PokéAPI para o banco."""
+    summary = sync_catalog(full=full)
+    for key, value in summary.items():
+        click.echo(f"{key}: {value}")
+
+
+# ---------------------------------------------------------------------- consultas locais
+def is_ready() -> bool:
+    """Catálogo sincronizado (há pertinências gravadas)? Memorizado por alguns segundos."""
+    global _ready
+    checked_at, ready = _ready
+    if time.monotonic() - checked_at < _READY_TTL_SECONDS:
+        return ready
+    ready = db.session.scalar(select(CatalogoPokemonTipo.IDPokemon).limit(1)) is not None
+    _ready = (time.monotonic(), ready)
+    return ready
+
+
+def _page_url(path: str, offset: int, limit: int) -> str:
+    return f"{upstream.base_url}{path}?offset={offset}&limit={limit}"
+
+
+def list_pokemon(limit: int, offset: int) -> Optional[dict]:
+    """Página de { name, url } no mesmo formato da PokéAPI, em ordem de id nacional"""
+    if not is_ready():
+        return None
+    total = db.session.scalar(select(db.func.count()).select_from(CatalogoPokemon))
+    rows = db.session.execute(
+        select(CatalogoPokemon.Nome, CatalogoPokemon.Url)
+        .order_by(CatalogoPokemon.IDPokemon).limit(limit).offset(offset)
+    ).all()
+    return {
+        "count": total,
+        "next": _page_url("/pokemon", offset + limit, limit) if offset + limit < total else None,
+        "previous": _page_url("/pokemon", max(0, offset - limit), limit) if offset > 0 else None,
+        "results": [{"name": nome, "url": url} for nome, url in rows],
+    }
+
+
+def list_types() -> Optional[dict]:
+    if not is_ready():
+        return None
+    names = db.session.scalars(select(TipoPokemon.Descricao).order_by(TipoPokemon.IDTipoPokemon)).all()
+    return {
+        "count": len(names),
+        "next": None,
+        "previous": None,
+        "results": [{"name": name, "url": f"{upstream.base_url}/type/{name}/"} for name in names],
+    }
+
+
+def list_by_type(name: str) -> Optional[dict]:
+    """Mesmo formato normalizado de /api/type/<nome>: { count, results: [{ name, url }] }"""
+    if not is_ready():
+        return None
+    tid = db.session.scalar(select(TipoPokemon.IDTipoPokemon).filter_by(Descricao=name))
+    if tid is None:
+        return None
+    rows = db.session.execute(
+        select(CatalogoPokemon.Nome, CatalogoPokemon.Url)
+        .join(CatalogoPokemonTipo, CatalogoPokemonTipo.IDPokemon == CatalogoPokemon.IDPokemon)
+        .where(CatalogoPokemonTipo.IDTipoPokemon == tid)
+        .order_by(CatalogoPokemon.IDPokemon)
+    ).all()
+    return {"count": len(rows), "results": [{"name": nome, "url": url} for nome, url in rows]}
+
+
+def all_pokemon() -> List[Tuple[int, str, str]]:
+    """(id, nome, url) de todo o catálogo, para montar o índice de busca"""
+    return [tuple(row) for row in db.session.execute(
+        select(CatalogoPokemon.IDPokemon, CatalogoPokemon.Nome, CatalogoPokemon.Url)
+    )]
+
+
+def type_member_ids(name: str) -> Optional[Set[int]]:
+    """Ids nacionais dos Pokémon de um tipo, ou None se o tipo não existir"""
+    tid = db.session.scalar(select(TipoPokemon.IDTipoPokemon).filter_by(Descricao=name))
+    if tid is None:
+        return None
+    return set(db.session.scalars(
+        select(CatalogoPokemonTipo.IDPokemon).where(CatalogoPokemonTipo.IDTipoPokemon == tid)
+    ))
+
+
+def all_type_members() -> Dict[str, Set[int]]:
+    """Pertinências de todos os tipos em uma única consulta: { tipo: {ids} }"""
+    members: Dict[str, Set[int]] = {}
+    for name, pid in db.session.execute(
+        select(TipoPokemon.Descricao, CatalogoPokemonTipo.IDPokemon)
+        .join(CatalogoPokemonTipo, CatalogoPokemonTipo.IDTipoPokemon == TipoPokemon.IDTipoPokemon)
+    ):
+        members.setdefault(name, set()).add(pid)
+    return members
@@ -0,0 +1,60 @@
+"""Perfil do banco principal, aplicado pelo create_app antes do db.init_app.
+
+- SQLite: PRAGMAs em cada conexão (WAL, synchronous=NORMAL, busy_timeout, mmap, cache),
+  para que leitores não esperem escritores e escritas concorrentes aguardem a vez em
+  vez de falharem com "database is locked";
+- PostgreSQL/MySQL: tamanho do pool, pre-ping e reciclagem de conexões.
+
+Os valores vêm da configuração (SQLITE_PRAGMAS e DB_POOL_*).
+"""
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+# Ordem de aplicação: busy_timeout primeiro, para a troca de journal_mode também esperar
+_PRAGMA_ORDER = ("busy_timeout", "journal_mode", "synchronous", "mmap_size", "cache_size", "temp_store")
+
+
+def is_sqlite(uri: str) -> bool:
+    return make_url(uri).get_backend_name() == "sqlite"
+
+
+def engine_options(config) -> dict:
+    """Opções do engine para o banco configurado (as explícitas em SQLALCHEMY_ENGINE_OPTIONS prevalecem)"""
+    uri = config["SQLALCHEMY_DATABASE_URI"]
+    if is_sqlite(uri):
+        # O pool padrão do SQLAlchemy já é adequado ao SQLite; o ajuste é feito pelos PRAGMAs
+        options = {}
+    else:
+        options = {
+            "pool_size": config.get("DB_POOL_SIZE", 10),
+            "max_overflow": config.get("DB_MAX_OVERFLOW", 20),
+            "pool_timeout": config.get("DB_POOL_TIMEOUT", 30),
+            "pool_recycle": config.get("DB_POOL_RECYCLE", 1800),
+            "pool_pre_ping": config.get("DB_POOL_PRE_PING", True),
+        }
+    options.update(config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    return options
+
+
+def init_app(app) -> None:
+    """Chamado antes do db.init_app, que cria o engine com estas opções"""
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(app.config)
+
+
+def register_pragmas(app, engine) -> None:
+    """Aplica os PRAGMAs do SQLite a cada nova conexão do pool"""
+    if engine.dialect.name != "sqlite":
+        return
+    pragmas = app.config.get("SQLITE_PRAGMAS") or {}
+    statements = [f"PRAGMA {name}={pragmas[name]}" for name in _PRAGMA_ORDER if pragmas.get(name) is not None]
+    statements += [f"PRAGMA {name}={value}" for name, value in pragmas.items()
+                   if name not in _PRAGMA_ORDER and value is not None]
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
@@ -0,0 +1,37 @@
+"""Estrutura por processo montada sob demanda e refeita depois de um TTL.
+
+Usado pelo índice de busca (search_index.py) e pela tabela de tipos (type_chart.py):
+quem chega com o valor vencido espera uma única reconstrução, com lock.
+"""
+import threading
+import time
+from typing import Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class TTLHolder(Generic[T]):
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.builder: Optional[Callable[[], T]] = None
+        self._value: Optional[T] = None
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+
+    def _fresh(self) -> bool:
+        return self._value is not None and time.monotonic() - self._built_at < self.ttl
+
+    def get(self) -> T:
+        if self._fresh():
+            return self._value
+        with self._lock:
+            if not self._fresh():
+                self._value = self.builder()
+                self._built_at = time.monotonic()
+            return self._value
+
+    def ready(self) -> bool:
+        return self._value is not None
+
+    def invalidate(self) -> None:
+        self._value = None
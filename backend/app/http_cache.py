@@ -0,0 +1,142 @@
+"""Respostas JSON pré-serializadas com ETag, GET condicional e compressão.
+
+O corpo (e as variantes gzip/brotli) é gerado uma vez quando o dado entra no cache;
+um hit vira só a cópia desses bytes. Respostas montadas por requisição (`json_response`)
+são comprimidas só na codificação negociada. Com `If-None-Match` igual ao ETag, responde 304.
+"""
+import gzip
+import hashlib
+import json
+from typing import Any, Callable, Iterable, Optional, Tuple
+
+from flask import Response, request
+
+try:  # brotli é opcional: sem o pacote, só gzip
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+# Abaixo disso a compressão não compensa
+MIN_COMPRESS_BYTES = 1024
+
+# Cache-Control por classe de chave: detalhes e tipos praticamente não mudam
+MAX_AGE_BY_CLASS = {
+    "pokemon_detail": 86400,
+    "type_detail": 86400,
+    "type_list": 86400,
+    "pokemon_list": 3600,
+}
+DEFAULT_MAX_AGE = 300
+
+
+class EncodedResponse:
+    __slots__ = ("body", "gzip", "br", "etag")
+
+    def __init__(self, body: bytes, gzip_body: Optional[bytes], br_body: Optional[bytes], etag: str):
+        self.body = body
+        self.gzip = gzip_body
+        self.br = br_body
+        self.etag = etag
+
+    @classmethod
+    def encode(cls, data: Any) -> "EncodedResponse":
+        """Corpo e as duas variantes comprimidas: para o que fica guardado no cache"""
+        body, etag = _serialize(data)
+        gzip_body = br_body = None
+        if len(body) >= MIN_COMPRESS_BYTES:
+            gzip_body = _compress(body, "gzip")
+            if brotli is not None:
+                br_body = _compress(body, "br")
+        return cls(body, gzip_body, br_body, etag)
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + len(self.gzip or b"") + len(self.br or b"")
+
+
+def _serialize(data: Any) -> Tuple[bytes, str]:
+    body = json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return body, '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
+
+def _etag_matches(etag: str) -> bool:
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates
+
+
+def _negotiate(available: Iterable[str]) -> Optional[str]:
+    """Codificação de maior qualidade no Accept-Encoding (respeita `;q=0`); brotli no empate"""
+    accepted = request.accept_encodings
+    best, best_q = None, 0.0
+    for encoding in available:
+        quality = accepted.quality(encoding)
+        if quality > best_q:
+            best, best_q = encoding, quality
+    return best
+
+
+def _headers(etag: str, max_age: int, immutable: bool) -> dict:
+    # immutable só por opção explícita (conteúdo endereçado pelo hash): com ele o navegador
+    # não revalida nem no reload, e o dado da PokéAPI é renovado bem antes do max-age
+    return {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={max_age}" + (", immutable" if immutable else ""),
+        "Vary": "Accept-Encoding",
+    }
+
+
+def encoded_response(encoded: EncodedResponse, max_age: int = DEFAULT_MAX_AGE,
+                     status: int = 200, immutable: bool = False) -> Response:
+    """Monta a resposta a partir dos bytes prontos (304 se o cliente já tem esta versão)"""
+    headers = _headers(encoded.etag, max_age, immutable)
+    if status == 200 and _etag_matches(encoded.etag):
+        return Response(status=304, headers=headers)
+
+    variants = {"br": encoded.br, "gzip": encoded.gzip}
+    encoding = _negotiate(name for name, data in variants.items() if data is not None)
+    body = encoded.body
+    if encoding is not None:
+        body = variants[encoding]
+        headers["Content-Encoding"] = encoding
+    return Response(body, status=status, headers=headers, mimetype="application/json")
+
+
+def json_response(data: Any, max_age: int = DEFAULT_MAX_AGE, immutable: bool = False) -> Response:
+    """Para respostas montadas por requisição (sem bytes em cache), ainda com ETag/304.
+
+    Comprime uma vez, só na codificação negociada com o cliente.
+    """
+    body, etag = _serialize(data)
+    headers = _headers(etag, max_age, immutable)
+    if _etag_matches(etag):
+        return Response(status=304, headers=headers)
+    if len(body) >= MIN_COMPRESS_BYTES:
+        encoding = _negotiate(("br", "gzip") if brotli is not None else ("gzip",))
+        if encoding is not None:
+            body = _compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+    return Response(body, headers=headers, mimetype="application/json")
+
+
+def versioned_response(version: str, build: Callable[[], Any]) -> Response:
+    """Resposta privada (por usuário) cujo ETag é a versão dos dados.
+
+    Com `If-None-Match` igual, responde 304 sem montar nem serializar o corpo.
+    """
+    etag = f'"{version}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(etag):
+        return Response(status=304, headers=headers)
+    body = json.dumps(build(), separators=(",", ":"), ensure_ascii=False)
+    return Response(body, headers=headers, mimetype="application/json")
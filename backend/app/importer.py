@@ -0,0 +1,199 @@
+"""Importação em lote de dados de referência (tipos, por enquanto) vindos da PokéAPI.
+
+Cada importador busca a lista uma única vez (via cache/single-flight da PokéAPI), compara
+com a tabela em uma só consulta e insere o que falta em lotes de
+`INSERT ... ON CONFLICT DO NOTHING`. Duas importações simultâneas (dois workers, rota + CLI)
+não duplicam nem falham: a restrição única decide, e dentro do processo um lock impede
+que a mesma importação rode duas vezes ao mesmo tempo.
+"""
+import logging
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import click
+import requests
+from flask.cli import with_appcontext
+from sqlalchemy import String, and_, cast, func, or_, select, update
+
+from . import db
+from .bulk import insert_ignore
+from .models import CatalogoPokemon, CatalogoPokemonTipo, PokemonUsuario, TipoPokemon
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+
+class SourceError(RuntimeError):
+    """Falha ao obter os dados de origem (PokéAPI fora do ar, resposta inválida)"""
+
+    def __init__(self, msg: str, detalhe=None):
+        super().__init__(msg)
+        self.detalhe = detalhe
+
+
+class ImportInProgress(RuntimeError):
+    pass
+
+
+def import_rows(model, key: str, rows: Iterable[dict], batch_size: int = BATCH_SIZE) -> dict:
+    """Insere as linhas cuja chave ainda não existe na tabela. Não faz commit.
+
+    A diferença é calculada contra todas as chaves da tabela (uma consulta; tabelas de
+    referência são pequenas) e o INSERT ignora conflitos de quem inseriu no meio tempo.
+    """
+    column = getattr(model, key)
+    unique: Dict[str, dict] = {}
+    for row in rows:
+        if row.get(key):
+            unique.setdefault(row[key], row)
+    existing = set(db.session.scalars(select(column)))
+    missing = [row for value, row in unique.items() if value not in existing]
+    inserted = 0
+    connection = db.session.connection()
+    for start in range(0, len(missing), batch_size):
+        batch = missing[start:start + batch_size]
+        result = connection.execute(insert_ignore(model), batch)
+        # Alguns drivers não informam rowcount em executemany (-1); nesse caso conta o lote
+        inserted += result.rowcount if result.rowcount >= 0 else len(batch)
+    return {"total": len(unique), "novos": inserted, "existentes": len(unique) - len(missing)}
+
+
+def _type_rows() -> List[dict]:
+    from .pokeapi import fetch_type_list  # import tardio: pokeapi -> catalog -> importer
+
+    try:
+        data, status = fetch_type_list()
+    except (requests.RequestException, TimeoutError) as exc:  # inclui UpstreamUnavailable
+        raise SourceError("Falha ao consultar a PokéAPI", str(exc)) from exc
+    if status != 200:
+        raise SourceError("Falha ao consultar a PokéAPI", data)
+    return [{"Descricao": t["name"]} for t in data.get("results", []) if t.get("name")]
+
+
+def map_favorite_types() -> Optional[int]:
+    """Preenche PokemonUsuario.IDTipoPokemon (tipo primário, slot 1) com um único UPDATE.
+
+    `Codigo` é o nome ou o id nacional do Pokémon; a correspondência vem do catálogo local.
+    Sem catálogo, usa as listas de tipo em cache (`_map_from_cached_types`). Retorna None
+    se não houver nenhuma das duas fontes. Não faz commit.
+    """
+    from . import catalog
+
+    if not catalog.is_ready():
+        return _map_from_cached_types()
+    primary_type = (
+        select(CatalogoPokemonTipo.IDTipoPokemon)
+        .join(CatalogoPokemon, CatalogoPokemon.IDPokemon == CatalogoPokemonTipo.IDPokemon)
+        .where(
+            CatalogoPokemonTipo.Slot == 1,
+            or_(
+                CatalogoPokemon.Nome == func.lower(PokemonUsuario.Codigo),
+                cast(CatalogoPokemon.IDPokemon, String) == PokemonUsuario.Codigo,
+            ),
+        )
+        .limit(1)
+        .scalar_subquery()
+    )
+    result = db.session.execute(
+        update(PokemonUsuario)
+        .where(and_(PokemonUsuario.IDTipoPokemon.is_(None), primary_type.is_not(None)))
+        .values(IDTipoPokemon=primary_type)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def _map_from_cached_types() -> Optional[int]:
+    """Mapeamento sem o catálogo, a partir dos `type_detail` já em cache.
+
+    As listas de membros não dizem qual é o tipo primário: só Pokémon que aparecem em
+    exatamente um tipo são mapeados; os de dois tipos esperam o sync-catalog.
+    """
+    from .pokeapi import get_from_cache
+    from .search_index import id_from_url
+
+    members: Dict[str, Set[int]] = defaultdict(set)
+    found = 0
+    for type_id, name in db.session.execute(select(TipoPokemon.IDTipoPokemon, TipoPokemon.Descricao)):
+        data = get_from_cache(f"type_detail_{name}")
+        if data is None:
+            continue
+        found += 1
+        for p in data.get("results", []):
+            members[p["name"]].add(type_id)
+            pid = id_from_url(p.get("url"))
+            if pid is not None:
+                members[str(pid)].add(type_id)
+    if not found:
+        logger.warning("Tipos dos favoritos não mapeados: catálogo não sincronizado e nenhuma "
+                       "lista de tipo em cache (rode `flask sync-catalog`)")
+        return None
+
+    codes = db.session.scalars(
+        select(PokemonUsuario.Codigo).where(PokemonUsuario.IDTipoPokemon.is_(None)).distinct()
+    )
+    by_type: Dict[int, List[str]] = defaultdict(list)
+    for code in codes:
+        types = members.get(code.lower())
+        if types and len(types) == 1:
+            by_type[next(iter(types))].append(code)
+    mapped = 0
+    for type_id, batch in by_type.items():
+        mapped += db.session.execute(
+            update(PokemonUsuario)
+            .where(PokemonUsuario.IDTipoPokemon.is_(None), PokemonUsuario.Codigo.in_(batch))
+            .values(IDTipoPokemon=type_id)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+    logger.warning("Catálogo não sincronizado: %s favoritos mapeados por %s listas de tipo em cache "
+                   "(Pokémon de dois tipos ficam para o sync-catalog)", mapped, found)
+    return mapped
+
+
+# nome -> (modelo, coluna-chave, fonte das linhas, passo extra após inserir)
+IMPORTERS: Dict[str, Tuple[type, str, Callable[[], List[dict]], Optional[Callable[[], dict]]]] = {
+    "types": (TipoPokemon, "Descricao", _type_rows,
+              lambda: {"favoritos_mapeados": map_favorite_types()}),
+}
+
+_locks = {name: threading.Lock() for name in IMPORTERS}
+
+
+def run_import(name: str) -> dict:
+    """Executa um importador (e o passo extra dele) em uma transação. Faz commit.
+
+    Levanta ImportInProgress se a mesma importação já estiver rodando neste processo e
+    SourceError se a origem falhar (nada é gravado nesse caso).
+    """
+    model, key, source, after = IMPORTERS[name]
+    lock = _locks[name]
+    if not lock.acquire(blocking=False):
+        raise ImportInProgress(f"Importação '{name}' já em andamento")
+    try:
+        summary = import_rows(model, key, source())
+        if after is not None:
+            summary.update(after())
+        db.session.commit()
+        return summary
+    except Exception:
+        db.session.rollback()
+        raise
+    finally:
+        lock.release()
+
+
+@click.command("import-reference")
+@click.argument("names", nargs=-1, type=click.Choice(sorted(IMPORTERS)))
+@with_appcontext
+def import_reference_command(names):
+    """Importa dados de referência da PokéAPI (padrão: todos)."""
+    for name in names or sorted(IMPORTERS):
+        try:
+            summary = run_import(name)
+        except (SourceError, ImportInProgress) as exc:
+            raise click.ClickException(f"{name}: {exc}")
+        click.echo(f"[{name}]")
+        for key, value in summary.items():
+            click.echo(f"{key}: {value}")
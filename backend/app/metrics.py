@@ -0,0 +1,264 @@
+"""Métricas do caminho quente no formato de exposição do Prometheus (/api/metrics).
+
+- Latência por rota (histograma), com o tempo gasto no banco e na PokéAPI dentro de cada
+  requisição, para separar "página lenta" em cache miss, PokéAPI ou SQLite;
+- latência e status das chamadas à PokéAPI por rota (upstream.py);
+- consultas ao banco por requisição (eventos do SQLAlchemy);
+- cache por classe de chave (hit/stale/miss/evicção), lido do próprio cache na coleta.
+
+Registrar uma observação é um bisect e uma soma sob lock; a formatação do texto só
+acontece quando o /api/metrics é lido. Os valores são por worker (processo).
+"""
+import logging
+import random
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, label_names: Labels = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_labels(self.label_names, labels)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, label_names: Labels = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        # labels -> [contagem por bucket (não cumulativa) + overflow, soma, total]
+        self._series: Dict[Labels, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Labels, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((labels, ([*s[0]], s[1], s[2])) for labels, s in self._series.items())
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, float("inf")), counts):
+                cumulative += bucket_count
+                le = f'le="{_number(float(bound))}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {count}")
+        return lines
+
+
+def _gauge(name: str, help_text: str, samples: Iterable[Tuple[Dict[str, str], float]]) -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+    for labels, value in samples:
+        lines.append(f"{name}{_labels(labels.keys(), labels.values())} {_number(value)}")
+    return lines
+
+
+def upstream_route(path: str) -> str:
+    """/pokemon/pikachu -> /pokemon/:name (sem explodir a cardinalidade dos rótulos)"""
+    parts = [p for p in path.split("?", 1)[0].split("/") if p]
+    if "v2" in parts:
+        parts = parts[parts.index("v2") + 1:]
+    if not parts:
+        return "/"
+    return "/" + parts[0] + ("/:name" if len(parts) > 1 else "")
+
+
+class Metrics:
+    def __init__(self, enabled: bool = True, log_sample_rate: float = 0.01):
+        self.enabled = enabled
+        self.log_sample_rate = log_sample_rate
+        self.requests = Histogram("pokedex_http_request_duration_seconds",
+                                  "Latência das requisições por rota", ("method", "endpoint", "status"))
+        self.request_db_queries = Histogram("pokedex_http_request_db_queries",
+                                            "Consultas ao banco por requisição", ("endpoint",),
+                                            QUERY_COUNT_BUCKETS)
+        self.request_db_seconds = Counter("pokedex_http_request_db_seconds_total",
+                                          "Tempo no banco dentro das requisições, por rota", ("endpoint",))
+        self.request_upstream_seconds = Counter("pokedex_http_request_upstream_seconds_total",
+                                                "Tempo esperando a PokéAPI dentro das requisições, por rota",
+                                                ("endpoint",))
+        self.upstream = Histogram("pokedex_upstream_request_duration_seconds",
+                                  "Latência das chamadas à PokéAPI (cada tentativa)", ("route", "status"))
+        self.db_queries = Counter("pokedex_db_queries_total", "Consultas executadas no banco")
+
+    def init_app(self, app, engine) -> None:
+        self.enabled = app.config.get("METRICS_ENABLED", self.enabled)
+        self.log_sample_rate = app.config.get("LOG_SAMPLE_RATE", self.log_sample_rate)
+        app.extensions["metrics"] = self
+        if not self.enabled:
+            return
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        # Exceções que escapam do after_request (propagadas, ou falha no próprio
+        # processamento da resposta) entram como 500 no teardown
+        app.teardown_request(self._teardown_request)
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    # ------------------------------------------------------------------ requisições
+    def _before_request(self) -> None:
+        g.metrics_started = time.perf_counter()
+        g.metrics_db_queries = 0
+        g.metrics_db_seconds = 0.0
+        g.metrics_upstream_seconds = 0.0
+
+    def _after_request(self, response):
+        self._record(response.status_code)
+        return response
+
+    def _teardown_request(self, exc) -> None:
+        if exc is not None:
+            self._record(500)
+
+    def _record(self, status: int) -> None:
+        started = g.pop("metrics_started", None)
+        if started is None:  # sem before_request ou já registrada
+            return
+        endpoint = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        self.requests.observe((request.method, endpoint, str(status)), time.perf_counter() - started)
+        self.request_db_queries.observe((endpoint,), g.metrics_db_queries)
+        if g.metrics_db_seconds:
+            self.request_db_seconds.inc((endpoint,), g.metrics_db_seconds)
+        if g.metrics_upstream_seconds:
+            self.request_upstream_seconds.inc((endpoint,), g.metrics_upstream_seconds)
+
+    # ------------------------------------------------------------------ banco
+    # O início fica no contexto de execução (um por comando): um comando que falha não
+    # chega ao after_cursor_execute e não deixa nada para trás na conexão
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._metrics_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_metrics_started", None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        self.db_queries.inc()
+        if has_request_context() and "metrics_started" in g:
+            g.metrics_db_queries += 1
+            g.metrics_db_seconds += elapsed
+
+    # ------------------------------------------------------------------ PokéAPI
+    def observe_upstream(self, path: str, status: Optional[int], seconds: float) -> None:
+        if not self.enabled:
+            return
+        self.upstream.observe((upstream_route(path), str(status) if status else "error"), seconds)
+        if has_request_context() and "metrics_started" in g:
+            g.metrics_upstream_seconds += seconds
+
+    # ------------------------------------------------------------------ log amostrado
+    def debug_sampled(self, logger: logging.Logger, msg: str, *args) -> None:
+        """Log de depuração do caminho quente: só formata se DEBUG estiver ativo e na amostra"""
+        if logger.isEnabledFor(logging.DEBUG) and random.random() < self.log_sample_rate:
+            logger.debug(msg, *args)
+
+    # ------------------------------------------------------------------ exposição
+    def render(self) -> str:
+        from .cache import cache
+        from .cache_store import disk_cache
+        from .singleflight import flights
+        from .upstream import upstream
+
+        lines: List[str] = []
+        for metric in (self.requests, self.request_db_queries, self.request_db_seconds,
+                       self.request_upstream_seconds, self.upstream, self.db_queries):
+            lines.extend(metric.render())
+
+        stats = cache.stats()
+        by_class = stats["by_class"]
+        lookups = Counter("pokedex_cache_lookups_total", "Consultas ao cache em memória por classe de chave",
+                          ("class", "result"))
+        removals = Counter("pokedex_cache_removals_total", "Entradas removidas do cache por classe de chave",
+                           ("class", "reason"))
+        for klass, counts in by_class.items():
+            for result in ("hit", "stale", "miss"):
+                lookups.inc((klass, result), counts[result])
+            removals.inc((klass, "eviction"), counts["eviction"])
+            removals.inc((klass, "expiration"), counts["expiration"])
+        lines.extend(lookups.render())
+        lines.extend(removals.render())
+        lines.extend(_gauge("pokedex_cache_items", "Itens no cache em memória por classe de chave",
+                            [({"class": k}, v) for k, v in sorted(stats["breakdown"].items())]))
+        lines.extend(_gauge("pokedex_cache_bytes", "Bytes ocupados pelo cache em memória",
+                            [({}, stats["bytes"])]))
+
+        disk = disk_cache.stats()
+        if disk.get("enabled"):
+            disk_lookups = Counter("pokedex_disk_cache_lookups_total", "Consultas ao cache em disco", ("result",))
+            disk_lookups.inc(("hit",), disk.get("hits", 0))
+            disk_lookups.inc(("miss",), disk.get("misses", 0))
+            lines.extend(disk_lookups.render())
+
+        sf = flights.stats()
+        shared = Counter("pokedex_singleflight_total", "Buscas executadas (leader) e compartilhadas (shared)",
+                         ("role",))
+        shared.inc(("leader",), sf["leaders"])
+        shared.inc(("shared",), sf["shared"])
+        lines.extend(shared.render())
+
+        up = upstream.stats()
+        up_counts = Counter("pokedex_upstream_events_total", "Tentativas, novas tentativas e rejeições locais",
+                            ("event",))
+        for name in ("requests", "retries", "rejected"):
+            up_counts.inc((name,), up[name])
+        lines.extend(up_counts.render())
+        lines.extend(_gauge("pokedex_upstream_circuit_open", "Circuit breaker da PokéAPI aberto (1) ou não (0)",
+                            [({}, 0 if up["circuit"] == "closed" else 1)]))
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
@@ -0,0 +1,284 @@
+"""Migrações de esquema versionadas.
+
+Aplicadas uma vez, antes dos workers subirem (`python -m flask --app app db-upgrade` no start.sh).
+A tabela SchemaMigracao guarda as versões já aplicadas; com DB_AUTO_MIGRATE=1 (opção
+para o desenvolvimento) o create_app confere a versão com uma única consulta e só migra
+se houver pendências.
+
+A migração 1 cria as tabelas base com o esquema congelado abaixo (`_BASELINE`, não os
+modelos atuais: o histórico precisa dar o mesmo resultado hoje e daqui a um ano); as
+seguintes levam qualquer banco, novo ou antigo, ao estado dos modelos. Índices são criados sem
+perder dados (no PostgreSQL, com CREATE INDEX CONCURRENTLY, sem bloquear escritas).
+"""
+import logging
+from typing import Callable, List, Optional, Tuple
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import (
+    Boolean, Column, DateTime, ForeignKey, Index, Integer, MetaData, String, Table, UniqueConstraint,
+    delete, func, inspect, select, text, update,
+)
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from . import db
+from .models import PokemonUsuario, SchemaMigracao, Usuario
+
+logger = logging.getLogger(__name__)
+
+
+# Esquema da versão 1, congelado. Não editar: mudanças entram como novas migrações.
+_BASELINE = MetaData()
+
+Table(
+    "Usuario", _BASELINE,
+    Column("IDUsuario", Integer, primary_key=True),
+    Column("Nome", String(120), nullable=False),
+    Column("Login", String(80), nullable=False),
+    Column("Email", String(120), nullable=False),
+    Column("Senha", String(255), nullable=False),
+    Column("IsAdmin", Boolean),
+    Column("DtInclusao", DateTime),
+    Column("DtAlteracao", DateTime),
+    UniqueConstraint("Login", name="uq_usuario_login"),
+    UniqueConstraint("Email", name="uq_usuario_email"),
+    Index("ix_usuario_login", "Login"),
+    Index("ix_usuario_email", "Email"),
+)
+Table(
+    "TipoPokemon", _BASELINE,
+    Column("IDTipoPokemon", Integer, primary_key=True),
+    Column("Descricao", String(60), nullable=False),
+    UniqueConstraint("Descricao", name="uq_tipopokemon_descricao"),
+    Index("ix_tipopokemon_descricao", "Descricao"),
+)
+Table(
+    "PokemonUsuario", _BASELINE,
+    Column("IDPokemonUsuario", Integer, primary_key=True),
+    Column("IDUsuario", Integer, ForeignKey("Usuario.IDUsuario"), nullable=False),
+    Column("IDTipoPokemon", Integer, ForeignKey("TipoPokemon.IDTipoPokemon"), nullable=True),
+    Column("Codigo", String(50), nullable=False),
+    Column("ImagemUrl", String(255), nullable=True),
+    Column("Nome", String(120), nullable=False),
+    Column("GrupoBatalha", Boolean),
+    Column("Favorito", Boolean),
+    Column("DtInclusao", DateTime),
+    Column("DtAlteracao", DateTime),
+    Index("ix_pokemon_usuario_user_codigo", "IDUsuario", "Codigo"),
+    Index("ix_pokemon_usuario_user_flags", "IDUsuario", "Favorito", "GrupoBatalha"),
+)
+Table(
+    "CatalogoEspecie", _BASELINE,
+    Column("IDEspecie", Integer, primary_key=True, autoincrement=False),
+    Column("Nome", String(120), nullable=False, unique=True),
+)
+Table(
+    "CatalogoPokemon", _BASELINE,
+    Column("IDPokemon", Integer, primary_key=True, autoincrement=False),
+    Column("Nome", String(120), nullable=False, unique=True),
+    Column("Url", String(255), nullable=False),
+    Column("IDEspecie", Integer, ForeignKey("CatalogoEspecie.IDEspecie"), nullable=True, index=True),
+    Column("DtSincronizacao", DateTime),
+)
+Table(
+    "CatalogoPokemonTipo", _BASELINE,
+    Column("IDPokemon", Integer, ForeignKey("CatalogoPokemon.IDPokemon", ondelete="CASCADE"), primary_key=True),
+    Column("IDTipoPokemon", Integer, ForeignKey("TipoPokemon.IDTipoPokemon", ondelete="CASCADE"),
+           primary_key=True),
+    Column("Slot", Integer, nullable=False),
+    Index("ix_catalogo_pokemon_tipo_tipo", "IDTipoPokemon", "IDPokemon"),
+)
+Table(
+    "SchemaMigracao", _BASELINE,
+    Column("Versao", Integer, primary_key=True, autoincrement=False),
+    Column("Descricao", String(200), nullable=False),
+    Column("DtAplicacao", DateTime),
+)
+
+
+def _create_tables() -> None:
+    """Tabelas base que ainda não existirem (bancos anteriores às migrações já têm parte delas)"""
+    _BASELINE.create_all(db.engine, checkfirst=True)
+
+
+def _index_names(table_name: str) -> set:
+    return {ix["name"] for ix in inspect(db.engine).get_indexes(table_name)}
+
+
+def _create_index(model, name: str) -> None:
+    """Cria o índice declarado no modelo, se ainda não existir"""
+    table = model.__table__
+    if name in _index_names(table.name):
+        return
+    _build_index(next(ix for ix in table.indexes if ix.name == name))
+
+
+def _legacy_index(model, name: str, *columns: str, unique: bool = False) -> Index:
+    """Índice que não está mais nos modelos, declarado numa cópia da tabela"""
+    old = model.__table__.to_metadata(MetaData())
+    return Index(name, *(old.c[col] for col in columns), unique=unique)
+
+
+def _build_index(index: Index) -> None:
+    table, name = index.table, index.name
+    if db.engine.dialect.name == "postgresql":
+        # CONCURRENTLY não bloqueia escritas, mas não pode rodar dentro de transação
+        options = index.dialect_options["postgresql"]
+        options["concurrently"] = True
+        try:
+            with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                index.create(conn)
+        finally:
+            options["concurrently"] = False
+    else:
+        with db.engine.begin() as conn:
+            index.create(conn)
+    logger.warning("%s: índice %s criado", table.name, name)
+
+
+def _unique_pokemon_usuario() -> None:
+    """Troca o índice (usuário, código) não único pelo único (usuário, código, papel)"""
+    table = PokemonUsuario.__table__
+    existing = _index_names(table.name)
+    if existing & {"uq_pokemon_usuario_papel", "uq_pokemon_usuario_codigo"}:
+        return
+
+    with db.engine.begin() as conn:
+        # Mantém a linha mais antiga de cada (usuário, código, papel)
+        keep = (
+            select(func.min(table.c.IDPokemonUsuario).label("keep"))
+            .group_by(table.c.IDUsuario, table.c.Codigo, table.c.Favorito, table.c.GrupoBatalha)
+            .subquery()
+        )
+        removed = conn.execute(
+            delete(table).where(table.c.IDPokemonUsuario.not_in(select(keep.c.keep)))
+        ).rowcount
+        if "ix_pokemon_usuario_user_codigo" in existing:
+            _legacy_index(PokemonUsuario, "ix_pokemon_usuario_user_codigo", "IDUsuario", "Codigo").drop(conn)
+    logger.warning("PokemonUsuario: %s duplicados removidos", removed)
+    # A migração 5 troca este índice pelo de (usuário, código)
+    _build_index(_legacy_index(PokemonUsuario, "uq_pokemon_usuario_papel",
+                               "IDUsuario", "Codigo", "Favorito", "GrupoBatalha", unique=True))
+
+
+def _pokemon_usuario_por_codigo() -> None:
+    """Junta as linhas de um mesmo (usuário, código) numa só, com os dois papéis.
+
+    Com o índice por papel, o mesmo Pokémon podia existir como favorito e como integrante
+    da equipe em linhas separadas. Fica a linha mais antiga, com Favorito/GrupoBatalha
+    somados (OU) das demais. Códigos são comparados sem espaços nas pontas e sem
+    diferenciar maiúsculas ("Pikachu" = "pikachu") e gravados nessa forma, como as rotas.
+    """
+    table = PokemonUsuario.__table__
+    existing = _index_names(table.name)
+    if "uq_pokemon_usuario_codigo" in existing:
+        return
+
+    normalized = func.lower(func.trim(table.c.Codigo))
+    with db.engine.begin() as conn:
+        groups = (
+            select(table.c.IDUsuario, normalized.label("codigo"))
+            .group_by(table.c.IDUsuario, normalized)
+            .having(func.count() > 1)
+            .subquery()
+        )
+        rows = conn.execute(
+            select(table.c.IDPokemonUsuario, table.c.IDUsuario, normalized.label("codigo"),
+                   table.c.Favorito, table.c.GrupoBatalha)
+            .join(groups, (table.c.IDUsuario == groups.c.IDUsuario) & (normalized == groups.c.codigo))
+            .order_by(table.c.IDPokemonUsuario)
+        ).all()
+        merged = {}
+        for row in rows:
+            key = (row.IDUsuario, row.codigo)
+            keep = merged.setdefault(key, {"id": row.IDPokemonUsuario, "fav": False, "team": False, "drop": []})
+            keep["fav"] = keep["fav"] or bool(row.Favorito)
+            keep["team"] = keep["team"] or bool(row.GrupoBatalha)
+            if row.IDPokemonUsuario != keep["id"]:
+                keep["drop"].append(row.IDPokemonUsuario)
+        removed = 0
+        for keep in merged.values():
+            removed += conn.execute(
+                delete(table).where(table.c.IDPokemonUsuario.in_(keep["drop"]))
+            ).rowcount
+            conn.execute(
+                update(table).where(table.c.IDPokemonUsuario == keep["id"])
+                .values(Favorito=keep["fav"], GrupoBatalha=keep["team"])
+            )
+        conn.execute(update(table).where(table.c.Codigo != normalized).values(Codigo=normalized))
+        if "uq_pokemon_usuario_papel" in existing:
+            _legacy_index(PokemonUsuario, "uq_pokemon_usuario_papel",
+                          "IDUsuario", "Codigo", "Favorito", "GrupoBatalha", unique=True).drop(conn)
+    logger.warning("PokemonUsuario: %s linhas juntadas por código", removed)
+    _create_index(PokemonUsuario, "uq_pokemon_usuario_codigo")
+
+
+def _usuario_token_versao() -> None:
+    """Coluna TokenVersao (revogação de tokens) em bancos criados antes dela"""
+    table = Usuario.__table__
+    if "TokenVersao" in {col["name"] for col in inspect(db.engine).get_columns(table.name)}:
+        return
+    quote = db.engine.dialect.identifier_preparer.quote
+    with db.engine.begin() as conn:
+        conn.execute(text(
+            f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote('TokenVersao')} INTEGER NOT NULL DEFAULT 0"
+        ))
+    logger.warning("Usuario: coluna TokenVersao criada")
+
+
+# (versão, descrição, passo). Novas migrações entram sempre no fim, com a próxima versão.
+MIGRATIONS: List[Tuple[int, str, Callable[[], None]]] = [
+    (1, "Tabelas base", _create_tables),
+    (2, "Índice único (usuário, código, papel) em PokemonUsuario", _unique_pokemon_usuario),
+    (3, "Coluna Usuario.TokenVersao", _usuario_token_versao),
+    (4, "Índice de paginação ix_usuario_dtinclusao_id", lambda: _create_index(Usuario, "ix_usuario_dtinclusao_id")),
+    (5, "Um registro por (usuário, código) em PokemonUsuario", _pokemon_usuario_por_codigo),
+]
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version() -> Optional[int]:
+    """Última versão aplicada (None em banco sem a tabela de controle)"""
+    try:
+        return db.session.scalar(select(func.max(SchemaMigracao.Versao))) or 0
+    except (OperationalError, ProgrammingError):
+        db.session.rollback()
+        return None
+
+
+def upgrade() -> List[int]:
+    """Aplica as migrações pendentes, em ordem, registrando cada uma. Retorna as aplicadas."""
+    applied = []
+    version = current_version() or 0
+    for number, description, step in MIGRATIONS:
+        if number <= version:
+            continue
+        step()
+        db.session.add(SchemaMigracao(Versao=number, Descricao=description))
+        db.session.commit()
+        applied.append(number)
+        logger.warning("Migração %s aplicada: %s", number, description)
+    return applied
+
+
+def ensure_current() -> None:
+    """Para o create_app: uma consulta quando o banco já está atualizado"""
+    version = current_version()
+    if version is None or version < LATEST_VERSION:
+        upgrade()
+
+
+@click.command("db-upgrade")
+@click.option("--status", is_flag=True, help="Só mostra a versão atual e as migrações pendentes.")
+@with_appcontext
+def db_upgrade_command(status: bool):
+    """Aplica as migrações de esquema pendentes."""
+    version = current_version() or 0
+    if status:
+        click.echo(f"versão atual: {version} (última: {LATEST_VERSION})")
+        for number, description, _ in MIGRATIONS:
+            if number > version:
+                click.echo(f"pendente: {number} - {description}")
+        return
+    applied = upgrade()
+    click.echo(f"migrações aplicadas: {applied or 'nenhuma'} (versão {LATEST_VERSION})")
@@ -12,6 +12,8 @@ class Usuario(db.Model):
         db.UniqueConstraint("Email", name="uq_usuario_email"),
         db.Index("ix_usuario_login", "Login"),
         db.Index("ix_usuario_email", "Email"),
+        # Paginação por cursor na listagem de usuários (ordem DtInclusao, IDUsuario)
+        db.Index("ix_usuario_dtinclusao_id", "DtInclusao", "IDUsuario"),
     )
 
     IDUsuario: Mapped[int] = mapped_column(Integer, primary_key=True)
@@ -20,6 +22,8 @@ class Usuario(db.Model):
     Email: Mapped[str] = mapped_column(String(120), unique=True, nullable=False)
     Senha: Mapped[str] = mapped_column(String(255), nullable=False)
     IsAdmin: Mapped[bool] = mapped_column(Boolean, default=False)
+    # Incrementada para revogar os tokens já emitidos (troca de senha, mudança de perfil)
+    TokenVersao: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
     DtInclusao: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     DtAlteracao: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
@@ -49,15 +53,73 @@ class TipoPokemon(db.Model):
         return f"<TipoPokemon id={self.IDTipoPokemon} desc={self.Descricao}>"
 
 
+class CatalogoEspecie(db.Model):
+    """Espécies da PokéAPI (cópia local sincronizada por `flask sync-catalog`)"""
+    __tablename__ = "CatalogoEspecie"
+
+    IDEspecie: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    Nome: Mapped[str] = mapped_column(String(120), unique=True, nullable=False)
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"<CatalogoEspecie id={self.IDEspecie} nome={self.Nome}>"
+
+
+class CatalogoPokemon(db.Model):
+    """Pokémon e formas da PokéAPI; IDPokemon é o id nacional (formas a partir de 10001)"""
+    __tablename__ = "CatalogoPokemon"
+
+    IDPokemon: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    Nome: Mapped[str] = mapped_column(String(120), unique=True, nullable=False)
+    Url: Mapped[str] = mapped_column(String(255), nullable=False)
+    IDEspecie: Mapped[int | None] = mapped_column(
+        ForeignKey("CatalogoEspecie.IDEspecie"), nullable=True, index=True
+    )
+    DtSincronizacao: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"<CatalogoPokemon id={self.IDPokemon} nome={self.Nome}>"
+
+
+class CatalogoPokemonTipo(db.Model):
+    """Pertinência Pokémon × tipo (slot 1 = tipo primário)"""
+    __tablename__ = "CatalogoPokemonTipo"
+    __table_args__ = (
+        db.Index("ix_catalogo_pokemon_tipo_tipo", "IDTipoPokemon", "IDPokemon"),
+    )
+
+    IDPokemon: Mapped[int] = mapped_column(
+        ForeignKey("CatalogoPokemon.IDPokemon", ondelete="CASCADE"), primary_key=True
+    )
+    IDTipoPokemon: Mapped[int] = mapped_column(
+        ForeignKey("TipoPokemon.IDTipoPokemon", ondelete="CASCADE"), primary_key=True
+    )
+    Slot: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"<CatalogoPokemonTipo pokemon={self.IDPokemon} tipo={self.IDTipoPokemon} slot={self.Slot}>"
+
+
+class SchemaMigracao(db.Model):
+    """Migrações de esquema já aplicadas (ver migrations.py)"""
+    __tablename__ = "SchemaMigracao"
+
+    Versao: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    Descricao: Mapped[str] = mapped_column(String(200), nullable=False)
+    DtAplicacao: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"<SchemaMigracao versao={self.Versao}>"
+
+
 class PokemonUsuario(db.Model):
     __tablename__ = "PokemonUsuario"
     __table_args__ = (
-        # Um mesmo usuário não deve ter duplicado o mesmo Código com o mesmo papel
+        # Uma linha por Código e usuário; os papéis (Favorito/GrupoBatalha) são flags dela
         db.Index(
-            "ix_pokemon_usuario_user_codigo",
+            "uq_pokemon_usuario_codigo",
             "IDUsuario",
             "Codigo",
-            unique=False,
+            unique=True,
         ),
         db.Index(
             "ix_pokemon_usuario_user_flags",
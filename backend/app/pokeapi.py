@@ -1,84 +1,175 @@
+import logging
+import os
+
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from flask import Blueprint, jsonify, request, current_app
 from flask_jwt_extended import jwt_required
-from datetime import datetime, timedelta
-from typing import Dict, Tuple, Optional
+from typing import Callable, Dict, List, Tuple, Optional
+
+# OTIMIZAÇÃO: Cache em memória limitado (LRU + TTL por classe de chave), ver cache.py
+from .cache import cache as _cache, key_class
+# OTIMIZAÇÃO: Segundo nível em disco, compartilhado entre workers e restarts (cache_store.py)
+from .cache_store import disk_cache as _disk_cache
+# OTIMIZAÇÃO: Misses simultâneos da mesma chave fazem uma única chamada à PokéAPI
+from .singleflight import flights as _flights
+# OTIMIZAÇÃO: Valores vencidos são servidos na hora e revalidados em segundo plano
+from .refresh import refresher as _refresher
+# OTIMIZAÇÃO: Métricas em memória (Prometheus em /api/metrics) e log de depuração amostrado
+from .metrics import metrics as _metrics
+# OTIMIZAÇÃO: Aquecimento no boot e snapshot do cache entre deploys
+from .warmup import warmer as _warmer
+# OTIMIZAÇÃO: Cliente com pool keep-alive, retry/backoff, limite de taxa e circuit breaker
+from .upstream import upstream as _upstream, UpstreamUnavailable
+# OTIMIZAÇÃO: Com o catálogo sincronizado (flask sync-catalog), listas vêm do banco local
+from . import catalog
+# OTIMIZAÇÃO: Busca/filtro/paginação no servidor sobre um índice em memória
+from .search_index import GENERATION_RANGES, PokemonIndex, id_from_url, pokemon_index
+# OTIMIZAÇÃO: Tabela de efetividade entre tipos montada uma vez por worker (análise da equipe)
+from .type_chart import TypeChart, type_chart
+# OTIMIZAÇÃO: Com SERVER_MODE=async, as esperas pela PokéAPI não prendem threads (gevent)
+from .serving import server_mode
+# OTIMIZAÇÃO: Respostas serializadas/comprimidas uma vez, com ETag e GET condicional
+from .http_cache import DEFAULT_MAX_AGE, MAX_AGE_BY_CLASS, EncodedResponse, encoded_response, json_response
 
 poke_bp = Blueprint("poke", __name__)
+logger = logging.getLogger(__name__)
+
+# OTIMIZAÇÃO: Pool limitado de threads para buscar detalhes em paralelo (/pokemon/batch)
+BATCH_MAX_NAMES = 100
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_pid: Optional[int] = None
 
-BASE_URL = "https://pokeapi.co/api/v2"
 
-# OTIMIZAÇÃO: Cache em memória com TTL de 1 hora
-CACHE_TTL_SECONDS = 3600  # 1 hora
-_cache: Dict[str, Tuple[dict, datetime]] = {}
+def _get_executor() -> ThreadPoolExecutor:
+    """Cria o pool sob demanda (após o fork do gunicorn, um por worker)"""
+    global _executor, _executor_pid
+    # Um pool criado no master (aquecimento com --preload) não tem threads no worker
+    if _executor is None or _executor_pid != os.getpid():
+        max_workers = current_app.config.get("POKEAPI_MAX_WORKERS", 8)
+        _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pokeapi")
+        _executor_pid = os.getpid()
+    return _executor
 
 
 def get_from_cache(key: str) -> Optional[dict]:
-    """Recupera dados do cache se ainda estiverem válidos"""
-    if key in _cache:
-        data, timestamp = _cache[key]
-        if datetime.now() - timestamp < timedelta(seconds=CACHE_TTL_SECONDS):
-            try:
-                current_app.logger.info(f"✅ Cache HIT: {key}")
-            except Exception:
-                pass
-            return data
-        else:
-            # Cache expirado, remove
-            del _cache[key]
-            try:
-                current_app.logger.info(f"⏰ Cache EXPIRED: {key}")
-            except Exception:
-                pass
-    return None
+    """Recupera dados do cache (memória, depois disco).
 
+    Entre o TTL soft e o hard o valor stale é devolvido e a chave é revalidada
+    em segundo plano, sem o usuário esperar pela PokéAPI.
+    """
+    data, stale = _cache.lookup(key)
+    if data is None:
+        stored = _disk_cache.get(key)
+        if stored is not None:
+            data, fresh_left, hard_left = stored
+            # Promove para a memória mantendo os prazos originais
+            _cache.set(key, data, fresh_left, hard_left - fresh_left, encoded=_encode_variants(key, data))
+            stale = fresh_left <= 0
+            _metrics.debug_sampled(logger, "Cache HIT (disco): %s", key)
+    elif not stale:
+        _metrics.debug_sampled(logger, "Cache HIT: %s", key)
 
-def save_to_cache(key: str, data: dict):
-    """Salva dados no cache com timestamp"""
-    _cache[key] = (data, datetime.now())
-    try:
-        current_app.logger.info(f"💾 Cache SAVED: {key} (total cached: {len(_cache)})")
-    except Exception:
-        pass
+    if data is not None and stale:
+        _refresher.schedule(key)
+        _metrics.debug_sampled(logger, "Cache STALE (revalidando): %s", key)
+    return data
+
+
+def save_to_cache(key: str, data: dict, ttl: Optional[int] = None):
+    """Salva dados no cache (TTL definido pela classe da chave, salvo se informado)"""
+    if ttl is None:
+        ttl = _cache.ttl_for(key)
+    stale = _cache.stale_for(key)
+    _cache.set(key, data, ttl, stale, encoded=_encode_variants(key, data))
+    _disk_cache.set(key, data, ttl, stale)
+    _metrics.debug_sampled(logger, "Cache SAVED: %s", key)
+
+
+# Classes que nunca são servidas como estão: negativas e as partes de /pokemon/<nome>/full
+UNSERVED_CLASSES = ("negative", "species", "evolution_chain")
+
+
+def _encode_variants(key: str, data: dict) -> Optional[Dict[str, EncodedResponse]]:
+    """Serializa as respostas servidas a partir da chave"""
+    klass = key_class(key)
+    if klass in UNSERVED_CLASSES:
+        return None
+    variants = {"full": EncodedResponse.encode(data)}
+    if klass == "pokemon_detail":
+        variants["card"] = EncodedResponse.encode(_select_fields(data, DETAIL_VIEWS["card"]))
+    return variants
+
+
+def _respond(key: str, data: dict, status: int, variant: str = "full"):
+    """Resposta de uma chave do cache: hits reaproveitam os bytes prontos (e o ETag)"""
+    if status != 200:
+        return jsonify(data), status
+    encoded = _cache.encoded(key, variant, data)
+    if encoded is None:
+        fields = DETAIL_VIEWS.get(variant, DETAIL_FIELDS)
+        encoded = EncodedResponse.encode(data if variant == "full" else _select_fields(data, fields))
+    return encoded_response(encoded, MAX_AGE_BY_CLASS.get(key_class(key), DEFAULT_MAX_AGE))
+
+
+def cached_fetch(key: str, fetch: Callable[[], Tuple[dict, int]]) -> Tuple[dict, int]:
+    """Cache primeiro; no miss, uma única busca por chave (single-flight) compartilhada
+    entre as requisições concorrentes, inclusive erros e exceções."""
+    cached_data = get_from_cache(key)
+    if cached_data is not None:
+        return cached_data, 200
+    return _flights.do(key, fetch)
+
+
+@poke_bp.errorhandler(requests.RequestException)
+def upstream_error(exc: requests.RequestException):
+    return jsonify({"msg": f"Falha ao consultar a PokéAPI: {exc}"}), 502
+
+
+@poke_bp.errorhandler(UpstreamUnavailable)
+def upstream_unavailable(exc: UpstreamUnavailable):
+    resp = jsonify({"msg": str(exc)})
+    if exc.retry_after:
+        resp.headers["Retry-After"] = str(int(exc.retry_after) + 1)
+    return resp, 503
+
+
+@poke_bp.errorhandler(TimeoutError)
+def upstream_wait_timeout(exc: TimeoutError):
+    return jsonify({"msg": str(exc)}), 504
 
 
 @poke_bp.get("/cache/stats")
 @jwt_required(optional=True)
 def cache_stats():
     """Retorna estatísticas do cache (útil para debugging)"""
-    total = len(_cache)
-    types = {
-        "pokemon_detail": 0,
-        "pokemon_list": 0,
-        "type_detail": 0,
-        "type_list": 0,
-        "other": 0
-    }
-
-    for key in _cache.keys():
-        if key.startswith("pokemon_detail_"):
-            types["pokemon_detail"] += 1
-        elif key.startswith("pokemon_list_"):
-            types["pokemon_list"] += 1
-        elif key.startswith("type_detail_"):
-            types["type_detail"] += 1
-        elif key == "type_list":
-            types["type_list"] += 1
-        else:
-            types["other"] += 1
-
+    stats = _cache.stats()
     return jsonify({
-        "total_cached_items": total,
-        "cache_ttl_seconds": CACHE_TTL_SECONDS,
-        "breakdown": types
+        "total_cached_items": stats["items"],
+        "cache_ttl_seconds": stats["ttl_seconds"],
+        **stats,
+        "disk": _disk_cache.stats(),
+        "single_flight": _flights.stats(),
+        "refresh": _refresher.stats(),
+        "upstream": _upstream.stats(),
+        "warmup": _warmer.stats(),
+        "sprites": _sprite_stats(),
+        "server_mode": server_mode(),
     }), 200
 
 
+def _sprite_stats() -> dict:
+    from .sprites import sprite_store  # sprites importa este módulo
+    return sprite_store.stats()
+
+
 @poke_bp.post("/cache/clear")
 @jwt_required()
 def clear_cache():
     """Limpa todo o cache (requer autenticação)"""
     _cache.clear()
+    _disk_cache.clear()
+    type_chart.invalidate()
     return jsonify({"msg": "Cache limpo com sucesso"}), 200
 
 
@@ -93,88 +184,624 @@ def list_pokemon():
         offset = int(request.args.get("offset", 0))
     except (TypeError, ValueError):
         offset = 0
+    if limit < 1:
+        limit = 24
+    if offset < 0:
+        offset = 0
+
+    local = catalog.list_pokemon(limit, offset)
+    if local is not None:
+        return json_response(local, MAX_AGE_BY_CLASS["pokemon_list"])
+
     # Limite máximo da PokéAPI é 1000 por requisição
     if limit > 1000:
         limit = 1000
-    if offset < 0:
-        offset = 0
+    data, status = fetch_pokemon_list(limit, offset)
+    return _respond(f"pokemon_list_{limit}_{offset}", data, status)
 
+
+def fetch_pokemon_list(limit: int, offset: int) -> Tuple[dict, int]:
     # OTIMIZAÇÃO: Verifica cache primeiro
     cache_key = f"pokemon_list_{limit}_{offset}"
-    cached_data = get_from_cache(cache_key)
-    if cached_data:
-        return jsonify(cached_data), 200
+    return cached_fetch(cache_key, lambda: _fetch_pokemon_list(cache_key, limit, offset))
+
 
+def _fetch_pokemon_list(cache_key: str, limit: int, offset: int) -> Tuple[dict, int]:
     # Tenta com uma sequência de limites até obter sucesso
     for candidate in [limit, 1000, 500, 200, 100, 50, 20, 10]:
         params = {"limit": candidate, "offset": offset}
-        resp = requests.get(f"{BASE_URL}/pokemon", params=params, timeout=20)
-        try:
-            current_app.logger.info("/pokemon params=%s status=%s", params, resp.status_code)
-        except Exception:
-            pass
+        resp = _upstream.get("/pokemon", params=params, timeout=20)
+        _metrics.debug_sampled(logger, "/pokemon params=%s status=%s", params, resp.status_code)
         if resp.status_code == 200:
             data = resp.json()
             # OTIMIZAÇÃO: Salva no cache
             save_to_cache(cache_key, data)
-            return jsonify(data), 200
+            return data, 200
         if resp.status_code not in (422, 400):
             # Erro diferente de validação: devolve como veio
-            return jsonify(resp.json()), resp.status_code
+            return _error_payload(resp), resp.status_code
 
     # Se chegou aqui, todos retornaram 422/400. Devolve payload seguro.
-    return jsonify({"count": 0, "next": None, "previous": None, "results": []}), 200
+    return {"count": 0, "next": None, "previous": None, "results": []}, 200
+
+
+def _error_payload(resp: requests.Response) -> dict:
+    """Extrai o corpo de erro da PokéAPI (que nem sempre é JSON, ex.: 404 'Not Found')"""
+    try:
+        return resp.json()
+    except ValueError:
+        return {"msg": resp.text}
+
+
+# OTIMIZAÇÃO: Representação compacta do detalhe. O payload bruto da PokéAPI tem centenas
+# de KB por causa de "moves" e "game_indices"; guardamos apenas o que a aplicação usa.
+DETAIL_FIELDS = (
+    "id", "name", "height", "weight", "base_experience",
+    "species", "types", "abilities", "stats", "sprites",
+)
+DETAIL_VIEWS = {
+    "card": ("id", "name", "types", "sprites", "stats"),
+    "full": DETAIL_FIELDS,
+}
+
+
+def _named(ref: Optional[dict], with_url: bool = True) -> dict:
+    ref = ref or {}
+    return {"name": ref.get("name"), "url": ref.get("url")} if with_url else {"name": ref.get("name")}
+
+
+def _project_pokemon(raw: dict) -> dict:
+    """Monta o registro compacto (mesmo formato da PokéAPI para os campos mantidos)"""
+    sprites = raw.get("sprites") or {}
+    artwork = ((sprites.get("other") or {}).get("official-artwork") or {})
+    return {
+        "id": raw.get("id"),
+        "name": raw.get("name"),
+        "height": raw.get("height"),
+        "weight": raw.get("weight"),
+        "base_experience": raw.get("base_experience"),
+        "species": _named(raw.get("species")),
+        "types": [
+            {"slot": t.get("slot"), "type": _named(t.get("type"))}
+            for t in raw.get("types", [])
+        ],
+        "abilities": [
+            {"slot": a.get("slot"), "is_hidden": a.get("is_hidden"), "ability": _named(a.get("ability"), False)}
+            for a in raw.get("abilities", [])
+        ],
+        "stats": [
+            {"base_stat": st.get("base_stat"), "effort": st.get("effort"), "stat": _named(st.get("stat"), False)}
+            for st in raw.get("stats", [])
+        ],
+        "sprites": {
+            "front_default": sprites.get("front_default"),
+            "front_shiny": sprites.get("front_shiny"),
+            "back_default": sprites.get("back_default"),
+            "other": {"official-artwork": {"front_default": artwork.get("front_default")}},
+        },
+    }
+
+
+def _requested_fields() -> Tuple[Optional[Tuple[str, ...]], Optional[str]]:
+    """Lê ?fields=a,b ou ?view=card|full. Retorna (campos, mensagem de erro)"""
+    fields = request.args.get("fields")
+    if fields:
+        selected = tuple(f.strip() for f in fields.split(",") if f.strip())
+        unknown = [f for f in selected if f not in DETAIL_FIELDS]
+        if unknown:
+            return None, f"Campos inválidos: {', '.join(unknown)}. Disponíveis: {', '.join(DETAIL_FIELDS)}"
+        return selected, None
+    view = request.args.get("view", "full")
+    if view not in DETAIL_VIEWS:
+        return None, f"view inválida: {view}. Use {' ou '.join(DETAIL_VIEWS)}"
+    return DETAIL_VIEWS[view], None
+
+
+def _select_fields(data: dict, fields: Tuple[str, ...]) -> dict:
+    if fields is DETAIL_FIELDS:
+        return data
+    return {f: data.get(f) for f in fields}
+
+
+def fetch_pokemon_detail(name: str) -> Tuple[dict, int]:
+    """Detalhe compacto (cache ou PokéAPI). Pode rodar fora do contexto da app."""
+    # OTIMIZAÇÃO: Nomes inexistentes ficam em cache negativo (TTL curto)
+    not_found = get_from_cache(f"notfound_pokemon_detail_{name}")
+    if not_found is not None:
+        return not_found, 404
+    return cached_fetch(f"pokemon_detail_{name}", lambda: _fetch_pokemon_detail(name))
+
+
+def _fetch_pokemon_detail(name: str) -> Tuple[dict, int]:
+    resp = _upstream.get(f"/pokemon/{name}", timeout=15)
+    if resp.status_code == 200:
+        # OTIMIZAÇÃO: Projeta uma única vez e guarda no cache só a versão compacta
+        data = _project_pokemon(resp.json())
+        save_to_cache(f"pokemon_detail_{name}", data)
+        return data, 200
+    error = _error_payload(resp)
+    if resp.status_code == 404:
+        save_to_cache(f"notfound_pokemon_detail_{name}", error)
+    return error, resp.status_code
 
 
 @poke_bp.get("/pokemon/<name>")
 @jwt_required(optional=True)
 def pokemon_detail(name: str):
+    fields, error = _requested_fields()
+    if error:
+        return jsonify({"msg": error}), 400
+
     # OTIMIZAÇÃO: Verifica cache primeiro (mais importante - detalhes individuais)
-    cache_key = f"pokemon_detail_{name}"
-    cached_data = get_from_cache(cache_key)
-    if cached_data:
-        return jsonify(cached_data), 200
+    data, status = fetch_pokemon_detail(name)
+    for variant, view_fields in DETAIL_VIEWS.items():
+        if fields is view_fields:
+            return _respond(f"pokemon_detail_{name}", data, status, variant)
+    if status == 200:
+        return json_response(_select_fields(data, fields), MAX_AGE_BY_CLASS["pokemon_detail"])
+    return jsonify(data), status
+
+
+# ---------------------------------------------------------------- espécie e evolução
+def _by_language(entries: Optional[list], field: str) -> Dict[str, str]:
+    """Último texto de cada idioma (as entradas vêm em ordem de versão do jogo)"""
+    texts = {}
+    for entry in entries or []:
+        language = (entry.get("language") or {}).get("name")
+        if language and entry.get(field):
+            texts[language] = " ".join(entry[field].split())
+    return texts
+
+
+def _project_species(raw: dict) -> dict:
+    def name_of(field: str) -> Optional[str]:
+        return (raw.get(field) or {}).get("name")
+
+    return {
+        "id": raw.get("id"),
+        "name": raw.get("name"),
+        "generation": name_of("generation"),
+        "genus": _by_language(raw.get("genera"), "genus"),
+        "flavor_text": _by_language(raw.get("flavor_text_entries"), "flavor_text"),
+        "is_baby": raw.get("is_baby"),
+        "is_legendary": raw.get("is_legendary"),
+        "is_mythical": raw.get("is_mythical"),
+        "color": name_of("color"),
+        "habitat": name_of("habitat"),
+        "shape": name_of("shape"),
+        "evolves_from": name_of("evolves_from_species"),
+        # Só a referência: a cadeia é um objeto compartilhado pela família (evolution_chain_<id>)
+        "evolution_chain_id": id_from_url((raw.get("evolution_chain") or {}).get("url")),
+        "varieties": [
+            {"name": (v.get("pokemon") or {}).get("name"), "is_default": v.get("is_default")}
+            for v in raw.get("varieties", [])
+        ],
+    }
+
+
+def fetch_species(name: str) -> Tuple[dict, int]:
+    """Espécie compacta (cache ou PokéAPI). Pode rodar fora do contexto da app."""
+    not_found = get_from_cache(f"notfound_species_{name}")
+    if not_found is not None:
+        return not_found, 404
+    return cached_fetch(f"species_{name}", lambda: _fetch_species(name))
 
-    resp = requests.get(f"{BASE_URL}/pokemon/{name}", timeout=15)
+
+def _fetch_species(name: str) -> Tuple[dict, int]:
+    resp = _upstream.get(f"/pokemon-species/{name}", timeout=15)
     if resp.status_code == 200:
-        data = resp.json()
-        # OTIMIZAÇÃO: Salva no cache
-        save_to_cache(cache_key, data)
-        return jsonify(data), 200
-    return jsonify(resp.json()), resp.status_code
+        data = _project_species(resp.json())
+        save_to_cache(f"species_{name}", data)
+        return data, 200
+    error = _error_payload(resp)
+    if resp.status_code == 404:
+        save_to_cache(f"notfound_species_{name}", error)
+    return error, resp.status_code
+
+
+def _evolution_details(details: list) -> List[dict]:
+    """Condições de evolução sem os campos vazios ({"trigger": "level-up", "min_level": 16})"""
+    compact = []
+    for d in details or []:
+        compact.append({
+            k: (v.get("name") if isinstance(v, dict) else v)
+            for k, v in d.items() if v not in (None, False, "", [])
+        })
+    return compact
+
+
+def _project_chain(raw: dict) -> dict:
+    """Cadeia como grafo: nós por espécie com pai, filhos, estágio e condições"""
+    nodes: Dict[str, dict] = {}
+    pending = [(raw.get("chain") or {}, None, 0)]
+    while pending:
+        link, parent, stage = pending.pop(0)
+        species = (link.get("species") or {}).get("name")
+        if not species:
+            continue
+        children = link.get("evolves_to") or []
+        nodes[species] = {
+            "id": id_from_url((link.get("species") or {}).get("url")),
+            "stage": stage,
+            "evolves_from": parent,
+            "evolves_to": [(c.get("species") or {}).get("name") for c in children],
+            "details": _evolution_details(link.get("evolution_details")),
+        }
+        pending.extend((child, species, stage + 1) for child in children)
+    return {"id": raw.get("id"), "root": next(iter(nodes), None), "members": list(nodes), "nodes": nodes}
+
+
+def fetch_evolution_chain(chain_id: int) -> Tuple[dict, int]:
+    """Cadeia de evolução (uma entrada por família, compartilhada por todos os membros)"""
+    return cached_fetch(f"evolution_chain_{chain_id}", lambda: _fetch_evolution_chain(chain_id))
+
+
+def _fetch_evolution_chain(chain_id: int) -> Tuple[dict, int]:
+    resp = _upstream.get(f"/evolution-chain/{chain_id}", timeout=15)
+    if resp.status_code != 200:
+        return _error_payload(resp), resp.status_code
+    data = _project_chain(resp.json())
+    # peek: comparar com a versão anterior não é uma leitura de cliente (não conta hit/miss)
+    previous = _cache.peek(f"evolution_chain_{chain_id}")
+    if previous is not None and previous != data:
+        # A família mudou: as espécies (evolves_from...) também podem ter mudado
+        invalidate_family(chain_id, previous)
+    save_to_cache(f"evolution_chain_{chain_id}", data)
+    return data, 200
+
+
+def invalidate_family(chain_id: Optional[int], chain: Optional[dict] = None) -> List[str]:
+    """Remove a cadeia e a espécie de cada membro (memória deste worker e disco).
+
+    Devolve os membros invalidados; os demais workers renovam pela própria expiração.
+    """
+    key = f"evolution_chain_{chain_id}"
+    if chain is None:
+        chain = _cache.peek(key)
+        if chain is None:
+            stored = _disk_cache.get(key)
+            chain = stored[0] if stored else {}
+    members = chain.get("members", [])
+    keys = ([key] if chain_id else []) + [k for m in members for k in (f"species_{m}", f"notfound_species_{m}")]
+    for k in keys:
+        _cache.delete(k)
+        _disk_cache.delete(k)
+    return members
+
+
+def _localized(species: dict, lang: str) -> dict:
+    """Cópia da espécie com genus/flavor_text no idioma pedido (ou em inglês)"""
+    localized = dict(species)
+    for field in ("genus", "flavor_text"):
+        texts = species.get(field) or {}
+        localized[field] = texts.get(lang) or texts.get("en")
+    return localized
+
+
+# Cache-Control de um /full com partes faltando (errors)
+DEGRADED_MAX_AGE = 5
+
+
+def _part(fn: Callable, *args) -> Tuple[Optional[dict], int]:
+    """Parte opcional do /full: falhas da PokéAPI viram o status que a rota daria sozinha"""
+    try:
+        return fn(*args)
+    except UpstreamUnavailable:
+        return None, 503
+    except TimeoutError:
+        return None, 504
+    except requests.RequestException:
+        return None, 502
+
+
+@poke_bp.get("/pokemon/<name>/full")
+@jwt_required(optional=True)
+def pokemon_full(name: str):
+    """Detalhe + espécie (geração, descrição) + cadeia de evolução em uma resposta.
+
+    Com o detalhe fora do cache, a espécie de mesmo nome (forma padrão) é buscada em
+    paralelo; a cadeia depende do id que vem na espécie. `?lang=` escolhe o idioma
+    da descrição (padrão: en). Falhas da espécie ou da cadeia aparecem em `errors`.
+    """
+    lang = request.args.get("lang", "en")
+    guess = None
+    detail = get_from_cache(f"pokemon_detail_{name}")
+    if detail is not None:
+        status = 200
+    else:
+        executor = _get_executor()
+        future = executor.submit(fetch_pokemon_detail, name)
+        if not name.isdigit():
+            guess = executor.submit(fetch_species, name)
+        detail, status = future.result()
+    if status != 200:
+        return jsonify(detail), status
+
+    errors = {}
+    species_name = (detail.get("species") or {}).get("name") or name
+    if guess and species_name == name:
+        species, species_status = _part(guess.result)
+    else:
+        species, species_status = _part(fetch_species, species_name)
+    chain = None
+    if species_status != 200:
+        errors["species"] = species_status
+        species = None
+    elif species.get("evolution_chain_id"):
+        chain, chain_status = _part(fetch_evolution_chain, species["evolution_chain_id"])
+        if chain_status != 200:
+            errors["evolution"] = chain_status
+            chain = None
+
+    result = {
+        **_select_fields(detail, DETAIL_FIELDS),
+        "species": _localized(species, lang) if species else None,
+        "evolution": chain,
+    }
+    if errors:
+        # Resposta parcial: poucos segundos de cache, para a próxima tentar completar
+        result["errors"] = errors
+        return json_response(result, DEGRADED_MAX_AGE)
+    return json_response(result, MAX_AGE_BY_CLASS["pokemon_detail"])
+
+
+@poke_bp.post("/cache/family/<name>/invalidate")
+@jwt_required()
+def invalidate_family_cache(name: str):
+    """Invalida juntas a cadeia de evolução e as espécies da família de `name` (espécie)"""
+    species, status = fetch_species(name)
+    if status != 200:
+        return jsonify(species), status
+    chain_id = species.get("evolution_chain_id")
+    chain = {"members": [name]}
+    if chain_id:
+        data, chain_status = fetch_evolution_chain(chain_id)
+        if chain_status == 200:
+            chain = data
+    members = invalidate_family(chain_id, chain)
+    return jsonify({"msg": "Família invalidada", "evolution_chain_id": chain_id, "members": members}), 200
+
+
+def _build_index() -> PokemonIndex:
+    """Monta o índice a partir do catálogo local ou, sem ele, da lista da PokéAPI"""
+    if catalog.is_ready():
+        return PokemonIndex(catalog.all_pokemon(), catalog.type_member_ids, catalog.all_type_members())
+
+    entries = []
+    offset = 0
+    while True:
+        data, status = fetch_pokemon_list(1000, offset)
+        if status != 200:
+            raise UpstreamUnavailable("Falha ao carregar a lista de Pokémon da PokéAPI")
+        results = data.get("results", [])
+        for p in results:
+            pid = id_from_url(p.get("url"))
+            if pid is not None:
+                entries.append((pid, p["name"], p["url"]))
+        offset += len(results)
+        if not results or not data.get("next") or offset >= data.get("count", 0):
+            break
+
+    def type_loader(name: str):
+        type_data, type_status = fetch_type_detail(name)
+        if type_status == 404:
+            return None
+        if type_status != 200:
+            raise UpstreamUnavailable(f"Falha ao carregar o tipo {name} da PokéAPI")
+        return {id_from_url(p["url"]) for p in type_data.get("results", [])}
+
+    return PokemonIndex(entries, type_loader)
+
+
+pokemon_index.builder = _build_index
+
+
+@poke_bp.get("/pokemon/search")
+@jwt_required(optional=True)
+def search_pokemon():
+    """Busca por nome (substring), tipos e geração, devolvendo uma página e o total.
+
+    Parâmetros: q, types (ex.: fire,flying; `type` também é aceito), mode (all = todos
+    os tipos, any = qualquer um), generation (1-10), page (>= 1), size (1-200, padrão 50).
+    """
+    q = request.args.get("q", "").strip().lower()
+    raw_types = request.args.get("types") or request.args.get("type") or ""
+    types = [t.strip().lower() for t in raw_types.split(",") if t.strip()]
+    mode = request.args.get("mode", "all")
+    generation = request.args.get("generation", "").strip()
+    try:
+        page = max(1, int(request.args.get("page", 1)))
+        size = min(200, max(1, int(request.args.get("size", 50))))
+    except (TypeError, ValueError):
+        return jsonify({"msg": "page e size devem ser números inteiros"}), 400
+    if generation and generation not in GENERATION_RANGES:
+        return jsonify({"msg": f"Geração inválida: {generation}"}), 400
+    if mode not in ("all", "any"):
+        return jsonify({"msg": "mode deve ser 'all' ou 'any'"}), 400
+
+    result = pokemon_index.get().search(q, types, mode, generation, page, size)
+    if result is None:
+        return jsonify({"msg": f"Tipo não encontrado: {', '.join(types)}"}), 404
+    return json_response(result)
+
+
+@poke_bp.get("/type/counts")
+@jwt_required(optional=True)
+def type_counts():
+    """Quantidade de Pokémon por tipo (opcionalmente dentro de uma geração), via popcount"""
+    generation = request.args.get("generation", "").strip()
+    if generation and generation not in GENERATION_RANGES:
+        return jsonify({"msg": f"Geração inválida: {generation}"}), 400
+    types = catalog.list_types()
+    if types is None:
+        types, status = fetch_type_list()
+        if status != 200:
+            return jsonify(types), status
+    index = pokemon_index.get()
+    counts = {}
+    for t in types.get("results", []):
+        count = index.count(types=[t["name"]], generation=generation)
+        if count is not None:
+            counts[t["name"]] = count
+    return json_response({"generation": generation or None, "counts": counts})
+
+
+def _batch_names() -> List[str]:
+    """Lê os nomes de ?names=a,b,c ou do corpo JSON {"names": [...]}, sem duplicados"""
+    raw: List[str] = []
+    if request.method == "POST":
+        body = request.get_json(silent=True) or {}
+        names = body.get("names") or []
+        if isinstance(names, str):
+            names = names.split(",")
+        raw.extend(str(n) for n in names)
+    for value in request.args.getlist("names"):
+        raw.extend(value.split(","))
+
+    seen = set()
+    result = []
+    for n in raw:
+        n = n.strip().lower()
+        if n and n not in seen:
+            seen.add(n)
+            result.append(n)
+    return result
+
+
+@poke_bp.route("/pokemon/batch", methods=["GET", "POST"])
+@jwt_required(optional=True)
+def pokemon_batch():
+    """Detalhes de vários Pokémon em uma única resposta.
+
+    Hits do cache respondem na hora; os misses são buscados em paralelo na PokéAPI
+    e falhas individuais aparecem no item, sem derrubar o lote inteiro.
+    """
+    fields, error = _requested_fields()
+    if error:
+        return jsonify({"msg": error}), 400
+    names = _batch_names()
+    if not names:
+        return jsonify({"msg": "Informe ao menos um nome em 'names'"}), 400
+    if len(names) > BATCH_MAX_NAMES:
+        return jsonify({"msg": f"Máximo de {BATCH_MAX_NAMES} nomes por lote"}), 400
+
+    results: Dict[str, dict] = {}
+    misses = []
+    for name in names:
+        cached_data = get_from_cache(f"pokemon_detail_{name}")
+        if cached_data:
+            results[name] = {"name": name, "status": 200, "data": _select_fields(cached_data, fields)}
+        else:
+            misses.append(name)
+
+    if misses:
+        executor = _get_executor()
+        futures = {name: executor.submit(fetch_pokemon_detail, name) for name in misses}
+        for name, future in futures.items():
+            try:
+                data, status = future.result()
+            except UpstreamUnavailable as exc:
+                results[name] = {"name": name, "status": 503, "error": str(exc)}
+                continue
+            except requests.RequestException as exc:
+                results[name] = {"name": name, "status": 502, "error": str(exc)}
+                continue
+            except TimeoutError as exc:
+                results[name] = {"name": name, "status": 504, "error": str(exc)}
+                continue
+            if status == 200:
+                results[name] = {"name": name, "status": 200, "data": _select_fields(data, fields)}
+            else:
+                results[name] = {"name": name, "status": status, "error": data}
+
+    ordered = [results[name] for name in names]
+    return json_response({
+        "count": len(ordered),
+        "errors": sum(1 for item in ordered if item["status"] != 200),
+        "results": ordered,
+    })
+
+
+def fetch_pokemon_types(names: List[str]) -> Dict[str, Optional[List[str]]]:
+    """Tipos (por slot) de cada nome/id; None para os não encontrados.
+
+    Hits do cache não passam pelo pool; os misses são buscados em paralelo. Falhas da
+    PokéAPI sobem como exceção (tratadas pelos errorhandlers do blueprint).
+    """
+    details: Dict[str, Tuple[dict, int]] = {}
+    misses = []
+    for name in names:
+        cached_data = get_from_cache(f"pokemon_detail_{name}")
+        if cached_data:
+            details[name] = (cached_data, 200)
+        else:
+            misses.append(name)
+    if misses:
+        executor = _get_executor()
+        futures = {name: executor.submit(fetch_pokemon_detail, name) for name in misses}
+        details.update((name, future.result()) for name, future in futures.items())
+
+    result: Dict[str, Optional[List[str]]] = {}
+    for name in names:
+        data, status = details[name]
+        if status == 200:
+            slots = sorted(data.get("types", []), key=lambda t: t.get("slot") or 0)
+            result[name] = [t["type"]["name"] for t in slots]
+        elif status == 404:
+            result[name] = None
+        else:
+            raise UpstreamUnavailable(f"Falha ao carregar {name} da PokéAPI")
+    return result
 
 
 @poke_bp.get("/type")
 @jwt_required(optional=True)
 def list_types():
+    local = catalog.list_types()
+    if local is not None:
+        return json_response(local, MAX_AGE_BY_CLASS["type_list"])
+    data, status = fetch_type_list()
+    return _respond("type_list", data, status)
+
+
+def fetch_type_list() -> Tuple[dict, int]:
     # OTIMIZAÇÃO: Verifica cache primeiro
-    cache_key = "type_list"
-    cached_data = get_from_cache(cache_key)
-    if cached_data:
-        return jsonify(cached_data), 200
+    return cached_fetch("type_list", _fetch_type_list)
 
-    resp = requests.get(f"{BASE_URL}/type", timeout=15)
+
+def _fetch_type_list() -> Tuple[dict, int]:
+    resp = _upstream.get("/type", timeout=15)
     if resp.status_code == 200:
         data = resp.json()
         # OTIMIZAÇÃO: Salva no cache
-        save_to_cache(cache_key, data)
-        return jsonify(data), 200
-    return jsonify(resp.json()), resp.status_code
+        save_to_cache("type_list", data)
+        return data, 200
+    return _error_payload(resp), resp.status_code
 
 
 @poke_bp.get("/type/<name>")
 @jwt_required(optional=True)
 def list_by_type(name: str):
     """Lista Pokémon por tipo, normalizando para { results: [{ name, url }], count }"""
+    local = catalog.list_by_type(name)
+    if local is not None:
+        return json_response(local, MAX_AGE_BY_CLASS["type_detail"])
+    data, status = fetch_type_detail(name)
+    return _respond(f"type_detail_{name}", data, status)
+
+
+DAMAGE_RELATIONS = ("double_damage_to", "half_damage_to", "no_damage_to")
+
+
+def fetch_type_detail(name: str) -> Tuple[dict, int]:
     # OTIMIZAÇÃO: Verifica cache primeiro
-    cache_key = f"type_detail_{name}"
-    cached_data = get_from_cache(cache_key)
-    if cached_data:
-        return jsonify(cached_data), 200
+    return cached_fetch(f"type_detail_{name}", lambda: _fetch_type_detail(name))
 
-    resp = requests.get(f"{BASE_URL}/type/{name}", timeout=20)
+
+def _fetch_type_detail(name: str) -> Tuple[dict, int]:
+    resp = _upstream.get(f"/type/{name}", timeout=20)
     if resp.status_code != 200:
-        return jsonify(resp.json()), resp.status_code
+        return _error_payload(resp), resp.status_code
     data = resp.json()
     pokemons = data.get("pokemon", [])
     results = []
@@ -183,11 +810,76 @@ def list_by_type(name: str):
         if p.get("name") and p.get("url"):
             results.append({"name": p["name"], "url": p["url"]})
 
+    relations = data.get("damage_relations") or {}
     normalized_data = {
         "count": len(results),
-        "results": results
+        "results": results,
+        # Só o lado ofensivo: é o que a tabela de efetividade (type_chart.py) usa
+        "damage_relations": {
+            key: [t["name"] for t in relations.get(key, []) if t.get("name")]
+            for key in DAMAGE_RELATIONS
+        },
     }
     # OTIMIZAÇÃO: Salva no cache
-    save_to_cache(cache_key, normalized_data)
-    return jsonify(normalized_data), 200
+    save_to_cache(f"type_detail_{name}", normalized_data)
+    return normalized_data, 200
+
+
+def _build_type_chart() -> TypeChart:
+    """Monta a tabela a partir dos tipos com Pokémon (exclui "unknown", "shadow"...)"""
+    types, status = fetch_type_list()
+    if status != 200:
+        raise UpstreamUnavailable("Falha ao carregar a lista de tipos da PokéAPI")
+    names = [t["name"] for t in types.get("results", [])]
+    details = {name: (cached, 200) for name in names
+               if (cached := get_from_cache(f"type_detail_{name}")) is not None}
+    misses = [name for name in names if name not in details]
+    if misses:
+        executor = _get_executor()
+        futures = {name: executor.submit(fetch_type_detail, name) for name in misses}
+        details.update((name, future.result()) for name, future in futures.items())
+    relations = {}
+    for name in names:
+        data, status = details[name]
+        if status == 200 and "damage_relations" not in data:
+            # Entrada gravada antes de o detalhe guardar damage_relations
+            data, status = _fetch_type_detail(name)
+        if status != 200:
+            raise UpstreamUnavailable(f"Falha ao carregar o tipo {name} da PokéAPI")
+        if data.get("count"):
+            relations[name] = data["damage_relations"]
+    return TypeChart.from_relations(relations)
+
+
+type_chart.builder = _build_type_chart
+
+
+def _loader_for(key: str) -> Optional[Callable[[], Tuple[dict, int]]]:
+    """Como buscar novamente cada chave do cache (usado na revalidação em segundo plano)"""
+    if key.startswith("pokemon_detail_"):
+        name = key[len("pokemon_detail_"):]
+        return lambda: _fetch_pokemon_detail(name)
+    if key.startswith("pokemon_list_"):
+        try:
+            limit, offset = (int(v) for v in key[len("pokemon_list_"):].split("_"))
+        except ValueError:
+            return None
+        return lambda: _fetch_pokemon_list(key, limit, offset)
+    if key == "type_list":
+        return _fetch_type_list
+    if key.startswith("type_detail_"):
+        name = key[len("type_detail_"):]
+        return lambda: _fetch_type_detail(name)
+    if key.startswith("species_"):
+        name = key[len("species_"):]
+        return lambda: _fetch_species(name)
+    if key.startswith("evolution_chain_"):
+        try:
+            chain_id = int(key[len("evolution_chain_"):])
+        except ValueError:
+            return None
+        return lambda: _fetch_evolution_chain(chain_id)
+    return None
+
 
+_refresher.loader_for = _loader_for
@@ -0,0 +1,123 @@
+"""Revalidação em segundo plano do cache da PokéAPI (stale-while-revalidate).
+
+- `schedule(key)`: renova uma chave stale sem bloquear a requisição que a serviu;
+- agendador periódico: renova as chaves mais acessadas antes do TTL soft vencer.
+
+Quem registra como buscar cada chave é o pokeapi.py (`loader_for`).
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional, Set, Tuple
+
+from .cache import cache
+from .singleflight import flights
+
+logger = logging.getLogger(__name__)
+
+Loader = Callable[[], Tuple[dict, int]]
+
+
+class Refresher:
+    def __init__(self, workers: int = 2, interval: float = 60, lead: float = 300,
+                 max_keys: int = 50, min_hits: int = 3):
+        self.workers = workers
+        self.interval = interval
+        self.lead = lead
+        self.max_keys = max_keys
+        self.min_hits = min_hits
+        self.app = None
+        self.loader_for: Callable[[str], Optional[Loader]] = lambda key: None
+        self._lock = threading.Lock()
+        self._pending: Set[str] = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pid: Optional[int] = None
+        self._paused = 0
+        self.refreshed = 0
+        self.failed = 0
+
+    def init_app(self, app) -> None:
+        self.app = app
+        self.workers = app.config.get("CACHE_REFRESH_WORKERS", self.workers)
+        self.interval = app.config.get("CACHE_REFRESH_INTERVAL", self.interval)
+        self.lead = app.config.get("CACHE_REFRESH_LEAD", self.lead)
+        self.max_keys = app.config.get("CACHE_REFRESH_MAX_KEYS", self.max_keys)
+        self.min_hits = app.config.get("CACHE_REFRESH_MIN_HITS", self.min_hits)
+
+    def ensure_started(self) -> None:
+        """Cria pool e agendador no processo atual (threads não sobrevivem ao fork)"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pending.clear()
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="cache-refresh")
+            # _pid por último: quem vê o pid atual fora do lock já encontra o pool deste processo
+            self._pid = os.getpid()
+            if self.interval and self.interval > 0:
+                threading.Thread(target=self._loop, name="cache-refresh-scheduler", daemon=True).start()
+
+    @contextmanager
+    def paused(self) -> Iterator[None]:
+        """Não agenda nada (nem cria pool/agendador) dentro do bloco.
+
+        Usado no aquecimento síncrono: com `--preload` ele roda no master, e threads
+        criadas ali seriam copiadas pelo fork no meio do trabalho, com locks (do cache,
+        por exemplo) possivelmente presos nos workers.
+        """
+        with self._lock:
+            self._paused += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._paused -= 1
+
+    def schedule(self, key: str) -> bool:
+        """Agenda a renovação de `key` (no máximo uma pendente por chave)"""
+        if self._paused or self.loader_for(key) is None:
+            return False
+        self.ensure_started()
+        with self._lock:
+            if key in self._pending:
+                return False
+            self._pending.add(key)
+            executor = self._executor
+        executor.submit(self._run, key)
+        return True
+
+    def _run(self, key: str) -> None:
+        try:
+            loader = self.loader_for(key)
+            if self.app is not None:
+                with self.app.app_context():
+                    flights.do(key, loader)
+            else:
+                flights.do(key, loader)
+            self.refreshed += 1
+        except Exception as exc:  # o valor stale continua servindo até o TTL hard
+            self.failed += 1
+            logger.warning("Falha ao revalidar %s: %s", key, exc)
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def _loop(self) -> None:
+        pid = os.getpid()
+        while self._pid == pid:
+            time.sleep(self.interval)
+            for key in cache.expiring_soon(self.lead, self.min_hits, self.max_keys):
+                self.schedule(key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = len(self._pending)
+        return {"pending": pending, "refreshed": self.refreshed, "failed": self.failed,
+                "interval_seconds": self.interval, "lead_seconds": self.lead}
+
+
+refresher = Refresher()
@@ -1,12 +1,30 @@
-from flask import Blueprint, jsonify, request
+from typing import List, Optional, Tuple
+
+import requests
+from flask import Blueprint, Response, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import delete, or_, update
 
 from . import db
-from .models import PokemonUsuario
-from .pokeapi import poke_bp
+from .bulk import insert_ignore
+from .http_cache import versioned_response
+from .metrics import metrics
+from .models import PokemonUsuario, Usuario
+from .pokeapi import (
+    BATCH_MAX_NAMES, fetch_pokemon_types, poke_bp, upstream_error, upstream_unavailable, upstream_wait_timeout,
+)
+from .type_chart import analyze_team, score_candidates, type_chart
+from .upstream import UpstreamUnavailable
 
 api_bp = Blueprint("api", __name__)
 api_bp.register_blueprint(poke_bp, url_prefix="/")
+# Rotas /me que consultam a PokéAPI (ex.: análise da equipe) respondem como as de poke_bp
+api_bp.register_error_handler(requests.RequestException, upstream_error)
+api_bp.register_error_handler(UpstreamUnavailable, upstream_unavailable)
+api_bp.register_error_handler(TimeoutError, upstream_wait_timeout)
+
+TEAM_MAX = 6
+BULK_MAX_ITEMS = 500
 
 
 @api_bp.get("/health")
@@ -14,43 +32,190 @@ def health():
     return jsonify({"status": "ok"})
 
 
+@api_bp.get("/metrics")
+def prometheus_metrics():
+    """Métricas deste worker no formato de exposição do Prometheus"""
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4; charset=utf-8")
+
+
+# Colunas devolvidas por /me/collection (lidas sem montar objetos ORM)
+_COLLECTION_COLUMNS = (
+    PokemonUsuario.IDPokemonUsuario,
+    PokemonUsuario.IDTipoPokemon,
+    PokemonUsuario.Codigo,
+    PokemonUsuario.ImagemUrl,
+    PokemonUsuario.Nome,
+    PokemonUsuario.GrupoBatalha,
+    PokemonUsuario.Favorito,
+)
+
+
+@api_bp.get("/me/collection")
+@jwt_required()
+def get_collection():
+    """Favoritos, equipe e a versão da coleção do usuário em uma única consulta.
+
+    A versão (quantidade, maior id, última alteração) é o ETag: com `If-None-Match`
+    igual a resposta é 304. `favoriteCodes`/`teamCodes` trazem os códigos em minúsculas
+    para o frontend montar conjuntos de consulta.
+    """
+    user_id = int(get_jwt_identity())
+    rows = db.session.execute(
+        db.select(*_COLLECTION_COLUMNS, PokemonUsuario.DtAlteracao)
+        .where(PokemonUsuario.IDUsuario == user_id)
+        .order_by(PokemonUsuario.IDPokemonUsuario)
+    ).all()
+    changed = max((row.DtAlteracao for row in rows if row.DtAlteracao), default=None)
+    version = "{}-{}-{}-{}".format(
+        user_id,
+        len(rows),
+        rows[-1].IDPokemonUsuario if rows else 0,
+        int(changed.timestamp() * 1_000_000) if changed else 0,
+    )
+
+    def build() -> dict:
+        favorites, team = [], []
+        for row in rows:
+            item = {"IDUsuario": user_id, **{col.key: getattr(row, col.key) for col in _COLLECTION_COLUMNS}}
+            if row.Favorito:
+                favorites.append(item)
+            if row.GrupoBatalha:
+                team.append(item)
+        return {
+            "version": version,
+            "favorites": favorites,
+            "team": team,
+            "favoriteCodes": sorted({p["Codigo"].lower() for p in favorites}),
+            "teamCodes": sorted({p["Codigo"].lower() for p in team}),
+        }
+
+    return versioned_response(version, build)
+
+
 @api_bp.get("/me/team")
 @jwt_required()
 def get_team():
     user_id = int(get_jwt_identity())
-    print(f"DEBUG: get_team called with user_id={user_id}")
     team = db.session.scalars(
         db.select(PokemonUsuario).filter_by(IDUsuario=user_id, GrupoBatalha=True)
     ).all()
-    print(f"DEBUG: found {len(team)} team members")
     return jsonify([_to_dict(p) for p in team])
 
 
+@api_bp.route("/me/team/analysis", methods=["GET", "POST"])
+@jwt_required()
+def team_analysis():
+    """Fraquezas, resistências e cobertura ofensiva da Equipe de Batalha.
+
+    Com `?candidates=a,b` (ou corpo {"candidates": [...]}) também pontua cada candidato
+    como acréscimo à equipe atual, em uma única chamada. Os tipos vêm do cache de
+    detalhes e a efetividade da tabela pré-calculada (type_chart.py).
+    """
+    user_id = int(get_jwt_identity())
+    members = db.session.execute(
+        db.select(PokemonUsuario.Codigo, PokemonUsuario.Nome)
+        .filter_by(IDUsuario=user_id, GrupoBatalha=True)
+        .order_by(PokemonUsuario.IDPokemonUsuario)
+    ).all()
+    candidates = _candidate_names()
+    if len(candidates) > BATCH_MAX_NAMES:
+        return jsonify({"msg": f"Máximo de {BATCH_MAX_NAMES} candidatos por chamada"}), 400
+
+    codes = [m.Codigo.strip().lower() for m in members]
+    types = fetch_pokemon_types(list(dict.fromkeys(codes + candidates)))
+    chart = type_chart.get()
+    team_types = [types[code] for code in codes if types[code]]
+
+    result = {
+        "members": [{"Codigo": m.Codigo, "Nome": m.Nome, "types": types[code]} for m, code in zip(members, codes)],
+        **analyze_team(chart, team_types),
+    }
+    if candidates:
+        result["candidates"] = score_candidates(
+            chart, team_types, {name: types[name] for name in candidates if types[name]}
+        )
+        result["unknownCandidates"] = [name for name in candidates if not types[name]]
+    return jsonify(result)
+
+
+def _candidate_names() -> List[str]:
+    """Nomes de ?candidates=a,b ou do corpo {"candidates": [...]}, em minúsculas e sem repetição"""
+    raw: List[str] = []
+    if request.method == "POST":
+        body = request.get_json(silent=True) or {}
+        names = body.get("candidates") or []
+        raw.extend((names.split(",") if isinstance(names, str) else [str(n) for n in names]))
+    for value in request.args.getlist("candidates"):
+        raw.extend(value.split(","))
+    return list(dict.fromkeys(n.strip().lower() for n in raw if n.strip()))
+
+
 @api_bp.post("/me/team")
 @jwt_required()
 def add_to_team():
     user_id = int(get_jwt_identity())
     data = request.get_json() or {}
-    current_count = db.session.scalar(
-        db.select(db.func.count()).select_from(PokemonUsuario).filter_by(
-            IDUsuario=user_id, GrupoBatalha=True
+    _lock_user(user_id)
+    pokemon, created = _add_roles(_row(user_id, data, data.get("Favorito", False), True))
+    if _team_size(user_id) > TEAM_MAX:
+        db.session.rollback()
+        return jsonify({"msg": f"Equipe de Batalha já tem {TEAM_MAX} integrantes"}), 400
+    db.session.commit()
+    return jsonify(_to_dict(pokemon)), 201 if created else 200
+
+
+@api_bp.put("/me/team")
+@jwt_required()
+def replace_team():
+    """Substitui a Equipe de Batalha inteira em uma única transação.
+
+    Corpo: lista de { Codigo, Nome, ImagemUrl?, IDTipoPokemon? } (ou { "team": [...] }).
+    Só a diferença é gravada: sai quem não está na lista, entra quem falta.
+    """
+    user_id = int(get_jwt_identity())
+    items, error = _payload_items("team")
+    if error:
+        return jsonify({"msg": error}), 400
+    desired = {_codigo(item["Codigo"]): item for item in items}
+    if len(desired) > TEAM_MAX:
+        return jsonify({"msg": f"A Equipe de Batalha tem no máximo {TEAM_MAX} integrantes"}), 400
+
+    _lock_user(user_id)
+    # Integrantes atuais e linhas (ex.: favoritos) dos códigos que vão entrar
+    existing = {p.Codigo: p for p in db.session.scalars(
+        db.select(PokemonUsuario).where(
+            PokemonUsuario.IDUsuario == user_id,
+            or_(PokemonUsuario.GrupoBatalha.is_(True), PokemonUsuario.Codigo.in_(list(desired))),
         )
-    )
-    if current_count >= 6:
-        return jsonify({"msg": "Equipe de Batalha já tem 6 integrantes"}), 400
-
-    pokemon = PokemonUsuario(
-        IDUsuario=user_id,
-        IDTipoPokemon=data.get("IDTipoPokemon"),
-        Codigo=data["Codigo"],
-        ImagemUrl=data.get("ImagemUrl"),
-        Nome=data["Nome"],
-        GrupoBatalha=True,
-        Favorito=data.get("Favorito", False),
-    )
-    db.session.add(pokemon)
+    )}
+    leaving = [p for code, p in existing.items() if p.GrupoBatalha and code not in desired]
+    # Quem sai da equipe e também é favorito continua existindo como favorito
+    removed = [p.IDPokemonUsuario for p in leaving if not p.Favorito]
+    if removed:
+        db.session.execute(delete(PokemonUsuario).where(PokemonUsuario.IDPokemonUsuario.in_(removed)))
+    for p in leaving:
+        if p.Favorito:
+            p.GrupoBatalha = False
+    for code, item in desired.items():
+        p = existing.get(code)
+        if p is not None:
+            p.GrupoBatalha = True
+            p.Nome = item["Nome"]
+            p.ImagemUrl = item.get("ImagemUrl", p.ImagemUrl)
+            p.IDTipoPokemon = item.get("IDTipoPokemon", p.IDTipoPokemon)
+    added = [_row(user_id, item, False, True) for code, item in desired.items() if code not in existing]
+    if added:
+        db.session.execute(insert_ignore(PokemonUsuario), added)
+
+    if _team_size(user_id) > TEAM_MAX:
+        db.session.rollback()
+        return jsonify({"msg": f"A Equipe de Batalha tem no máximo {TEAM_MAX} integrantes"}), 409
     db.session.commit()
-    return jsonify(_to_dict(pokemon)), 201
+
+    team = db.session.scalars(
+        db.select(PokemonUsuario).filter_by(IDUsuario=user_id, GrupoBatalha=True)
+    ).all()
+    return jsonify([_to_dict(p) for p in team])
 
 
 @api_bp.delete("/me/team/<int:id_pokemon_usuario>")
@@ -60,7 +225,7 @@ def remove_from_team(id_pokemon_usuario: int):
     pokemon = db.session.get(PokemonUsuario, id_pokemon_usuario)
     if not pokemon or pokemon.IDUsuario != user_id or not pokemon.GrupoBatalha:
         return jsonify({"msg": "Não encontrado"}), 404
-    db.session.delete(pokemon)
+    _remove_role(pokemon, "GrupoBatalha")
     db.session.commit()
     return ("", 204)
 
@@ -69,11 +234,9 @@ def remove_from_team(id_pokemon_usuario: int):
 @jwt_required()
 def get_favorites():
     user_id = int(get_jwt_identity())
-    print(f"DEBUG: get_favorites called with user_id={user_id}")
     favs = db.session.scalars(
         db.select(PokemonUsuario).filter_by(IDUsuario=user_id, Favorito=True)
     ).all()
-    print(f"DEBUG: found {len(favs)} favorites")
     return jsonify([_to_dict(p) for p in favs])
 
 
@@ -82,18 +245,78 @@ def get_favorites():
 def add_favorite():
     user_id = int(get_jwt_identity())
     data = request.get_json() or {}
-    pokemon = PokemonUsuario(
-        IDUsuario=user_id,
-        IDTipoPokemon=data.get("IDTipoPokemon"),
-        Codigo=data["Codigo"],
-        ImagemUrl=data.get("ImagemUrl"),
-        Nome=data["Nome"],
-        Favorito=True,
-        GrupoBatalha=data.get("GrupoBatalha", False),
+    grupo = data.get("GrupoBatalha", False)
+    if grupo:
+        _lock_user(user_id)
+    pokemon, created = _add_roles(_row(user_id, data, True, grupo))
+    if grupo and _team_size(user_id) > TEAM_MAX:
+        db.session.rollback()
+        return jsonify({"msg": f"Equipe de Batalha já tem {TEAM_MAX} integrantes"}), 400
+    db.session.commit()
+    return jsonify(_to_dict(pokemon)), 201 if created else 200
+
+
+@api_bp.post("/me/favorites/bulk")
+@jwt_required()
+def add_favorites_bulk():
+    """Favorita vários Pokémon em uma transação; os que já são favoritos são ignorados"""
+    user_id = int(get_jwt_identity())
+    items, error = _payload_items("favorites")
+    if error:
+        return jsonify({"msg": error}), 400
+    rows = {_codigo(item["Codigo"]): _row(user_id, item, True, False) for item in items}
+    # Uma linha por código: quem já está na equipe só ganha o papel de favorito
+    existing = {p.Codigo: p for p in db.session.scalars(
+        db.select(PokemonUsuario).where(PokemonUsuario.IDUsuario == user_id, PokemonUsuario.Codigo.in_(list(rows)))
+    )}
+    promoted = [p for p in existing.values() if not p.Favorito]
+    for p in promoted:
+        p.Favorito = True
+    new_rows = [row for code, row in rows.items() if code not in existing]
+    inserted = 0
+    if new_rows:
+        db.session.flush()
+        # Conexão da sessão (não session.execute): o resultado do executemany traz o rowcount
+        inserted = db.session.connection().execute(insert_ignore(PokemonUsuario), new_rows).rowcount
+    db.session.commit()
+
+    favs = db.session.scalars(
+        db.select(PokemonUsuario).filter_by(IDUsuario=user_id, Favorito=True)
+    ).all()
+    return jsonify({"adicionados": inserted + len(promoted), "favoritos": [_to_dict(p) for p in favs]})
+
+
+@api_bp.delete("/me/favorites/bulk")
+@jwt_required()
+def remove_favorites_bulk():
+    """Remove vários favoritos em um único DELETE. Corpo: { codigos?: [...], ids?: [...] }"""
+    user_id = int(get_jwt_identity())
+    body = request.get_json(silent=True)
+    if body is None:
+        body = {}
+    if not isinstance(body, dict):
+        return jsonify({"msg": "Envie um objeto { codigos?: [...], ids?: [...] }"}), 400
+    codigos, ids = body.get("codigos") or [], body.get("ids") or []
+    if not isinstance(codigos, list) or not isinstance(ids, list):
+        return jsonify({"msg": "'codigos' e 'ids' devem ser listas"}), 400
+    codigos = [_codigo(c) for c in codigos]
+    ids = [int(i) for i in ids if str(i).isdigit()]
+    if not codigos and not ids:
+        return jsonify({"msg": "Informe 'codigos' ou 'ids'"}), 400
+    if len(codigos) + len(ids) > BULK_MAX_ITEMS:
+        return jsonify({"msg": f"Máximo de {BULK_MAX_ITEMS} itens por requisição"}), 400
+    selected = (
+        PokemonUsuario.IDUsuario == user_id,
+        PokemonUsuario.Favorito.is_(True),
+        or_(PokemonUsuario.Codigo.in_(codigos), PokemonUsuario.IDPokemonUsuario.in_(ids)),
     )
-    db.session.add(pokemon)
+    # Favoritos que também estão na equipe só perdem o papel de favorito
+    kept = db.session.execute(
+        update(PokemonUsuario).where(*selected, PokemonUsuario.GrupoBatalha.is_(True)).values(Favorito=False)
+    ).rowcount
+    deleted = db.session.execute(delete(PokemonUsuario).where(*selected)).rowcount
     db.session.commit()
-    return jsonify(_to_dict(pokemon)), 201
+    return jsonify({"removidos": kept + deleted})
 
 
 @api_bp.delete("/me/favorites/<int:id_pokemon_usuario>")
@@ -103,11 +326,85 @@ def remove_favorite(id_pokemon_usuario: int):
     pokemon = db.session.get(PokemonUsuario, id_pokemon_usuario)
     if not pokemon or pokemon.IDUsuario != user_id or not pokemon.Favorito:
         return jsonify({"msg": "Não encontrado"}), 404
-    db.session.delete(pokemon)
+    _remove_role(pokemon, "Favorito")
     db.session.commit()
     return ("", 204)
 
 
+def _payload_items(key: str) -> Tuple[List[dict], Optional[str]]:
+    """Itens do corpo (lista ou { key: [...] }), cada um com Codigo e Nome"""
+    body = request.get_json(silent=True)
+    items = body.get(key) if isinstance(body, dict) else body
+    if not isinstance(items, list):
+        return [], f"Envie uma lista de Pokémon (ou {{\"{key}\": [...]}})"
+    if len(items) > BULK_MAX_ITEMS:
+        return [], f"Máximo de {BULK_MAX_ITEMS} itens por requisição"
+    for item in items:
+        if not isinstance(item, dict) or not _codigo(item.get("Codigo") or "") or not item.get("Nome"):
+            return [], "Cada item precisa de Codigo e Nome"
+    return items, None
+
+
+def _codigo(value) -> str:
+    """Forma gravada do Código (nome ou id): sem espaços nas pontas e em minúsculas"""
+    return str(value).strip().lower()
+
+
+def _row(user_id: int, data: dict, favorito: bool, grupo: bool) -> dict:
+    return {
+        "IDUsuario": user_id,
+        "IDTipoPokemon": data.get("IDTipoPokemon"),
+        "Codigo": _codigo(data["Codigo"]),
+        "ImagemUrl": data.get("ImagemUrl"),
+        "Nome": data["Nome"],
+        "Favorito": bool(favorito),
+        "GrupoBatalha": bool(grupo),
+    }
+
+
+def _add_roles(row: dict) -> Tuple[PokemonUsuario, bool]:
+    """Insere o Pokémon ou, se o código já existe (índice único por usuário e código),
+    acrescenta os papéis de `row` à linha existente. Retorna (linha, algum papel novo)"""
+    result = db.session.execute(insert_ignore(PokemonUsuario).values(**row))
+    pokemon = db.session.scalars(
+        db.select(PokemonUsuario).filter_by(IDUsuario=row["IDUsuario"], Codigo=row["Codigo"])
+    ).one()
+    if result.rowcount == 1:
+        return pokemon, True
+    changed = (row["Favorito"] and not pokemon.Favorito) or (row["GrupoBatalha"] and not pokemon.GrupoBatalha)
+    pokemon.Favorito = pokemon.Favorito or row["Favorito"]
+    pokemon.GrupoBatalha = pokemon.GrupoBatalha or row["GrupoBatalha"]
+    db.session.flush()
+    return pokemon, changed
+
+
+def _remove_role(pokemon: PokemonUsuario, role: str) -> None:
+    """Tira o papel; a linha só é apagada quando não sobra nenhum"""
+    other = "Favorito" if role == "GrupoBatalha" else "GrupoBatalha"
+    if getattr(pokemon, other):
+        setattr(pokemon, role, False)
+    else:
+        db.session.delete(pokemon)
+
+
+def _lock_user(user_id: int) -> None:
+    """Serializa as alterações de equipe do usuário até o commit (SELECT ... FOR UPDATE).
+
+    A contagem depois da escrita só garante o limite com a linha do usuário travada: no
+    PostgreSQL/MySQL (READ COMMITTED) duas requisições simultâneas veriam até 6 linhas
+    cada uma. No SQLite o FOR UPDATE é omitido; lá já há um único escritor por vez.
+    """
+    db.session.execute(db.select(Usuario.IDUsuario).where(Usuario.IDUsuario == user_id).with_for_update())
+
+
+def _team_size(user_id: int) -> int:
+    return db.session.scalar(
+        db.select(db.func.count()).select_from(PokemonUsuario).filter_by(
+            IDUsuario=user_id, GrupoBatalha=True
+        )
+    )
+
+
 def _to_dict(p: PokemonUsuario) -> dict:
     return {
         "IDPokemonUsuario": p.IDPokemonUsuario,
@@ -0,0 +1,180 @@
+"""Índice em memória de nomes de Pokémon para busca, filtro e paginação no servidor.
+
+- busca por substring (como o `includes` do frontend) via índice de n-gramas:
+  trigramas para termos com 3+ letras, unigramas/bigramas para termos curtos;
+- gerações por faixa de id nacional (mesma tabela `generationRanges` do frontend);
+- pertinência a tipos, carregada sob demanda.
+
+Todos os filtros viram bitsets (int do Python) sobre as posições da lista ordenada
+por id nacional: combinar tipos/geração/nome é AND/OR de inteiros e a contagem é
+um popcount (`int.bit_count`), sem montar listas intermediárias.
+
+Construído uma vez por worker a partir do catálogo local (se sincronizado) ou da
+lista da PokéAPI, e reconstruído após `INDEX_TTL_SECONDS`.
+"""
+import re
+import threading
+from bisect import bisect_left, bisect_right
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from .holder import TTLHolder
+
+# Faixas de id nacional por geração; "10" são as formas especiais (ids 10001+)
+GENERATION_RANGES: Dict[str, Tuple[int, int]] = {
+    "1": (1, 151),
+    "2": (152, 251),
+    "3": (252, 386),
+    "4": (387, 493),
+    "5": (494, 649),
+    "6": (650, 721),
+    "7": (722, 809),
+    "8": (810, 905),
+    "9": (906, 1025),
+    "10": (1026, 10**6),
+}
+
+INDEX_TTL_SECONDS = 3600
+
+_ID_RE = re.compile(r"/(\d+)/?$")
+
+
+def _grams(text: str, n: int) -> Set[str]:
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def _positions(bits: int, offset: int = 0, limit: Optional[int] = None) -> List[int]:
+    """Posições dos bits ligados (em ordem), pulando `offset` e parando em `limit`"""
+    # bin() invertido: o caractere i corresponde ao bit i; str.find percorre em C
+    digits = bin(bits)[:1:-1]
+    result = []
+    pos = digits.find("1")
+    while pos != -1:
+        if offset:
+            offset -= 1
+        else:
+            result.append(pos)
+            if limit is not None and len(result) >= limit:
+                break
+        pos = digits.find("1", pos + 1)
+    return result
+
+
+class PokemonIndex:
+    def __init__(self, entries: List[Tuple[int, str, str]],
+                 type_loader: Callable[[str], Optional[Set[int]]],
+                 type_members: Optional[Dict[str, Set[int]]] = None):
+        # entries: (id, nome, url) ordenados por id; a posição na lista é o bit no bitset
+        self.entries = sorted(entries)
+        self.ids = [e[0] for e in self.entries]
+        self.position = {pid: pos for pos, pid in enumerate(self.ids)}
+        self.all_bits = (1 << len(self.entries)) - 1
+        self._type_loader = type_loader
+        self._types: Dict[str, Optional[int]] = {}
+        self._types_lock = threading.Lock()
+        self._grams: Dict[str, int] = {}
+        for pos, (_, name, _) in enumerate(self.entries):
+            bit = 1 << pos
+            for n in (1, 2, 3):
+                for gram in _grams(name, n):
+                    self._grams[gram] = self._grams.get(gram, 0) | bit
+        self._generations = {gen: self._span_bits(*self.generation_span(gen)) for gen in GENERATION_RANGES}
+        # Com o catálogo local, todos os tipos já entram precomputados
+        for name, members in (type_members or {}).items():
+            self._types[name] = self._to_bits(members)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @staticmethod
+    def _span_bits(start: int, end: int) -> int:
+        return ((1 << end) - 1) ^ ((1 << start) - 1)
+
+    def match_name(self, q: str) -> int:
+        """Bitset das posições cujos nomes contêm `q`"""
+        bits = self.all_bits
+        for gram in _grams(q, min(len(q), 3)):
+            bits &= self._grams.get(gram, 0)
+            if not bits:
+                return 0
+        if len(q) <= 3:
+            return bits
+        # Os trigramas são necessários mas não suficientes: confirma a substring
+        confirmed = 0
+        for pos in _positions(bits):
+            if q in self.entries[pos][1]:
+                confirmed |= 1 << pos
+        return confirmed
+
+    def generation_span(self, generation: str) -> Tuple[int, int]:
+        """Intervalo [início, fim) de posições da geração (entries estão ordenadas por id)"""
+        low, high = GENERATION_RANGES[generation]
+        return bisect_left(self.ids, low), bisect_right(self.ids, high)
+
+    def generation_bits(self, generation: str) -> int:
+        return self._generations[generation]
+
+    def type_bits(self, name: str) -> Optional[int]:
+        """Bitset dos Pokémon do tipo (None se o tipo não existir); precomputado na 1ª consulta"""
+        if name not in self._types:
+            members = self._type_loader(name)
+            bits = None if members is None else self._to_bits(members)
+            with self._types_lock:
+                self._types[name] = bits
+        return self._types[name]
+
+    def _to_bits(self, ids: Set[int]) -> int:
+        bits = 0
+        for pid in ids:
+            pos = self.position.get(pid)
+            if pos is not None:
+                bits |= 1 << pos
+        return bits
+
+    def filter_bits(self, q: str = "", types: Sequence[str] = (), mode: str = "all",
+                    generation: str = "") -> Optional[int]:
+        """Combina os filtros; tipos com AND (mode=all) ou OR (mode=any). None se algum tipo não existir."""
+        bits = self.all_bits
+        if types:
+            combined = self.all_bits if mode == "all" else 0
+            for name in types:
+                tbits = self.type_bits(name)
+                if tbits is None:
+                    return None
+                combined = combined & tbits if mode == "all" else combined | tbits
+            bits &= combined
+        if generation:
+            bits &= self.generation_bits(generation)
+        if q and bits:
+            bits &= self.match_name(q)
+        return bits
+
+    def count(self, **filters) -> Optional[int]:
+        bits = self.filter_bits(**filters)
+        return None if bits is None else bits.bit_count()
+
+    def search(self, q: str = "", types: Sequence[str] = (), mode: str = "all",
+               generation: str = "", page: int = 1, size: int = 50) -> Optional[dict]:
+        """Uma página do resultado filtrado + total. None se algum tipo não existir."""
+        bits = self.filter_bits(q=q, types=types, mode=mode, generation=generation)
+        if bits is None:
+            return None
+        total = bits.bit_count()
+        selected = _positions(bits, (page - 1) * size, size)
+        return {
+            "count": total,
+            "page": page,
+            "size": size,
+            "pages": (total + size - 1) // size if total else 0,
+            "results": [
+                {"id": self.entries[pos][0], "name": self.entries[pos][1], "url": self.entries[pos][2]}
+                for pos in selected
+            ],
+        }
+
+
+def id_from_url(url: str) -> Optional[int]:
+    match = _ID_RE.search(url or "")
+    return int(match.group(1)) if match else None
+
+
+pokemon_index: TTLHolder[PokemonIndex] = TTLHolder(INDEX_TTL_SECONDS)
@@ -0,0 +1,22 @@
+"""Modo de execução do servidor: threads (padrão) ou assíncrono (gevent).
+
+Com SERVER_MODE=async o start.sh sobe o gunicorn com o worker gevent, que aplica o
+monkey-patching antes de carregar a app: sockets, locks, Events, sleep e o pool de
+threads viram greenlets. Uma chamada lenta à PokéAPI passa a só suspender a própria
+requisição, e um worker segura centenas delas em voo, sem mudar o código das rotas.
+"""
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def cooperative() -> bool:
+    """True quando rodando sob o monkey-patching do gevent (aplicado antes de carregar a app)"""
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched("socket")
+
+
+def server_mode() -> str:
+    return "async" if cooperative() else "threads"
@@ -0,0 +1,75 @@
+"""Deduplicação de buscas concorrentes pela mesma chave (single-flight).
+
+O primeiro miss de uma chave executa a busca; quem chegar enquanto ela estiver em
+andamento espera o mesmo resultado (ou a mesma exceção) em vez de repetir a chamada.
+"""
+import threading
+from typing import Any, Callable, Dict, Optional
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self, timeout: float = 30.0):
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self.leaders = 0
+        self.shared = 0
+
+    def init_app(self, app) -> None:
+        self.timeout = app.config.get("UPSTREAM_WAIT_TIMEOUT", self.timeout)
+
+    def do(self, key: str, fn: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        """Executa fn uma única vez por chave em andamento e compartilha o resultado.
+
+        Quem espera por mais de `timeout` segundos recebe TimeoutError; a busca do
+        líder continua e o resultado dela vale para os próximos.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                leader = True
+                self.leaders += 1
+            else:
+                call.waiters += 1
+                leader = False
+                self.shared += 1
+
+        if not leader:
+            if not call.done.wait(self.timeout if timeout is None else timeout):
+                raise TimeoutError(f"Tempo esgotado aguardando a busca de '{key}'")
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"in_flight": len(self._calls), "leaders": self.leaders, "shared": self.shared}
+
+
+flights = SingleFlight()
@@ -0,0 +1,309 @@
+"""Proxy de sprites com cache em disco endereçado por conteúdo.
+
+`/api/sprites/<id>?kind=default|shiny|artwork&size=original|thumb` busca cada imagem uma
+vez no host de sprites e grava, no diretório SPRITE_CACHE_DIR (compartilhado entre os
+workers):
+
+- blobs/<aa>/<sha256>.png — o conteúdo; imagens iguais ocupam um único arquivo;
+- refs/<kind>/<size>/<id>  — o sha256 da variante (arquivo pequeno, escrita atômica).
+
+O sha256 é o ETag e a resposta é imutável (1 ano). O arquivo sai por sendfile
+(`wsgi.file_wrapper` do gunicorn) ou, com SPRITE_ACCEL_REDIRECT, é o nginx que o entrega
+direto do disco (X-Accel-Redirect). Acima de SPRITE_CACHE_MAX_BYTES os blobs menos usados
+(mtime, renovado nos hits) são removidos. O total é contado por worker e recontado no disco
+a cada RESCAN_INTERVAL_SECONDS e antes de cada limpeza: entre recontagens, o que os outros
+workers gravaram não entra na conta e o limite pode ser excedido temporariamente.
+Miniaturas precisam do Pillow; sem ele, `size=thumb` devolve o original.
+"""
+import hashlib
+import io
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Optional, Tuple
+
+import requests
+from flask import Blueprint, Response, jsonify, request, send_file
+
+from .cache import cache
+from .pokeapi import upstream_error, upstream_unavailable, upstream_wait_timeout
+from .singleflight import flights
+from .upstream import UpstreamClient, UpstreamUnavailable
+
+try:  # Pillow é opcional: sem ele, não há miniaturas
+    from PIL import Image, UnidentifiedImageError
+    # Imagens que o Pillow recusa (bomba de descompressão, formato inválido)
+    THUMBNAIL_ERRORS: Tuple[type, ...] = (Image.DecompressionBombError, UnidentifiedImageError)
+except ImportError:  # pragma: no cover
+    Image = None
+    THUMBNAIL_ERRORS = ()
+
+logger = logging.getLogger(__name__)
+
+sprites_bp = Blueprint("sprites", __name__)
+sprites_bp.register_error_handler(requests.RequestException, upstream_error)
+sprites_bp.register_error_handler(UpstreamUnavailable, upstream_unavailable)
+sprites_bp.register_error_handler(TimeoutError, upstream_wait_timeout)
+
+# Caminho de cada tipo de sprite no repositório PokeAPI/sprites
+SPRITE_PATHS = {
+    "default": "/sprites/pokemon/{id}.png",
+    "shiny": "/sprites/pokemon/shiny/{id}.png",
+    "artwork": "/sprites/pokemon/other/official-artwork/{id}.png",
+}
+SIZES = ("original", "thumb")
+IMMUTABLE = "public, max-age=31536000, immutable"
+# Imagens maiores que isso não são aceitas do host de sprites
+MAX_IMAGE_BYTES = 4 * 1024 * 1024
+# Hits renovam o mtime (base da remoção por LRU) no máximo uma vez por intervalo
+TOUCH_INTERVAL_SECONDS = 3600
+# O total em disco é recontado no máximo uma vez por intervalo (os workers dividem o diretório)
+RESCAN_INTERVAL_SECONDS = 60
+
+
+class SpriteStore:
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = 256 * 1024 * 1024,
+                 thumb_size: int = 128, accel_prefix: str = ""):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.thumb_size = thumb_size
+        self.accel_prefix = accel_prefix
+        self.client = UpstreamClient("https://raw.githubusercontent.com/PokeAPI/sprites/master")
+        self._bytes: Optional[int] = None
+        self._scanned_at = 0.0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def init_app(self, app) -> None:
+        cfg = app.config
+        self.directory = cfg.get("SPRITE_CACHE_DIR", self.directory)
+        self.max_bytes = cfg.get("SPRITE_CACHE_MAX_BYTES", self.max_bytes)
+        self.thumb_size = cfg.get("SPRITE_THUMB_SIZE", self.thumb_size)
+        self.accel_prefix = cfg.get("SPRITE_ACCEL_REDIRECT", self.accel_prefix)
+        # Cliente próprio: falhas do host de sprites não abrem o circuito da PokéAPI
+        self.client = UpstreamClient(cfg.get("SPRITE_BASE_URL", self.client.base_url).rstrip("/"),
+                                     pool_size=cfg.get("POKEAPI_POOL_SIZE", 16))
+        self._bytes = None
+        app.extensions["sprite_store"] = self
+
+    # ------------------------------------------------------------------ caminhos
+    def blob_path(self, sha: str) -> str:
+        return os.path.join(self.directory, "blobs", sha[:2], f"{sha}.png")
+
+    def _ref_path(self, pokemon_id: int, kind: str, size: str) -> str:
+        return os.path.join(self.directory, "refs", kind, size, str(pokemon_id))
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.chmod(tmp, 0o644)  # o nginx (outro usuário) lê os blobs
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+    # ------------------------------------------------------------------ leitura
+    def get(self, pokemon_id: int, kind: str, size: str) -> Optional[str]:
+        """sha256 da variante (buscando/gerando no primeiro pedido) ou None se não existir"""
+        if size == "thumb" and Image is None:
+            size = "original"
+        sha = self._cached(pokemon_id, kind, size)
+        if sha is not None:
+            self.hits += 1
+            return sha
+        self.misses += 1
+        return flights.do(f"sprite_{kind}_{size}_{pokemon_id}", lambda: self._fill(pokemon_id, kind, size))
+
+    def _cached(self, pokemon_id: int, kind: str, size: str) -> Optional[str]:
+        try:
+            with open(self._ref_path(pokemon_id, kind, size)) as fh:
+                sha = fh.read().strip()
+            mtime = os.stat(self.blob_path(sha)).st_mtime
+        except OSError:
+            return None  # sem ref ou blob removido pela limpeza: busca de novo
+        if time.time() - mtime > TOUCH_INTERVAL_SECONDS:
+            try:
+                os.utime(self.blob_path(sha))
+            except OSError:
+                pass
+        return sha
+
+    def _fill(self, pokemon_id: int, kind: str, size: str) -> Optional[str]:
+        if size == "thumb":
+            original, content = self._read_original(pokemon_id, kind)
+            if original is None:
+                return None
+            try:
+                data = _thumbnail(content, self.thumb_size)
+            except THUMBNAIL_ERRORS as exc:
+                # A miniatura dessa variante passa a ser o próprio original
+                logger.warning("Sprite %s/%s sem miniatura: %s", kind, pokemon_id, exc)
+                self._write_atomic(self._ref_path(pokemon_id, kind, size), original.encode())
+                return original
+        else:
+            data = self._download(pokemon_id, kind)
+            if data is None:
+                return None
+        sha = self._store(data)
+        self._write_atomic(self._ref_path(pokemon_id, kind, size), sha.encode())
+        return sha
+
+    def _read_original(self, pokemon_id: int, kind: str) -> Tuple[Optional[str], bytes]:
+        """(sha, bytes) do original, ou (None, b"") se não existir"""
+        original = self.get(pokemon_id, kind, "original")
+        try:
+            return original, self._read_blob(original)
+        except OSError:
+            # Blob removido pela limpeza (deste ou de outro worker) depois do get(): a ref
+            # ficou órfã e o get() busca de novo; uma segunda falha vira 503
+            original = self.get(pokemon_id, kind, "original")
+            try:
+                return original, self._read_blob(original)
+            except OSError as exc:
+                raise UpstreamUnavailable("Sprite original indisponível no cache em disco") from exc
+
+    def _read_blob(self, sha: Optional[str]) -> bytes:
+        if sha is None:
+            return b""
+        with open(self.blob_path(sha), "rb") as fh:
+            return fh.read()
+
+    def _download(self, pokemon_id: int, kind: str) -> Optional[bytes]:
+        not_found_key = f"notfound_sprite_{kind}_{pokemon_id}"
+        if cache.get(not_found_key) is not None:
+            return None
+        resp = self.client.get(SPRITE_PATHS[kind].format(id=pokemon_id), timeout=15)
+        if resp.status_code == 404:
+            cache.set(not_found_key, {"status": 404}, stale=0)
+            return None
+        if resp.status_code != 200:
+            raise UpstreamUnavailable(f"Host de sprites respondeu {resp.status_code}")
+        if len(resp.content) > MAX_IMAGE_BYTES:
+            raise UpstreamUnavailable("Sprite maior que o limite aceito")
+        return resp.content
+
+    # ------------------------------------------------------------------ escrita e limpeza
+    def _store(self, data: bytes) -> str:
+        sha = hashlib.sha256(data).hexdigest()
+        path = self.blob_path(sha)
+        if not os.path.exists(path):
+            self._write_atomic(path, data)
+            with self._lock:
+                if self._bytes is None or time.monotonic() - self._scanned_at > RESCAN_INTERVAL_SECONDS:
+                    self._bytes = self._scan()[1]
+                else:
+                    self._bytes += len(data)
+                over = self._bytes > self.max_bytes
+            if over:
+                self.evict()
+        return sha
+
+    def _scan(self) -> Tuple[list, int]:
+        """([(mtime, tamanho, caminho)], total) dos blobs no disco"""
+        blobs, total = [], 0
+        root = os.path.join(self.directory, "blobs")
+        for dirpath, _, names in os.walk(root):
+            for name in names:
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                blobs.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+        self._scanned_at = time.monotonic()
+        return blobs, total
+
+    def evict(self) -> int:
+        """Remove os blobs menos usados até ficar em 90% do limite. Retorna quantos.
+
+        As refs de blobs removidos ficam órfãs e viram miss no próximo pedido.
+        """
+        with self._lock:
+            blobs, total = self._scan()
+            removed = 0
+            target = self.max_bytes * 0.9
+            for _, size, path in sorted(blobs):
+                if total <= target:
+                    break
+                try:
+                    os.unlink(path)
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+            self._bytes = total
+            self.evicted += removed
+        if removed:
+            logger.info("Sprites: %s arquivos removidos do cache em disco", removed)
+        return removed
+
+    def stats(self) -> dict:
+        return {
+            "directory": self.directory,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evicted": self.evicted,
+            "thumbnails": Image is not None,
+            "accel_redirect": bool(self.accel_prefix),
+        }
+
+
+def _thumbnail(data: bytes, size: int) -> bytes:
+    with Image.open(io.BytesIO(data)) as img:
+        img.thumbnail((size, size), Image.LANCZOS)
+        out = io.BytesIO()
+        img.save(out, format="PNG", optimize=True)
+    return out.getvalue()
+
+
+sprite_store = SpriteStore()
+
+
+@sprites_bp.get("/sprites/<int:pokemon_id>")
+def sprite(pokemon_id: int):
+    """Sprite do Pokémon (mesma origem do frontend, cache imutável e ETag)"""
+    kind = request.args.get("kind", "default")
+    size = request.args.get("size", "original")
+    if kind not in SPRITE_PATHS:
+        return jsonify({"msg": f"kind inválido (use {', '.join(SPRITE_PATHS)})"}), 400
+    if size not in SIZES:
+        return jsonify({"msg": f"size inválido (use {', '.join(SIZES)})"}), 400
+
+    sha = sprite_store.get(pokemon_id, kind, size)
+    if sha is None:
+        return jsonify({"msg": "Sprite não encontrado"}), 404
+    headers = {"ETag": f'"{sha}"', "Cache-Control": IMMUTABLE}
+    if request.if_none_match.contains(sha):
+        return Response(status=304, headers=headers)
+    if sprite_store.accel_prefix:
+        # O nginx serve o arquivo (sendfile) a partir da location interna
+        headers["X-Accel-Redirect"] = f"{sprite_store.accel_prefix.rstrip('/')}/{sha[:2]}/{sha}.png"
+        return Response(status=200, headers=headers, mimetype="image/png")
+    try:
+        resp = send_file(sprite_store.blob_path(sha), mimetype="image/png", etag=False, conditional=False)
+    except OSError:
+        # Blob removido pela limpeza (deste ou de outro worker) depois do get(): busca de novo uma vez
+        sha = sprite_store.get(pokemon_id, kind, size)
+        if sha is None:
+            return jsonify({"msg": "Sprite não encontrado"}), 404
+        try:
+            resp = send_file(sprite_store.blob_path(sha), mimetype="image/png", etag=False, conditional=False)
+        except OSError:
+            return jsonify({"msg": "Sprite temporariamente indisponível"}), 503
+        headers["ETag"] = f'"{sha}"'
+    resp.headers.update(headers)
+    return resp
@@ -0,0 +1,131 @@
+"""Tabela de efetividade entre tipos e análise de cobertura da Equipe de Batalha.
+
+A tabela (ataque x defesa, 18x18 nos dados atuais) é montada uma vez por worker a
+partir de `damage_relations` dos tipos e guardada como tuplas de multiplicadores.
+Cada combinação de tipos de defesa vira um vetor com o multiplicador de cada tipo de
+ataque, calculado uma vez e memorizado (são no máximo ~170 combinações). Analisar a
+equipe ou pontuar candidatos é só somar/tomar o máximo coluna a coluna sobre esses
+vetores, sem consultar a PokéAPI por requisição.
+"""
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from .holder import TTLHolder
+
+CHART_TTL_SECONDS = 86400
+
+Vector = Tuple[float, ...]
+
+
+class TypeChart:
+    def __init__(self, types: Sequence[str], matrix: Sequence[Sequence[float]]):
+        self.types: Tuple[str, ...] = tuple(types)
+        self.position: Dict[str, int] = {name: i for i, name in enumerate(self.types)}
+        # matrix[ataque][defesa]
+        self.matrix: Tuple[Vector, ...] = tuple(tuple(row) for row in matrix)
+        self.columns: Tuple[Vector, ...] = tuple(zip(*self.matrix)) if self.matrix else ()
+        self._profiles: Dict[Tuple[str, ...], Vector] = {}
+
+    @classmethod
+    def from_relations(cls, relations: Dict[str, dict]) -> "TypeChart":
+        """`relations`: tipo -> { double_damage_to, half_damage_to, no_damage_to } (listas de nomes)"""
+        types = sorted(relations)
+        position = {name: i for i, name in enumerate(types)}
+        matrix = [[1.0] * len(types) for _ in types]
+        for attacker, rel in relations.items():
+            row = matrix[position[attacker]]
+            for key, factor in (("double_damage_to", 2.0), ("half_damage_to", 0.5), ("no_damage_to", 0.0)):
+                for defender in rel.get(key) or ():
+                    if defender in position:
+                        row[position[defender]] = factor
+        return cls(types, matrix)
+
+    def known(self, types: Iterable[str]) -> Tuple[str, ...]:
+        return tuple(sorted({t for t in types if t in self.position}))
+
+    def defense(self, types: Iterable[str]) -> Vector:
+        """Multiplicador de cada tipo de ataque contra a combinação `types`"""
+        key = self.known(types)
+        profile = self._profiles.get(key)
+        if profile is None:
+            profile = tuple(1.0 for _ in self.types)
+            for name in key:
+                column = self.columns[self.position[name]]
+                profile = tuple(a * b for a, b in zip(profile, column))
+            self._profiles[key] = profile
+        return profile
+
+    def offense(self, types: Iterable[str]) -> Vector:
+        """Melhor multiplicador contra cada tipo de defesa usando ataques dos tipos em `types`"""
+        rows = [self.matrix[self.position[name]] for name in self.known(types)]
+        if not rows:
+            return tuple(0.0 for _ in self.types)
+        return tuple(map(max, *rows)) if len(rows) > 1 else rows[0]
+
+
+def _counts(chart: TypeChart, profiles: Sequence[Vector]) -> Tuple[List[int], List[int]]:
+    """(fraquezas, resistências+imunidades) por tipo de ataque"""
+    weak = [0] * len(chart.types)
+    resist = [0] * len(chart.types)
+    for profile in profiles:
+        for i, factor in enumerate(profile):
+            if factor > 1:
+                weak[i] += 1
+            elif factor < 1:
+                resist[i] += 1
+    return weak, resist
+
+
+def _names(chart: TypeChart, flags: Iterable[bool]) -> List[str]:
+    return [name for name, flag in zip(chart.types, flags) if flag]
+
+
+def analyze_team(chart: TypeChart, members: Sequence[Sequence[str]]) -> dict:
+    """Fraquezas, resistências e cobertura ofensiva de uma equipe (tipos de cada integrante)"""
+    profiles = [chart.defense(types) for types in members]
+    weak, resist = _counts(chart, profiles)
+    immune = [sum(1 for p in profiles if p[i] == 0) for i in range(len(chart.types))]
+    offense = chart.offense(t for types in members for t in types)
+    return {
+        "types": list(chart.types),
+        "defense": {
+            name: {"weak": weak[i], "resist": resist[i] - immune[i], "immune": immune[i],
+                   "worst": max((p[i] for p in profiles), default=1.0)}
+            for i, name in enumerate(chart.types)
+        },
+        # Tipos de ataque que acertam mais integrantes do que os que resistem
+        "weaknesses": _names(chart, (w > r for w, r in zip(weak, resist))),
+        "resistances": _names(chart, (r > w for w, r in zip(weak, resist))),
+        "coverage": dict(zip(chart.types, offense)),
+        "superEffective": _names(chart, (f > 1 for f in offense)),
+        "notVeryEffective": _names(chart, (f < 1 for f in offense)),
+    }
+
+
+def score_candidates(chart: TypeChart, members: Sequence[Sequence[str]],
+                     candidates: Dict[str, Sequence[str]]) -> List[dict]:
+    """Pontua cada candidato somando o vetor dele aos da equipe atual.
+
+    score = tipos que passam a ser cobertos com super efetivo
+          + fraquezas da equipe que deixam de existir - fraquezas novas
+    """
+    weak, resist = _counts(chart, [chart.defense(types) for types in members])
+    offense = chart.offense(t for types in members for t in types)
+    weak_before = [w > r for w, r in zip(weak, resist)]
+
+    scored = []
+    for name, types in candidates.items():
+        profile = chart.defense(types)
+        new_offense = chart.offense(types)
+        weak_after = [w + (f > 1) > r + (f < 1) for w, r, f in zip(weak, resist, profile)]
+        gained = _names(chart, (n > 1 >= o for o, n in zip(offense, new_offense)))
+        fixes = _names(chart, (b and not a for b, a in zip(weak_before, weak_after)))
+        adds = _names(chart, (a and not b for b, a in zip(weak_before, weak_after)))
+        scored.append({
+            "name": name, "types": list(types), "score": len(gained) + len(fixes) - len(adds),
+            "newCoverage": gained, "fixesWeaknesses": fixes, "addsWeaknesses": adds,
+        })
+    scored.sort(key=lambda item: -item["score"])
+    return scored
+
+
+type_chart: TTLHolder[TypeChart] = TTLHolder(CHART_TTL_SECONDS)
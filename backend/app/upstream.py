@@ -0,0 +1,252 @@
+"""Cliente HTTP compartilhado para a PokéAPI.
+
+- Session com pool de conexões keep-alive (sem novo handshake TCP+TLS por chamada);
+- retry com backoff exponencial e jitter em 429/5xx/erros de conexão, respeitando Retry-After;
+- token bucket limitando a taxa de requisições de saída;
+- circuit breaker: com a PokéAPI fora do ar, falha rápido (UpstreamUnavailable) e o
+  cache continua servindo o que tiver, inclusive valores stale.
+"""
+import email.utils
+import logging
+import os
+import random
+import threading
+import time
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class UpstreamUnavailable(requests.RequestException):
+    """PokéAPI indisponível (circuito aberto ou limite de taxa esgotado)"""
+
+    def __init__(self, msg: str, retry_after: Optional[float] = None):
+        super().__init__(msg)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Limita a taxa de saída: `rate` tokens/s com rajadas de até `burst`"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, max_wait: float) -> bool:
+        if self.rate <= 0:
+            return True
+        deadline = time.monotonic() + max_wait
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """closed → open após `threshold` chamadas com falha seguidas; após `cooldown`, half-open
+    libera uma sonda (o chamador de allow() deve sempre registrar sucesso ou falha)"""
+
+    def __init__(self, threshold: int = 5, cooldown: float = 30):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.cooldown:
+                return "half-open"
+            return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.cooldown or self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def retry_after(self) -> float:
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            return max(0.0, self.cooldown - (time.monotonic() - self._opened_at))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._failures >= self.threshold:
+                if self._opened_at is None or time.monotonic() - self._opened_at >= self.cooldown:
+                    logger.warning("PokéAPI: circuito aberto após %s falhas seguidas", self._failures)
+                self._opened_at = time.monotonic()
+
+
+def _retry_after_seconds(resp: requests.Response) -> Optional[float]:
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class UpstreamClient:
+    def __init__(self, base_url: str = "https://pokeapi.co/api/v2", pool_size: int = 16,
+                 max_retries: int = 3, backoff_base: float = 0.25, backoff_max: float = 8.0,
+                 rate: float = 20.0, burst: int = 40, breaker_threshold: int = 5,
+                 breaker_cooldown: float = 30.0):
+        self.base_url = base_url
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(breaker_threshold, breaker_cooldown)
+        self._local_session: Optional[requests.Session] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.rejected = 0
+
+    def init_app(self, app) -> None:
+        cfg = app.config
+        self.base_url = cfg.get("POKEAPI_BASE_URL", self.base_url).rstrip("/")
+        self.pool_size = cfg.get("POKEAPI_POOL_SIZE", self.pool_size)
+        self.max_retries = cfg.get("POKEAPI_MAX_RETRIES", self.max_retries)
+        self.backoff_base = cfg.get("POKEAPI_BACKOFF_BASE", self.backoff_base)
+        self.backoff_max = cfg.get("POKEAPI_BACKOFF_MAX", self.backoff_max)
+        self.bucket = TokenBucket(cfg.get("POKEAPI_RATE_LIMIT", self.bucket.rate),
+                                  cfg.get("POKEAPI_RATE_BURST", self.bucket.burst))
+        self.breaker = CircuitBreaker(cfg.get("POKEAPI_BREAKER_THRESHOLD", self.breaker.threshold),
+                                      cfg.get("POKEAPI_BREAKER_COOLDOWN", self.breaker.cooldown))
+        self._local_session = None
+        app.extensions["pokeapi_upstream"] = self
+
+    @property
+    def session(self) -> requests.Session:
+        # Session por processo: o pool de sockets não pode ser herdado pelo fork
+        if self._local_session is None or self._pid != os.getpid():
+            with self._lock:
+                if self._local_session is None or self._pid != os.getpid():
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size,
+                                          pool_block=True, max_retries=0)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    session.headers.update({"Accept": "application/json", "Connection": "keep-alive"})
+                    self._local_session = session
+                    self._pid = os.getpid()
+        return self._local_session
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        # Full jitter: uniforme entre 0 e base * 2^tentativa
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def get(self, path: str, params: Optional[dict] = None, timeout: float = 15) -> requests.Response:
+        """GET em `path` (relativo à base da PokéAPI ou URL absoluta).
+
+        Devolve a última resposta (inclusive 4xx/5xx após esgotar as tentativas) ou
+        levanta requests.RequestException / UpstreamUnavailable.
+        """
+        url = path if path.startswith("http") else f"{self.base_url}{path}"
+        # Token antes do circuito: quem espera pela taxa não segura a sonda do half-open
+        if not self.bucket.acquire(max_wait=timeout):
+            self.rejected += 1
+            raise UpstreamUnavailable("Limite de requisições à PokéAPI excedido", 1.0)
+        if not self.breaker.allow():
+            self.rejected += 1
+            raise UpstreamUnavailable("PokéAPI indisponível (circuito aberto)", self.breaker.retry_after())
+
+        # O circuito conta uma falha por chamada (não por tentativa) e sempre recebe o
+        # resultado, mesmo com exceção inesperada: senão a sonda ficaria presa
+        failed = True
+        try:
+            resp = self._attempts(url, path, params, timeout)
+            failed = resp.status_code in RETRY_STATUSES
+            return resp
+        finally:
+            if failed:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+
+    def _attempts(self, url: str, path: str, params: Optional[dict], timeout: float) -> requests.Response:
+        attempt = 0
+        while True:
+            self.requests += 1
+            started = time.perf_counter()
+            try:
+                resp = self.session.get(url, params=params, timeout=timeout)
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                metrics.observe_upstream(path, None, time.perf_counter() - started)
+                if attempt >= self.max_retries:
+                    raise
+                retry_after = None
+                logger.info("PokéAPI %s falhou (%s), nova tentativa", url, exc)
+            else:
+                metrics.observe_upstream(path, resp.status_code, time.perf_counter() - started)
+                if resp.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return resp
+                retry_after = _retry_after_seconds(resp)
+                logger.info("PokéAPI %s respondeu %s, nova tentativa", url, resp.status_code)
+
+            time.sleep(self._backoff(attempt, retry_after))
+            attempt += 1
+            self.retries += 1
+            if not self.bucket.acquire(max_wait=timeout):
+                self.rejected += 1
+                raise UpstreamUnavailable("Limite de requisições à PokéAPI excedido", 1.0)
+
+    def stats(self) -> dict:
+        return {
+            "base_url": self.base_url,
+            "requests": self.requests,
+            "retries": self.retries,
+            "rejected": self.rejected,
+            "circuit": self.breaker.state,
+            "pool_size": self.pool_size,
+            "rate_limit_per_second": self.bucket.rate,
+        }
+
+
+upstream = UpstreamClient()
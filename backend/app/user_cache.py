@@ -0,0 +1,79 @@
+"""Cache em memória (por worker) dos dados de usuário usados na autorização.
+
+A cada requisição autenticada o token é conferido contra a versão atual do usuário
+(TokenVersao), para manter a revogação; este cache evita que isso vire uma leitura
+no banco por requisição. Alterações feitas neste processo invalidam a entrada na
+hora; nos demais workers ela expira após `ttl` segundos.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from . import db
+from .models import Usuario
+
+
+def user_snapshot(user: Usuario) -> dict:
+    """Dados públicos do usuário (mesmo formato de `user` em /login e /register)"""
+    return {
+        "id": user.IDUsuario,
+        "nome": user.Nome,
+        "email": user.Email,
+        "login": user.Login,
+        "isAdmin": bool(user.IsAdmin),
+        "tokenVersao": user.TokenVersao or 0,
+    }
+
+
+class UserCache:
+    def __init__(self, ttl: float = 60, max_items: int = 10000):
+        self.ttl = ttl
+        self.max_items = max_items
+        self._lock = threading.Lock()
+        # id -> (expira_em, snapshot ou None para usuário inexistente)
+        self._data: "OrderedDict[int, Tuple[float, Optional[dict]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app) -> None:
+        self.ttl = app.config.get("AUTH_USER_CACHE_TTL", self.ttl)
+        self.max_items = app.config.get("AUTH_USER_CACHE_MAX", self.max_items)
+        app.extensions["user_cache"] = self
+
+    def get(self, user_id: int) -> Optional[dict]:
+        """Snapshot do usuário (None se não existir), lendo do banco só no miss"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._data.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        user = db.session.get(Usuario, user_id)
+        snapshot = user_snapshot(user) if user is not None else None
+        self.put(user_id, snapshot)
+        return snapshot
+
+    def put(self, user_id: int, snapshot: Optional[dict]) -> None:
+        with self._lock:
+            self._data[user_id] = (time.monotonic() + self.ttl, snapshot)
+            self._data.move_to_end(user_id)
+            while len(self._data) > self.max_items:
+                self._data.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._data.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"items": len(self._data), "hits": self.hits, "misses": self.misses, "ttl_seconds": self.ttl}
+
+
+user_cache = UserCache()
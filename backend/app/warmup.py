@@ -0,0 +1,212 @@
+"""Aquecimento do cache no boot e snapshot do cache em memória entre deploys.
+
+- Aquecimento (`CACHE_WARM`): busca as listas de Pokémon pedidas pelo frontend, a lista e
+  o detalhe de todos os tipos e os primeiros N detalhes, com no máximo
+  `CACHE_WARM_CONCURRENCY` chamadas simultâneas à PokéAPI.
+  `sync` aquece dentro do create_app: com `gunicorn --preload` isso roda uma vez no master
+  e os workers herdam o cache pronto (copy-on-write). `background` aquece em uma thread em
+  cada worker, sem atrasar o boot (modo async, em que o preload não é usado); `1` equivale
+  a `background`.
+- Snapshot (`CACHE_SNAPSHOT_PATH`): ao sair, o worker grava as entradas do cache em memória
+  com os prazos restantes; no boot seguinte elas são recarregadas antes de qualquer
+  requisição (e antes do aquecimento, que então só busca o que faltar).
+"""
+import atexit
+import gc
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from .cache import cache
+from .refresh import refresher
+from .type_chart import type_chart
+
+logger = logging.getLogger(__name__)
+
+_SNAPSHOT_VERSION = 1
+
+
+def _parse_lists(spec: str) -> List[Tuple[int, int]]:
+    """"1000:0,302:1000" -> [(1000, 0), (302, 1000)] (limit:offset)"""
+    pages = []
+    for item in spec.split(","):
+        limit, _, offset = item.strip().partition(":")
+        if limit:
+            pages.append((int(limit), int(offset or 0)))
+    return pages
+
+
+class CacheWarmer:
+    def __init__(self, mode: str = "", lists: str = "1000:0", details: int = 50,
+                 types: bool = True, concurrency: int = 4, snapshot_path: Optional[str] = None):
+        self.mode = mode
+        self.lists = _parse_lists(lists)
+        self.details = details
+        self.types = types
+        self.concurrency = concurrency
+        self.snapshot_path = snapshot_path
+        self.app = None
+        self._forked = False
+        self._hooks_registered = False
+        self._booted_at = 0.0
+        self.last_run: dict = {}
+
+    def init_app(self, app) -> None:
+        self.app = app
+        self.mode = (app.config.get("CACHE_WARM") or "").lower()
+        if self.mode in ("1", "true"):
+            self.mode = "background"
+        self.lists = _parse_lists(app.config.get("CACHE_WARM_LISTS", "1000:0"))
+        self.details = app.config.get("CACHE_WARM_DETAILS", self.details)
+        self.types = app.config.get("CACHE_WARM_TYPES", self.types)
+        self.concurrency = max(1, app.config.get("CACHE_WARM_CONCURRENCY", self.concurrency))
+        self.snapshot_path = app.config.get("CACHE_SNAPSHOT_PATH", self.snapshot_path)
+        self._booted_at = time.time()
+        app.extensions["cache_warmer"] = self
+
+        if self.snapshot_path:
+            self.load_snapshot()
+            if not self._hooks_registered:
+                self._hooks_registered = True
+                atexit.register(self._save_at_exit)
+                os.register_at_fork(after_in_parent=self._mark_forked)
+        if self.mode == "sync":
+            # Stale do snapshot fica para os workers revalidarem: nada de threads no master
+            with refresher.paused():
+                self.warm()
+            # Tira o que já existe do alcance do GC: as varreduras dos workers não tocam
+            # mais nessas páginas e elas continuam compartilhadas depois do fork
+            gc.freeze()
+        elif self.mode == "background":
+            threading.Thread(target=self.warm, name="cache-warm", daemon=True).start()
+
+    # ------------------------------------------------------------------ aquecimento
+    def warm(self) -> dict:
+        """Busca (ou confirma no cache) as chaves mais pedidas logo após um deploy"""
+        from .pokeapi import fetch_pokemon_detail, fetch_pokemon_list, fetch_type_detail, fetch_type_list
+
+        started = time.monotonic()
+        summary = {"lists": 0, "types": 0, "details": 0, "errors": 0}
+
+        def run(kind: str, fn, *args):
+            try:
+                with self.app.app_context():
+                    data, status = fn(*args)
+            except Exception as exc:  # aquecimento nunca derruba o boot
+                logger.warning("Falha ao aquecer %s%s: %s", fn.__name__, args, exc)
+                summary["errors"] += 1
+                return None
+            if status != 200:
+                summary["errors"] += 1
+                return None
+            summary[kind] += 1
+            return data
+
+        # Pool próprio e descartado ao final: threads criadas no master não sobrevivem ao fork
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="cache-warm") as pool:
+            pages = list(pool.map(lambda page: run("lists", fetch_pokemon_list, *page), self.lists))
+            jobs = []
+            if self.types:
+                type_list = run("types", fetch_type_list)
+                for t in (type_list or {}).get("results", []):
+                    jobs.append(pool.submit(run, "types", fetch_type_detail, t["name"]))
+            first_page = next((page for page in pages if page), None) or {}
+            for p in first_page.get("results", [])[:self.details]:
+                jobs.append(pool.submit(run, "details", fetch_pokemon_detail, p["name"]))
+            for job in jobs:
+                job.result()
+        if self.types:
+            # Tabela de efetividade (análise da equipe) a partir dos tipos recém-aquecidos
+            try:
+                with self.app.app_context():
+                    type_chart.get()
+            except Exception as exc:
+                logger.warning("Falha ao montar a tabela de tipos: %s", exc)
+                summary["errors"] += 1
+
+        summary["seconds"] = round(time.monotonic() - started, 3)
+        self.last_run = summary
+        logger.info("Cache aquecido: %s", summary)
+        return summary
+
+    # ------------------------------------------------------------------ snapshot
+    def save_snapshot(self) -> int:
+        """Grava as entradas do cache em memória (escrita atômica). Retorna quantas.
+
+        Cada worker tem o próprio cache: as chaves gravadas por outro worker depois do boot
+        deste, e que ele não tem, são mantidas no arquivo.
+        """
+        now = time.time()
+        entries = cache.snapshot()
+        previous = self._read_snapshot()
+        if previous and previous.get("written_at", 0) >= self._booted_at:
+            own = {entry[0] for entry in entries}
+            elapsed = now - previous["written_at"]
+            others = [[key, value, fresh - elapsed, hard - elapsed]
+                      for key, value, fresh, hard in previous.get("entries", [])
+                      if key not in own and hard - elapsed > 0]
+            entries = others + entries
+        payload = {"version": _SNAPSHOT_VERSION, "written_at": now, "entries": entries}
+        tmp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=1) as fh:
+            json.dump(payload, fh, separators=(",", ":"))
+        os.replace(tmp_path, self.snapshot_path)
+        return len(entries)
+
+    def _read_snapshot(self) -> Optional[dict]:
+        try:
+            with gzip.open(self.snapshot_path, "rt", encoding="utf-8") as fh:
+                payload = json.load(fh)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as exc:
+            logger.warning("Snapshot do cache ignorado (%s): %s", self.snapshot_path, exc)
+            return None
+        return payload if payload.get("version") == _SNAPSHOT_VERSION else None
+
+    def load_snapshot(self) -> int:
+        """Recarrega o snapshot descontando o tempo em que o serviço ficou fora"""
+        from .pokeapi import _encode_variants
+
+        payload = self._read_snapshot()
+        if payload is None:
+            return 0
+
+        elapsed = max(0.0, time.time() - payload.get("written_at", 0))
+        loaded = 0
+        # Gravado do menos para o mais recente: a ordem do LRU é preservada
+        for key, value, fresh_left, hard_left in payload.get("entries", []):
+            fresh_left -= elapsed
+            hard_left -= elapsed
+            if hard_left <= 0:
+                continue
+            cache.set(key, value, fresh_left, hard_left - fresh_left, encoded=_encode_variants(key, value))
+            loaded += 1
+        logger.info("Snapshot do cache: %s entradas carregadas de %s", loaded, self.snapshot_path)
+        return loaded
+
+    def _mark_forked(self) -> None:
+        self._forked = True
+
+    def _save_at_exit(self) -> None:
+        # O master do --preload (processo que fez fork) só tem o aquecimento; quem grava são
+        # os workers, que herdam este handler e acumularam o que foi realmente pedido
+        if self._forked:
+            return
+        try:
+            count = self.save_snapshot()
+            logger.info("Snapshot do cache: %s entradas gravadas em %s", count, self.snapshot_path)
+        except OSError as exc:
+            logger.warning("Falha ao gravar o snapshot do cache: %s", exc)
+
+    def stats(self) -> dict:
+        return {"mode": self.mode or "off", "snapshot_path": self.snapshot_path or None,
+                "last_run": self.last_run}
+
+
+warmer = CacheWarmer()
@@ -0,0 +1,7 @@
+"""Benchmarks reproduzíveis do backend contra um stub local da PokéAPI.
+
+    cd backend
+    python -m bench.run                          # todos os cenários, resultados em bench-results.json
+    python -m bench.run cold_cache warm_cache --out depois.json --compare antes.json
+    python -m bench.stub --port 8765 --latency 80 --rate-429 0.02   # só o stub, para testes manuais
+"""
@@ -0,0 +1,62 @@
+"""Compara dois resultados de `bench.run` (p50/p95/p99 e vazão por cenário e endpoint).
+
+    python -m bench.compare antes.json depois.json
+"""
+import argparse
+import json
+from typing import List, Optional
+
+METRICS = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def _delta(old: float, new: float) -> Optional[float]:
+    return round((new - old) / old * 100, 1) if old else None
+
+
+def compare(base: dict, current: dict) -> List[dict]:
+    """Linhas { cenário, endpoint, métrica, antes, depois, variação_% } dos pares presentes nos dois"""
+    rows = []
+    for name, scenario in current["scenarios"].items():
+        old_scenario = base.get("scenarios", {}).get(name)
+        if old_scenario is None:
+            continue
+        rows.append({"scenario": name, "endpoint": "*", "metric": "throughput_rps",
+                     "base": old_scenario["throughput_rps"], "current": scenario["throughput_rps"],
+                     "change_pct": _delta(old_scenario["throughput_rps"], scenario["throughput_rps"])})
+        for label, stats in scenario["endpoints"].items():
+            old = old_scenario["endpoints"].get(label)
+            if old is None:
+                continue
+            for metric in METRICS:
+                rows.append({"scenario": name, "endpoint": label, "metric": metric, "base": old[metric],
+                             "current": stats[metric], "change_pct": _delta(old[metric], stats[metric])})
+    return rows
+
+
+def print_comparison(rows: List[dict]) -> None:
+    print(f"\n{'cenário':<16} {'endpoint':<44} {'métrica':<15} {'antes':>10} {'depois':>10} {'var.':>8}")
+    for row in rows:
+        change = "—" if row["change_pct"] is None else f"{row['change_pct']:+.1f}%"
+        print(f"{row['scenario']:<16} {row['endpoint']:<44} {row['metric']:<15} "
+              f"{row['base']:>10} {row['current']:>10} {change:>8}")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base")
+    parser.add_argument("current")
+    parser.add_argument("--json", action="store_true", help="imprime as linhas em JSON")
+    args = parser.parse_args(argv)
+    with open(args.base, encoding="utf-8") as fh:
+        base = json.load(fh)
+    with open(args.current, encoding="utf-8") as fh:
+        current = json.load(fh)
+    rows = compare(base, current)
+    if args.json:
+        print(json.dumps(rows, indent=2, ensure_ascii=False))
+    else:
+        print_comparison(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Dados servidos pelo stub: gerados (determinísticos, sem rede) ou gravados da PokéAPI real.
+
+    python -m bench.fixtures record --count 151 --out bench/pokeapi-151.json.gz
+"""
+import abc
+import argparse
+import gzip
+import json
+import random
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+TYPES = ("normal", "fighting", "flying", "poison", "ground", "rock", "bug", "ghost", "steel",
+         "fire", "water", "grass", "electric", "psychic", "ice", "dragon", "dark", "fairy")
+STATS = ("hp", "attack", "defense", "special-attack", "special-defense", "speed")
+
+BASE = "https://pokeapi.co/api/v2"
+
+
+class Fixtures(abc.ABC):
+    """Interface usada pelo stub: lista de (id, nome), detalhe e pertinência a tipos"""
+
+    pokemon: List[Tuple[int, str]]
+
+    @abc.abstractmethod
+    def detail(self, ref: str) -> Optional[dict]:
+        """Detalhe no formato da PokéAPI, por nome ou id (None se não existir)"""
+
+    @lru_cache(maxsize=None)
+    def type_members(self) -> Dict[str, List[Tuple[int, str, int]]]:
+        members: Dict[str, List[Tuple[int, str, int]]] = {name: [] for name in TYPES}
+        for pid, name in self.pokemon:
+            for t in self.detail(name)["types"]:
+                members.setdefault(t["type"]["name"], []).append((pid, name, t["slot"]))
+        return members
+
+
+class SyntheticFixtures(Fixtures):
+    """`count` Pokémon com o formato e o tamanho aproximado das respostas reais"""
+
+    def __init__(self, count: int = 1025, moves: int = 80, seed: int = 42):
+        self.count = count
+        self.moves = moves
+        self.seed = seed
+        self.pokemon = [(i, f"bench-{i:04d}") for i in range(1, count + 1)]
+        self._by_name = {name: pid for pid, name in self.pokemon}
+
+    def detail(self, ref: str) -> Optional[dict]:
+        pid = int(ref) if ref.isdigit() else self._by_name.get(ref)
+        if pid is None or not 1 <= pid <= self.count:
+            return None
+        return self._detail(pid)
+
+    @lru_cache(maxsize=None)
+    def _detail(self, pid: int) -> dict:
+        rnd = random.Random(self.seed * 100003 + pid)
+        name = f"bench-{pid:04d}"
+        types = [TYPES[pid % len(TYPES)]]
+        if pid % 3 == 0 and TYPES[(pid * 7) % len(TYPES)] != types[0]:
+            types.append(TYPES[(pid * 7) % len(TYPES)])
+        sprite = f"{BASE}/sprites/pokemon/{pid}.png"
+        return {
+            "id": pid, "name": name, "order": pid, "is_default": True,
+            "height": rnd.randint(3, 40), "weight": rnd.randint(10, 2000),
+            "base_experience": rnd.randint(40, 300),
+            "species": {"name": name, "url": f"{BASE}/pokemon-species/{pid}/"},
+            "types": [{"slot": i + 1, "type": {"name": t, "url": f"{BASE}/type/{TYPES.index(t) + 1}/"}}
+                      for i, t in enumerate(types)],
+            "stats": [{"base_stat": rnd.randint(20, 160), "effort": 0, "stat": {"name": s, "url": ""}}
+                      for s in STATS],
+            "abilities": [{"ability": {"name": f"ability-{rnd.randint(1, 300)}", "url": ""},
+                           "is_hidden": i == 1, "slot": i + 1} for i in range(2)],
+            "sprites": {
+                "front_default": sprite, "back_default": sprite.replace("pokemon/", "pokemon/back/"),
+                "other": {"official-artwork": {"front_default": sprite.replace("pokemon/", "artwork/")}},
+                "versions": {f"generation-{g}": {"front_default": sprite} for g in range(1, 9)},
+            },
+            "moves": [{
+                "move": {"name": f"move-{rnd.randint(1, 900)}", "url": f"{BASE}/move/{rnd.randint(1, 900)}/"},
+                "version_group_details": [{
+                    "level_learned_at": rnd.randint(0, 60),
+                    "move_learn_method": {"name": "level-up", "url": f"{BASE}/move-learn-method/1/"},
+                    "version_group": {"name": f"vg-{v}", "url": f"{BASE}/version-group/{v}/"},
+                } for v in range(1, 4)],
+            } for _ in range(self.moves)],
+            "game_indices": [{"game_index": pid, "version": {"name": f"v-{v}", "url": ""}} for v in range(20)],
+            "cries": {"latest": f"{BASE}/cries/{pid}.ogg", "legacy": None},
+        }
+
+
+class RecordedFixtures(Fixtures):
+    """Respostas gravadas da PokéAPI real (`record`)"""
+
+    def __init__(self, path: str):
+        with gzip.open(path, "rt", encoding="utf-8") as fh:
+            data = json.load(fh)
+        self.details: Dict[str, dict] = data["details"]
+        self.pokemon = sorted((d["id"], name) for name, d in self.details.items())
+        self._by_id = {str(pid): name for pid, name in self.pokemon}
+
+    def detail(self, ref: str) -> Optional[dict]:
+        return self.details.get(self._by_id.get(ref, ref))
+
+
+def load(path: Optional[str] = None, count: int = 1025, moves: int = 80) -> Fixtures:
+    return RecordedFixtures(path) if path else SyntheticFixtures(count, moves)
+
+
+def record(base_url: str, count: int, out: str) -> int:
+    """Grava os `count` primeiros Pokémon da PokéAPI (detalhes completos) em `out`"""
+    session = requests.Session()
+    resp = session.get(f"{base_url}/pokemon", params={"limit": count, "offset": 0}, timeout=30)
+    resp.raise_for_status()
+    details = {}
+    for entry in resp.json()["results"]:
+        detail = session.get(entry["url"], timeout=30)
+        detail.raise_for_status()
+        details[entry["name"]] = detail.json()
+    with gzip.open(out, "wt", encoding="utf-8") as fh:
+        json.dump({"source": base_url, "details": details}, fh, separators=(",", ":"))
+    return len(details)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("record", help="grava fixtures a partir da PokéAPI real")
+    rec.add_argument("--base-url", default=BASE)
+    rec.add_argument("--count", type=int, default=151)
+    rec.add_argument("--out", required=True)
+    args = parser.parse_args(argv)
+    print(f"{record(args.base_url, args.count, args.out)} Pokémon gravados em {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""Executa os cenários e grava vazão e p50/p95/p99 por endpoint em JSON.
+
+Cada cenário sobe um backend novo (gunicorn, ou `flask run` se não houver gunicorn) com
+banco e cache em um diretório temporário, apontado para o stub da PokéAPI.
+
+    python -m bench.run [cenário ...] [--out arquivo.json] [--compare base.json]
+"""
+import argparse
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import requests
+
+from . import stub as stub_module
+from .compare import compare, print_comparison
+from .scenarios import SCENARIOS, Context
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Percentil por posição mais próxima (nearest-rank)"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values) + 0.5 - 1e-9)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(samples: List[float], errors: int, elapsed: float) -> dict:
+    values = sorted(samples)
+    ms = lambda seconds: round(seconds * 1000, 3)  # noqa: E731
+    return {
+        "count": len(values),
+        "errors": errors,
+        "throughput_rps": round(len(values) / elapsed, 2) if elapsed > 0 else 0.0,
+        "mean_ms": ms(sum(values) / len(values)) if values else 0.0,
+        "p50_ms": ms(percentile(values, 50)),
+        "p95_ms": ms(percentile(values, 95)),
+        "p99_ms": ms(percentile(values, 99)),
+        "max_ms": ms(values[-1]) if values else 0.0,
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Backend:
+    """Processo do backend com banco, cache em disco e log próprios"""
+
+    def __init__(self, options, pokeapi_url: str, env: Dict[str, str]):
+        self.options = options
+        self.port = _free_port()
+        self.url = f"http://127.0.0.1:{self.port}/api"
+        self.tmp = tempfile.TemporaryDirectory(prefix="pokedex-bench-")
+        self.env = dict(os.environ,
+                        DATABASE_URL=f"sqlite:///{os.path.join(self.tmp.name, 'app.db')}",
+                        CACHE_DB_PATH=os.path.join(self.tmp.name, "cache.db"),
+                        CACHE_SNAPSHOT_PATH="", CACHE_WARM="",
+                        POKEAPI_BASE_URL=pokeapi_url, DB_AUTO_MIGRATE="1")
+        if options.server_mode == "async":
+            self.env.update(POKEAPI_POOL_SIZE="200", POKEAPI_MAX_WORKERS="64")
+        self.env.update(env)
+        for item in options.env:
+            key, _, value = item.partition("=")
+            self.env[key] = value
+        self.process: Optional[subprocess.Popen] = None
+
+    def command(self) -> List[str]:
+        try:
+            import gunicorn  # noqa: F401
+        except ImportError:
+            return [sys.executable, "-m", "flask", "--app", "app", "run", "--port", str(self.port),
+                    "--with-threads", "--no-reload"]
+        cmd = [sys.executable, "-m", "gunicorn", "--bind", f"127.0.0.1:{self.port}",
+               "--workers", str(self.options.workers), "--timeout", "120", "--graceful-timeout", "5"]
+        if self.options.server_mode == "async":
+            cmd += ["--worker-class", "gevent", "--worker-connections", "1000"]
+        else:
+            cmd += ["--threads", str(self.options.threads)]
+        return cmd + ["app:create_app()"]
+
+    def __enter__(self) -> "Backend":
+        # As migrações rodam antes, para os workers não disputarem o DDL
+        subprocess.run([sys.executable, "-m", "flask", "--app", "app", "db-upgrade"], cwd=BACKEND_DIR,
+                       env=self.env, check=True, capture_output=True)
+        self.log = open(os.path.join(self.tmp.name, "backend.log"), "w")
+        self.process = subprocess.Popen(self.command(), cwd=BACKEND_DIR, env=dict(self.env, DB_AUTO_MIGRATE="0"),
+                                        stdout=self.log, stderr=subprocess.STDOUT)
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"backend encerrou ao subir (log em {self.log.name})")
+            try:
+                if requests.get(f"{self.url}/health", timeout=1).ok:
+                    return self
+            except requests.RequestException:
+                pass
+            time.sleep(0.2)
+        raise RuntimeError("backend não respondeu a /api/health em 30s")
+
+    def __exit__(self, *exc) -> None:
+        if self.process is not None:
+            self.process.terminate()
+            try:
+                self.process.wait(15)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.log.close()
+        self.tmp.cleanup()
+
+
+def run_scenario(name: str, options, stub: stub_module.StubServer) -> dict:
+    fn, env = SCENARIOS[name]
+    stub.state.control({"latency_ms": options.latency, "jitter_ms": options.jitter,
+                        "error_rate": options.error_rate, "rate_429": options.rate_429,
+                        "retry_after": options.retry_after})
+    with Backend(options, stub.url, env) as backend:
+        ctx = Context(backend.url, stub, options)
+        calls_before = stub.state.calls.copy()
+        try:
+            extra = fn(ctx)
+        finally:
+            ctx.close()
+        elapsed = time.perf_counter() - ctx.recorder.started
+        calls = stub.state.calls - calls_before
+    endpoints = {label: summarize(values, ctx.recorder.errors.get(label, 0), elapsed)
+                 for label, values in sorted(ctx.recorder.samples.items())}
+    total = sum(e["count"] for e in endpoints.values())
+    return {
+        "duration_s": round(elapsed, 3),
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 2) if elapsed > 0 else 0.0,
+        "errors": sum(e["errors"] for e in endpoints.values()),
+        "upstream_calls": dict(sorted(calls.items())),
+        "endpoints": endpoints,
+        **extra,
+    }
+
+
+def print_results(results: dict) -> None:
+    for name, scenario in results["scenarios"].items():
+        print(f"\n== {name}: {scenario['requests']} req em {scenario['duration_s']}s "
+              f"({scenario['throughput_rps']} req/s, {scenario['errors']} erros, "
+              f"{sum(scenario['upstream_calls'].values())} chamadas à PokéAPI)")
+        print(f"   {'endpoint':<48} {'n':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        for label, e in scenario["endpoints"].items():
+            print(f"   {label:<48} {e['count']:>6} {e['p50_ms']:>9} {e['p95_ms']:>9} {e['p99_ms']:>9}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("scenarios", nargs="*", metavar="cenário",
+                        help=f"padrão: todos ({', '.join(SCENARIOS)})")
+    parser.add_argument("--out", default="bench-results.json")
+    parser.add_argument("--compare", metavar="BASE", help="compara com um resultado anterior")
+    parser.add_argument("--server-mode", choices=("threads", "async"), default="threads")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--env", action="append", default=[], metavar="CHAVE=VALOR",
+                        help="variável extra para o backend (repetível)")
+    parser.add_argument("--details", type=int, default=50, help="detalhes por página (cold/warm)")
+    parser.add_argument("--iterations", type=int, default=10, help="repetições (warm_cache, page_load*)")
+    parser.add_argument("--concurrency", type=int, default=16, help="clientes simultâneos (warm_cache)")
+    parser.add_argument("--herd", type=int, default=100, help="requisições simultâneas (thundering_herd)")
+    parser.add_argument("--users", type=int, default=20, help="usuários simultâneos (write_storm)")
+    stub_module.add_arguments(parser)
+    options = parser.parse_args(argv)
+    unknown = [name for name in options.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"cenário desconhecido: {', '.join(unknown)}")
+
+    stub = stub_module.StubServer(stub_module.state_from_args(options)).start()
+    results = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "options": {k: v for k, v in vars(options).items() if k not in ("out", "compare", "scenarios")},
+        },
+        "scenarios": {},
+    }
+    try:
+        for name in options.scenarios or list(SCENARIOS):
+            print(f"-> {name}", file=sys.stderr)
+            results["scenarios"][name] = run_scenario(name, options, stub)
+    finally:
+        stub.stop()
+
+    with open(options.out, "w", encoding="utf-8") as fh:
+        json.dump(results, fh, indent=2, ensure_ascii=False)
+    print_results(results)
+    print(f"\nResultados em {options.out}")
+    if options.compare:
+        with open(options.compare, encoding="utf-8") as fh:
+            print_comparison(compare(json.load(fh), results))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+"""Cenários de carga. Cada um recebe um backend recém-iniciado (cache e banco vazios).
+
+Um cenário é uma função `(ctx) -> dict` (informações extras do cenário) registrada em
+SCENARIOS junto com as variáveis de ambiente que o backend precisa para ele.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List
+
+import requests
+
+# Conexões simultâneas que um navegador abre por host (HTTP/1.1)
+BROWSER_CONNECTIONS = 6
+# Nomes por POST /api/pokemon/batch (BATCH_MAX_NAMES do backend)
+BATCH_SIZE = 100
+
+
+class Recorder:
+    """Durações por rótulo (ex.: "GET /api/pokemon/<name>") e quantos deram erro"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.started = time.perf_counter()
+
+    def add(self, label: str, seconds: float, ok: bool) -> None:
+        with self._lock:
+            self.samples.setdefault(label, []).append(seconds)
+            if not ok:
+                self.errors[label] = self.errors.get(label, 0) + 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.samples.clear()
+            self.errors.clear()
+            self.started = time.perf_counter()
+
+
+class Context:
+    def __init__(self, base_url: str, stub, options):
+        self.base_url = base_url.rstrip("/")
+        self.stub = stub
+        self.options = options
+        self.recorder = Recorder()
+        self._local = threading.local()
+        self._sessions: List[requests.Session] = []
+
+    @property
+    def session(self) -> requests.Session:
+        """Uma Session (keep-alive) por thread cliente"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            self._sessions.append(session)
+        return session
+
+    def close(self) -> None:
+        # Conexões keep-alive abertas atrasariam o encerramento gracioso do gunicorn
+        for session in self._sessions:
+            session.close()
+
+    def request(self, method: str, label: str, path: str, expect=(200, 201, 304), **kwargs):
+        started = time.perf_counter()
+        try:
+            resp = self.session.request(method, self.base_url + path, timeout=60, **kwargs)
+            ok = resp.status_code in expect
+        except requests.RequestException:
+            resp, ok = None, False
+        self.recorder.add(f"{method} {label}", time.perf_counter() - started, ok)
+        return resp
+
+    def get(self, label: str, path: str, **kwargs):
+        return self.request("GET", label, path, **kwargs)
+
+    def parallel(self, fn: Callable, items: Iterable, concurrency: int) -> list:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            return list(pool.map(fn, items))
+
+    def names(self, count: int) -> List[str]:
+        return [name for _, name in self.stub.state.fixtures.pokemon[:count]]
+
+    def user(self, index: int) -> dict:
+        """Cria e autentica um usuário; devolve o cabeçalho Authorization"""
+        login = f"bench{index}"
+        requests.post(f"{self.base_url}/auth/register", timeout=30,
+                      json={"nome": login, "login": login, "email": f"{login}@bench", "senha": "bench"})
+        resp = requests.post(f"{self.base_url}/auth/login", json={"login": login, "senha": "bench"}, timeout=30)
+        resp.raise_for_status()
+        return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+def _first_page(ctx: Context, details: int) -> None:
+    """Como o `loadPokemonDetails` do frontend: lista, tipos e os cards num único lote"""
+    ctx.get("/api/pokemon", "/pokemon?limit=1000&offset=0")
+    ctx.get("/api/type", "/type")
+    names = ctx.names(details)
+    for start in range(0, len(names), BATCH_SIZE):
+        ctx.request("POST", "/api/pokemon/batch?view=card", "/pokemon/batch?view=card",
+                    json={"names": names[start:start + BATCH_SIZE]})
+
+
+def _first_page_per_card(ctx: Context, details: int) -> None:
+    """Lazy loading do frontend: um GET por card, com as conexões do navegador"""
+    ctx.get("/api/pokemon", "/pokemon?limit=1000&offset=0")
+    ctx.get("/api/type", "/type")
+    ctx.parallel(lambda n: ctx.get("/api/pokemon/<name>", f"/pokemon/{n}?view=card"),
+                 ctx.names(details), BROWSER_CONNECTIONS)
+
+
+def cold_cache(ctx: Context) -> dict:
+    """Primeiro acesso depois do deploy: tudo é miss e vai à PokéAPI"""
+    _first_page(ctx, ctx.options.details)
+    return {}
+
+
+def warm_cache(ctx: Context) -> dict:
+    """Mesmas requisições com o cache quente, sob concorrência"""
+    _first_page(ctx, ctx.options.details)
+    ctx.recorder.reset()
+    names = ctx.names(ctx.options.details)
+    work = [n for _ in range(ctx.options.iterations) for n in names]
+    ctx.parallel(lambda n: ctx.get("/api/pokemon/<name>", f"/pokemon/{n}?view=card"),
+                 work, ctx.options.concurrency)
+    ctx.parallel(lambda _: ctx.get("/api/pokemon", "/pokemon?limit=1000&offset=0"),
+                 range(ctx.options.iterations), ctx.options.concurrency)
+    return {}
+
+
+HERD_TTL_SECONDS = 2
+
+
+def thundering_herd(ctx: Context) -> dict:
+    """Rajada na mesma chave: ao vencer o TTL e numa chave nunca buscada (PokéAPI lenta)"""
+    expired, cold = ctx.names(2)
+    ctx.get("/api/pokemon/<name> (prime)", f"/pokemon/{expired}")
+    ctx.stub.state.control({"latency_ms": max(300, ctx.stub.state.latency_ms)})
+    time.sleep(HERD_TTL_SECONDS + 0.5)
+
+    def burst(label: str, name: str) -> None:
+        barrier = threading.Barrier(ctx.options.herd)
+
+        def one(_):
+            barrier.wait()
+            ctx.get(label, f"/pokemon/{name}")
+        ctx.parallel(one, range(ctx.options.herd), ctx.options.herd)
+
+    before = ctx.stub.state.calls.copy()
+    burst("/api/pokemon/<name> (TTL vencido)", expired)
+    time.sleep(0.5)  # a revalidação em segundo plano termina
+    middle = ctx.stub.state.calls.copy()
+    burst("/api/pokemon/<name> (chave fria)", cold)
+    after = ctx.stub.state.calls.copy()
+    return {
+        "upstream_calls_expired_key": sum((middle - before).values()),
+        "upstream_calls_cold_key": sum((after - middle).values()),
+        "herd_size": ctx.options.herd,
+    }
+
+
+def _visits(ctx: Context, load: Callable[[Context, int], None], prefix: str) -> dict:
+    for visit in range(ctx.options.iterations):
+        started = time.perf_counter()
+        load(ctx, 50)
+        label = f"{prefix} primeira visita" if visit == 0 else f"{prefix} visitas seguintes"
+        ctx.recorder.add(label, time.perf_counter() - started, True)
+    return {}
+
+
+def page_load(ctx: Context) -> dict:
+    """Página inicial do frontend (lista + 50 cards num POST /pokemon/batch), por visitante"""
+    return _visits(ctx, _first_page, "PAGE")
+
+
+def page_load_per_card(ctx: Context) -> dict:
+    """Página inicial com um GET por card (lazy loading, 6 conexões), por visitante"""
+    return _visits(ctx, _first_page_per_card, "PAGE (por card)")
+
+
+def write_storm(ctx: Context) -> dict:
+    """Usuários simultâneos gravando favoritos e equipe no SQLite"""
+    headers = [ctx.user(i) for i in range(ctx.options.users)]
+    names = ctx.names(60)
+
+    def session(auth: dict) -> None:
+        for name in names[:30]:
+            ctx.request("POST", "/api/me/favorites", "/me/favorites", headers=auth,
+                        json={"Codigo": name, "Nome": name})
+        ctx.request("POST", "/api/me/favorites/bulk", "/me/favorites/bulk", headers=auth,
+                    json=[{"Codigo": n, "Nome": n} for n in names[30:60]])
+        for offset in range(0, 30, 6):
+            ctx.request("PUT", "/api/me/team", "/me/team", headers=auth,
+                        json=[{"Codigo": n, "Nome": n} for n in names[offset:offset + 6]])
+        ctx.request("GET", "/api/me/collection", "/me/collection", headers=auth)
+        ctx.request("DELETE", "/api/me/favorites/bulk", "/me/favorites/bulk", headers=auth,
+                    json={"codigos": names})
+
+    ctx.parallel(session, headers, len(headers))
+    return {"users": len(headers)}
+
+
+# nome -> (função, variáveis de ambiente do backend para o cenário)
+SCENARIOS: Dict[str, tuple] = {
+    "cold_cache": (cold_cache, {}),
+    "warm_cache": (warm_cache, {}),
+    "thundering_herd": (thundering_herd, {"CACHE_TTL_POKEMON_DETAIL": str(HERD_TTL_SECONDS)}),
+    "page_load": (page_load, {}),
+    "page_load_per_card": (page_load_per_card, {}),
+    "write_storm": (write_storm, {}),
+}
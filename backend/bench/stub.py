@@ -0,0 +1,209 @@
+"""Stub local da PokéAPI (/api/v2/pokemon, /pokemon/<nome|id>, /type, /type/<nome>).
+
+Latência, erros 500 e 429 (com Retry-After) são injetados por configuração e podem ser
+trocados durante a execução:
+
+    POST /__control  {"latency_ms": 300, "error_rate": 0.05}   # altera a injeção
+    GET  /__stats                                             # chamadas por rota e status
+    POST /__reset                                             # zera os contadores
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from . import fixtures as fixtures_module
+from .fixtures import TYPES, Fixtures
+
+CONTROL_FIELDS = ("latency_ms", "jitter_ms", "error_rate", "rate_429", "retry_after")
+
+
+class StubState:
+    def __init__(self, fixtures: Fixtures, latency_ms: float = 50, jitter_ms: float = 10,
+                 error_rate: float = 0.0, rate_429: float = 0.0, retry_after: float = 1, seed: int = 7):
+        self.fixtures = fixtures
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.calls: Counter = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._bodies = {}
+
+    def control(self, values: dict) -> dict:
+        for field in CONTROL_FIELDS:
+            if field in values:
+                setattr(self, field, float(values[field]))
+        return {field: getattr(self, field) for field in CONTROL_FIELDS}
+
+    def record(self, route: str, status: int) -> None:
+        with self._lock:
+            self.calls[f"{route} {status}"] += 1
+
+    def roll(self) -> Tuple[float, Optional[int]]:
+        """(atraso em segundos, status injetado ou None)"""
+        with self._lock:
+            delay = max(0.0, self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            draw = self._random.random()
+        if draw < self.rate_429:
+            return delay, 429
+        if draw < self.rate_429 + self.error_rate:
+            return delay, 500
+        return delay, None
+
+    def body(self, key: str, build) -> Optional[bytes]:
+        """Corpo serializado uma vez por recurso (o stub não deve ser o gargalo)"""
+        cached = self._bodies.get(key)
+        if cached is None:
+            data = build()
+            if data is None:
+                return None
+            cached = self._bodies[key] = json.dumps(data, separators=(",", ":")).encode()
+        return cached
+
+
+def _page(base: str, path: str, items, query) -> dict:
+    limit = int(query.get("limit", ["20"])[0])
+    offset = int(query.get("offset", ["0"])[0])
+    results = items[offset:offset + limit]
+    return {
+        "count": len(items),
+        "next": f"{base}{path}?offset={offset + limit}&limit={limit}" if offset + limit < len(items) else None,
+        "previous": f"{base}{path}?offset={max(0, offset - limit)}&limit={limit}" if offset > 0 else None,
+        "results": results,
+    }
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, como a PokéAPI real
+    state: StubState
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, headers: Optional[dict] = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json(self, status: int, data) -> None:
+        self._send(status, json.dumps(data).encode())
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        if self.path == "/__control":
+            return self._json(200, self.state.control(payload))
+        if self.path == "/__reset":
+            self.state.calls.clear()
+            return self._json(200, {})
+        return self._json(404, {"detail": "Not Found"})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/__stats":
+            return self._json(200, dict(self.state.calls))
+        parts = [p for p in url.path.split("/") if p][2:]  # sem "api/v2"
+        if not parts:
+            return self._json(404, {"detail": "Not Found"})
+        route = "/" + parts[0] + ("/:name" if len(parts) > 1 else "")
+
+        delay, injected = self.state.roll()
+        time.sleep(delay)
+        if injected is not None:
+            self.state.record(route, injected)
+            headers = {"Retry-After": str(int(self.state.retry_after))} if injected == 429 else None
+            return self._send(injected, b'{"detail":"injected"}', headers)
+
+        body = self._resource(parts, parse_qs(url.query), f"http://{self.headers['Host']}/api/v2")
+        status = 200 if body is not None else 404
+        self.state.record(route, status)
+        self._send(status, body if body is not None else b"Not Found")
+
+    def _resource(self, parts, query, base: str) -> Optional[bytes]:
+        fx = self.state.fixtures
+        kind = parts[0]
+        if kind in ("pokemon", "pokemon-species") and len(parts) == 1:
+            items = [{"name": name, "url": f"{base}/{kind}/{pid}/"} for pid, name in fx.pokemon]
+            return json.dumps(_page(base, f"/{kind}", items, query), separators=(",", ":")).encode()
+        if kind == "pokemon" and len(parts) == 2:
+            return self.state.body(f"pokemon/{parts[1]}", lambda: fx.detail(parts[1]))
+        if kind == "type" and len(parts) == 1:
+            items = [{"name": t, "url": f"{base}/type/{i + 1}/"} for i, t in enumerate(TYPES)]
+            return json.dumps(_page(base, "/type", items, query), separators=(",", ":")).encode()
+        if kind == "type" and len(parts) == 2:
+            name = TYPES[int(parts[1]) - 1] if parts[1].isdigit() and 0 < int(parts[1]) <= len(TYPES) else parts[1]
+            members = fx.type_members().get(name)
+            if members is None:
+                return None
+            return self.state.body(f"type/{name}", lambda: {
+                "id": TYPES.index(name) + 1, "name": name,
+                "damage_relations": {},
+                "pokemon": [{"slot": slot, "pokemon": {"name": pname, "url": f"{base}/pokemon/{pid}/"}}
+                            for pid, pname, slot in members],
+            })
+        return None
+
+
+class StubServer:
+    """Stub em uma thread do processo atual; `url` é a base a usar em POKEAPI_BASE_URL"""
+
+    def __init__(self, state: StubState, host: str = "127.0.0.1", port: int = 0):
+        handler = type("BoundHandler", (Handler,), {"state": state})
+        self.state = state
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://{host}:{self.httpd.server_address[1]}/api/v2"
+
+    def start(self) -> "StubServer":
+        threading.Thread(target=self.httpd.serve_forever, name="pokeapi-stub", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group("stub da PokéAPI")
+    group.add_argument("--fixtures", help="arquivo gravado por `bench.fixtures record` (padrão: gerado)")
+    group.add_argument("--count", type=int, default=1025, help="Pokémon gerados (sem --fixtures)")
+    group.add_argument("--latency", type=float, default=50, help="latência média em ms")
+    group.add_argument("--jitter", type=float, default=10, help="variação da latência em ms (±)")
+    group.add_argument("--error-rate", type=float, default=0.0, help="fração de respostas 500")
+    group.add_argument("--rate-429", type=float, default=0.0, help="fração de respostas 429")
+    group.add_argument("--retry-after", type=float, default=1, help="Retry-After das respostas 429 (s)")
+
+
+def state_from_args(args) -> StubState:
+    return StubState(fixtures_module.load(args.fixtures, args.count), args.latency, args.jitter,
+                     args.error_rate, args.rate_429, args.retry_after)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    server = StubServer(state_from_args(args), args.host, args.port)
+    print(f"Stub da PokéAPI em {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,16 +3,96 @@ import os
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(BASE_DIR, "app.db")
+CACHE_DB_PATH = os.path.join(BASE_DIR, "cache.db")
+SPRITE_CACHE_DIR = os.path.join(BASE_DIR, "sprites")
 
 
 class Config:
     SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-key")
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", f"sqlite:///{DB_PATH}")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Aplica migrações pendentes ao subir a app. Só para o desenvolvimento (um processo): com
+    # vários workers cada um migraria ao mesmo tempo; fora dele, `flask db-upgrade` antes do fork
+    DB_AUTO_MIGRATE = os.getenv("DB_AUTO_MIGRATE", "0") == "1"
+    # Perfil SQLite (database.py): PRAGMAs aplicados em cada conexão
+    SQLITE_PRAGMAS = {
+        "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),  # espera o lock em vez de falhar
+        "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),  # leitores não bloqueiam escritores
+        "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),  # fsync só no checkpoint (seguro com WAL)
+        "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+        "cache_size": -int(os.getenv("SQLITE_CACHE_SIZE_KB", "20000")),  # negativo = KiB
+        "temp_store": "MEMORY",
+    }
+    # Perfil de banco servidor (PostgreSQL/MySQL via DATABASE_URL): pool por worker
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") == "1"
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "dev-jwt-secret")
+    # Cache (por worker) dos usuários conferidos a cada requisição autenticada
+    AUTH_USER_CACHE_TTL = float(os.getenv("AUTH_USER_CACHE_TTL", "60"))
+    AUTH_USER_CACHE_MAX = int(os.getenv("AUTH_USER_CACHE_MAX", "10000"))
+    # Cliente da PokéAPI (upstream.py): pool keep-alive, retry/backoff, limite de taxa e circuit breaker
+    POKEAPI_BASE_URL = os.getenv("POKEAPI_BASE_URL", "https://pokeapi.co/api/v2")
+    POKEAPI_POOL_SIZE = int(os.getenv("POKEAPI_POOL_SIZE", "16"))
+    POKEAPI_MAX_RETRIES = int(os.getenv("POKEAPI_MAX_RETRIES", "3"))
+    POKEAPI_BACKOFF_BASE = float(os.getenv("POKEAPI_BACKOFF_BASE", "0.25"))
+    POKEAPI_BACKOFF_MAX = float(os.getenv("POKEAPI_BACKOFF_MAX", "8"))
+    POKEAPI_RATE_LIMIT = float(os.getenv("POKEAPI_RATE_LIMIT", "20"))  # requisições/s por worker
+    POKEAPI_RATE_BURST = int(os.getenv("POKEAPI_RATE_BURST", "40"))
+    POKEAPI_BREAKER_THRESHOLD = int(os.getenv("POKEAPI_BREAKER_THRESHOLD", "5"))
+    POKEAPI_BREAKER_COOLDOWN = float(os.getenv("POKEAPI_BREAKER_COOLDOWN", "30"))
+    # Threads por worker para buscas paralelas na PokéAPI (/api/pokemon/batch)
+    POKEAPI_MAX_WORKERS = int(os.getenv("POKEAPI_MAX_WORKERS", "8"))
+    # Cache em memória da PokéAPI (por worker): limites e TTL por classe de chave
+    CACHE_MAX_ITEMS = int(os.getenv("CACHE_MAX_ITEMS", "5000"))
+    CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    CACHE_TTL_POKEMON_LIST = int(os.getenv("CACHE_TTL_POKEMON_LIST", "3600"))
+    CACHE_TTL_POKEMON_DETAIL = int(os.getenv("CACHE_TTL_POKEMON_DETAIL", "3600"))
+    CACHE_TTL_TYPE_LIST = int(os.getenv("CACHE_TTL_TYPE_LIST", "3600"))
+    CACHE_TTL_TYPE_DETAIL = int(os.getenv("CACHE_TTL_TYPE_DETAIL", "3600"))
+    CACHE_TTL_SPECIES = int(os.getenv("CACHE_TTL_SPECIES", "86400"))
+    CACHE_TTL_EVOLUTION_CHAIN = int(os.getenv("CACHE_TTL_EVOLUTION_CHAIN", "86400"))
+    CACHE_TTL_NEGATIVE = int(os.getenv("CACHE_TTL_NEGATIVE", "300"))
+    # Após o TTL (soft), o valor ainda é servido por esta janela enquanto é revalidado
+    CACHE_STALE_SECONDS = int(os.getenv("CACHE_STALE_SECONDS", str(24 * 3600)))
+    # Agendador que renova as chaves mais acessadas antes de vencerem (0 desativa)
+    CACHE_REFRESH_INTERVAL = float(os.getenv("CACHE_REFRESH_INTERVAL", "60"))
+    CACHE_REFRESH_LEAD = float(os.getenv("CACHE_REFRESH_LEAD", "300"))
+    CACHE_REFRESH_MAX_KEYS = int(os.getenv("CACHE_REFRESH_MAX_KEYS", "50"))
+    CACHE_REFRESH_MIN_HITS = int(os.getenv("CACHE_REFRESH_MIN_HITS", "3"))
+    CACHE_REFRESH_WORKERS = int(os.getenv("CACHE_REFRESH_WORKERS", "2"))
+    # Segundo nível em disco (SQLite) compartilhado entre workers; vazio desativa
+    CACHE_DB_PATH = os.getenv("CACHE_DB_PATH", CACHE_DB_PATH)
+    CACHE_DB_MAX_BYTES = int(os.getenv("CACHE_DB_MAX_BYTES", str(256 * 1024 * 1024)))
+    # Proxy de sprites (/api/sprites/<id>): cache em disco endereçado por conteúdo
+    SPRITE_BASE_URL = os.getenv("SPRITE_BASE_URL", "https://raw.githubusercontent.com/PokeAPI/sprites/master")
+    SPRITE_CACHE_DIR = os.getenv("SPRITE_CACHE_DIR", SPRITE_CACHE_DIR)
+    SPRITE_CACHE_MAX_BYTES = int(os.getenv("SPRITE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+    # Lado maior das miniaturas (size=thumb), geradas com Pillow se instalado
+    SPRITE_THUMB_SIZE = int(os.getenv("SPRITE_THUMB_SIZE", "128"))
+    # Prefixo da location interna do nginx (ex.: /_sprites/); vazio = o Flask envia o arquivo
+    SPRITE_ACCEL_REDIRECT = os.getenv("SPRITE_ACCEL_REDIRECT", "")
+    # Métricas em /api/metrics (metrics.py) e fração dos logs de depuração do cache que são emitidos
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+    LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0.01"))
+    # Aquecimento no boot (warmup.py): "sync" (com gunicorn --preload), "background"/"1" ou vazio
+    CACHE_WARM = os.getenv("CACHE_WARM", "")
+    CACHE_WARM_LISTS = os.getenv("CACHE_WARM_LISTS", "1000:0,302:1000")  # limit:offset pedidos pelo frontend
+    CACHE_WARM_DETAILS = int(os.getenv("CACHE_WARM_DETAILS", "50"))  # primeiros N detalhes da lista
+    CACHE_WARM_TYPES = os.getenv("CACHE_WARM_TYPES", "1") == "1"  # lista e detalhe de todos os tipos
+    CACHE_WARM_CONCURRENCY = int(os.getenv("CACHE_WARM_CONCURRENCY", "4"))
+    # Snapshot do cache em memória gravado ao sair e recarregado no boot; vazio desativa
+    CACHE_SNAPSHOT_PATH = os.getenv("CACHE_SNAPSHOT_PATH", "")
+    # Tempo máximo que uma requisição espera pela busca em andamento de outra (single-flight)
+    UPSTREAM_WAIT_TIMEOUT = float(os.getenv("UPSTREAM_WAIT_TIMEOUT", "30"))
 
 
 class TestConfig(Config):
     SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+    CACHE_DB_PATH = None
+    CACHE_WARM = ""
+    CACHE_SNAPSHOT_PATH = ""
 
 
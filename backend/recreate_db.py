@@ -1,5 +1,10 @@
-"""Script para recriar o banco de dados com a nova coluna IsAdmin"""
+"""Script para recriar o banco de dados do zero (APAGA todos os dados).
+
+Para atualizar o esquema de um banco existente sem perder dados, use:
+    python -m flask --app app db-upgrade
+"""
 from app import create_app, db
+from app.migrations import upgrade
 
 app = create_app()
 
@@ -7,6 +12,6 @@ with app.app_context():
     print("Recriando banco de dados...")
     db.drop_all()
     print("Tabelas antigas removidas.")
-    db.create_all()
+    upgrade()
     print("Tabelas novas criadas com sucesso!")
     print("\nIMPORTANTE: O primeiro usuário que se registrar será o administrador.")
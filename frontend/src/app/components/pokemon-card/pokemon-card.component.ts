@@ -571,12 +571,14 @@ export class PokemonCardComponent implements AfterViewInit, OnDestroy {
 
   get imageUrl(): string {
     if (this.pokemon.ImagemUrl) {
-      return this.pokemon.ImagemUrl;
+      // OTIMIZAÇÃO: Registros antigos apontam para o GitHub; usa o proxy de sprites (mesma origem, cache imutável)
+      const legacy = /\/sprites\/pokemon\/(\d+)\.png$/.exec(this.pokemon.ImagemUrl);
+      return legacy ? `/api/sprites/${legacy[1]}` : this.pokemon.ImagemUrl;
     }
     if (this.pokemon.url) {
       const match = /\/pokemon\/(\d+)\/?$/.exec(this.pokemon.url);
       const id = match ? match[1] : '1';
-      return `https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/${id}.png`;
+      return `/api/sprites/${id}`;
     }
     return '';
   }
@@ -634,6 +634,9 @@ export class PokemonListComponent implements OnInit {
 
   userFavorites = signal<any[]>([]);
   userTeam = signal<any[]>([]);
+  // Conjuntos de códigos (minúsculos) para isFavorite/isInTeam em O(1) por card
+  favoriteCodes = signal<Set<string>>(new Set());
+  teamCodes = signal<Set<string>>(new Set());
   toast = signal<{message: string, type: 'success' | 'error'} | null>(null);
 
   // Cache de detalhes dos Pokémon
@@ -694,23 +697,24 @@ export class PokemonListComponent implements OnInit {
   loadUserData() {
     if (!this.authService.token()) return;
 
-    this.userPokemonService.getFavorites().subscribe({
-      next: (favs) => this.userFavorites.set(favs),
-      error: () => {}
-    });
-
-    this.userPokemonService.getTeam().subscribe({
-      next: (team) => this.userTeam.set(team),
+    // Uma única requisição; sem mudanças o backend responde 304 (ETag = versão da coleção)
+    this.userPokemonService.getCollection().subscribe({
+      next: (collection) => {
+        this.userFavorites.set(collection.favorites);
+        this.userTeam.set(collection.team);
+        this.favoriteCodes.set(new Set(collection.favoriteCodes));
+        this.teamCodes.set(new Set(collection.teamCodes));
+      },
       error: () => {}
     });
   }
 
   isFavorite(p: BasicPokemon): boolean {
-    return this.userFavorites().some(f => f.Codigo.toLowerCase() === p.name.toLowerCase());
+    return this.favoriteCodes().has(p.name.toLowerCase());
   }
 
   isInTeam(p: BasicPokemon): boolean {
-    return this.userTeam().some(t => t.Codigo.toLowerCase() === p.name.toLowerCase());
+    return this.teamCodes().has(p.name.toLowerCase());
   }
 
   showToast(message: string, type: 'success' | 'error') {
@@ -767,30 +771,22 @@ export class PokemonListComponent implements OnInit {
 
     console.log(`📥 Carregando ${toLoad.length} novos detalhes (${pokemons.length - toLoad.length} já em cache)`);
 
-    // OTIMIZAÇÃO: Reduz batch size de 25 para 15 para evitar rate limit
-    const batchSize = 15;
-    const batches: BasicPokemon[][] = [];
-
-    for (let i = 0; i < toLoad.length; i += batchSize) {
-      batches.push(toLoad.slice(i, i + batchSize));
-    }
-
-    // Carrega os batches sequencialmente
-    batches.forEach((batch, index) => {
-      setTimeout(() => {
-        const requests = batch.map(p => this.pokemonService.detail(p.name));
-        forkJoin(requests).subscribe({
-          next: (details) => {
-            details.forEach((detail: any) => {
-              this.pokemonDetailsCache.set(detail.name, detail);
-            });
-            console.log(`✓ Batch ${index + 1}/${batches.length} carregado`);
-          },
-          error: (err) => {
-            console.error('❌ Erro ao carregar batch:', err);
+    // OTIMIZAÇÃO: Uma única requisição ao endpoint de lote; o backend busca os misses em paralelo
+    this.pokemonService.batch(toLoad.map(p => p.name)).subscribe({
+      next: (res) => {
+        res.results.forEach(item => {
+          if (item.status === 200 && item.data) {
+            this.pokemonDetailsCache.set(item.data.name, item.data);
           }
         });
-      }, index * 250); // OTIMIZAÇÃO: Aumenta delay de 200ms para 250ms para reduzir rate limit
+        if (res.errors > 0) {
+          console.warn(`⚠️ ${res.errors} detalhes falharam no lote`);
+        }
+        console.log(`✓ Lote com ${res.count} detalhes carregado`);
+      },
+      error: (err) => {
+        console.error('❌ Erro ao carregar lote:', err);
+      }
     });
   }
 
@@ -891,10 +887,11 @@ export class PokemonListComponent implements OnInit {
   }
 
   getImageUrl(p: BasicPokemon) {
-    // URL padrão de sprites oficial: precisa do id; extrair do "url" da PokéAPI
+    // OTIMIZAÇÃO: Sprite pelo proxy do backend (mesma origem, cache em disco e headers imutáveis);
+    // precisa do id: extrair do "url" da PokéAPI
     const match = /\/pokemon\/(\d+)\/?$/.exec(p.url);
     const id = match ? match[1] : '1';
-    return `https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/${id}.png`;
+    return `/api/sprites/${id}`;
   }
 
   getPokemonId(p: BasicPokemon): string {
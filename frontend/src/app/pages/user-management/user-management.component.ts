@@ -33,7 +33,18 @@ interface User {
         {{ error }}
       </p>
 
-      <div *ngIf="loading" style="text-align: center; padding: 40px; color: #666;">
+      <div style="display: flex; gap: 12px; align-items: center; margin-bottom: 20px;">
+        <input
+          type="search"
+          placeholder="Buscar por nome ou login..."
+          [value]="search"
+          (input)="onSearch($any($event.target).value)"
+          style="flex: 1; padding: 10px 14px; border: 1px solid #ddd; border-radius: 4px; font-size: 14px;"
+        />
+        <span *ngIf="totalEstimate !== null" style="color: #666; font-size: 14px;">~{{ totalEstimate }} usuários</span>
+      </div>
+
+      <div *ngIf="loading && users.length === 0" style="text-align: center; padding: 40px; color: #666;">
         Carregando usuários...
       </div>
 
@@ -41,7 +52,7 @@ interface User {
         Nenhum usuário cadastrado.
       </div>
 
-      <div *ngIf="!loading && users.length > 0" style="overflow-x: auto;">
+      <div *ngIf="users.length > 0" style="overflow-x: auto;">
         <table style="width: 100%; border-collapse: collapse; background: white; box-shadow: 0 2px 8px rgba(0,0,0,0.1); border-radius: 8px; overflow: hidden;">
           <thead>
             <tr style="background: linear-gradient(135deg, #ff6b35 0%, #f7931e 100%); color: white;">
@@ -79,6 +90,15 @@ interface User {
             </tr>
           </tbody>
         </table>
+        <div *ngIf="nextCursor" style="text-align: center; margin-top: 20px;">
+          <button
+            (click)="loadMore()"
+            [disabled]="loading"
+            style="padding: 10px 20px; background: #667eea; color: white; border: none; border-radius: 4px; cursor: pointer; font-weight: 600;"
+          >
+            {{ loading ? 'Carregando...' : 'Carregar mais' }}
+          </button>
+        </div>
       </div>
 
       <!-- Modal de confirmação -->
@@ -118,6 +138,10 @@ export class UserManagementComponent implements OnInit {
   private router = inject(Router);
 
   users: User[] = [];
+  nextCursor: string | null = null;
+  totalEstimate: number | null = null;
+  search = '';
+  private searchTimer?: ReturnType<typeof setTimeout>;
   loading = false;
   msg = '';
   error = '';
@@ -128,13 +152,30 @@ export class UserManagementComponent implements OnInit {
   }
 
   loadUsers() {
+    this.users = [];
+    this.nextCursor = null;
+    this.fetchPage();
+  }
+
+  loadMore() {
+    if (this.nextCursor && !this.loading) this.fetchPage();
+  }
+
+  onSearch(value: string) {
+    this.search = value.trim();
+    clearTimeout(this.searchTimer);
+    this.searchTimer = setTimeout(() => this.loadUsers(), 300);
+  }
+
+  private fetchPage() {
     this.loading = true;
-    this.msg = '';
     this.error = '';
 
-    this.auth.listUsers().subscribe({
-      next: (users) => {
-        this.users = users;
+    this.auth.listUsers({ q: this.search, cursor: this.nextCursor }).subscribe({
+      next: (page) => {
+        this.users = [...this.users, ...page.results];
+        this.nextCursor = page.nextCursor;
+        this.totalEstimate = page.totalEstimate;
         this.loading = false;
       },
       error: (err) => {
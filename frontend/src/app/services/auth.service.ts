@@ -1,5 +1,5 @@
 import { inject, Injectable, signal } from '@angular/core';
-import { HttpClient } from '@angular/common/http';
+import { HttpClient, HttpParams } from '@angular/common/http';
 import { tap } from 'rxjs/operators';
 
 export type LoginResponse = { access_token: string; user: { id: number; nome: string; email: string; login: string; isAdmin: boolean } };
@@ -48,12 +48,17 @@ export class AuthService {
     this.currentUser.set(null);
   }
 
-  listUsers() {
-    return this.http.get<Array<{
-      id: number;
-      nome: string;
-      dtInclusao: string | null;
-    }>>('/api/auth/users');
+  // Paginação por cursor: passe o nextCursor da página anterior
+  listUsers(params: { q?: string; cursor?: string | null; limit?: number } = {}) {
+    let httpParams = new HttpParams();
+    if (params.q) httpParams = httpParams.set('q', params.q);
+    if (params.cursor) httpParams = httpParams.set('cursor', params.cursor);
+    if (params.limit) httpParams = httpParams.set('limit', params.limit);
+    return this.http.get<{
+      results: Array<{ id: number; nome: string; dtInclusao: string | null }>;
+      nextCursor: string | null;
+      totalEstimate: number;
+    }>('/api/auth/users', { params: httpParams });
   }
 
   deleteUser(userId: number) {
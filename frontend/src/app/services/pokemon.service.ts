@@ -1,8 +1,12 @@
 export type PagedResult<T> = { count: number; next: string | null; previous: string | null; results: T[] };
 export type BasicPokemon = { name: string; url: string };
+export type BatchItem = { name: string; status: number; data?: any; error?: any };
+export type BatchResult = { count: number; errors: number; results: BatchItem[] };
+export type SearchParams = { q?: string; type?: string; generation?: string; page?: number; size?: number };
+export type SearchResult = { count: number; page: number; size: number; pages: number; results: (BasicPokemon & { id: number })[] };
 
 import { inject, Injectable } from '@angular/core';
-import { HttpClient } from '@angular/common/http';
+import { HttpClient, HttpParams } from '@angular/common/http';
 import { Observable, forkJoin, map } from 'rxjs';
 
 @Injectable({ providedIn: 'root' })
@@ -27,7 +31,24 @@ export class PokemonService {
     return this.http.get<PagedResult<BasicPokemon>>(`/api/pokemon?limit=${limit}&offset=${offset}`);
   }
 
+  // view=card traz apenas id, nome, tipos, sprites e stats (payload bem menor)
   detail(name: string) {
-    return this.http.get(`/api/pokemon/${name}`);
+    return this.http.get(`/api/pokemon/${name}?view=card`);
+  }
+
+  // Busca/filtro/paginação feitos no backend: devolve só a página pedida e o total
+  search(params: SearchParams) {
+    let httpParams = new HttpParams();
+    Object.entries(params).forEach(([key, value]) => {
+      if (value !== undefined && value !== null && value !== '') {
+        httpParams = httpParams.set(key, String(value));
+      }
+    });
+    return this.http.get<SearchResult>(`/api/pokemon/search`, { params: httpParams });
+  }
+
+  // Detalhes de vários Pokémon em uma única requisição (erros vêm por item)
+  batch(names: string[]) {
+    return this.http.post<BatchResult>(`/api/pokemon/batch?view=card`, { names });
   }
 }
@@ -12,11 +12,24 @@ export type UserPokemonPayload = {
   GrupoBatalha?: boolean;
 };
 
+export type UserCollection = {
+  version: string;
+  favorites: any[];
+  team: any[];
+  favoriteCodes: string[];
+  teamCodes: string[];
+};
+
 @Injectable({ providedIn: 'root' })
 export class UserPokemonService {
   private http = inject(HttpClient);
   private eventService = inject(EventService);
 
+  // Favoritos + equipe em uma chamada (304 quando a versão não mudou)
+  getCollection() {
+    return this.http.get<UserCollection>('/api/me/collection');
+  }
+
   getFavorites() {
     return this.http.get<any[]>('/api/me/favorites');
   }
@@ -33,6 +46,19 @@ export class UserPokemonService {
     );
   }
 
+  // Vários favoritos em uma única requisição/transação
+  addFavorites(items: UserPokemonPayload[]) {
+    return this.http.post<{ adicionados: number; favoritos: any[] }>('/api/me/favorites/bulk', items).pipe(
+      tap(() => this.eventService.emitPokemonUpdated())
+    );
+  }
+
+  removeFavorites(codigos: string[]) {
+    return this.http.delete<{ removidos: number }>('/api/me/favorites/bulk', { body: { codigos } }).pipe(
+      tap(() => this.eventService.emitPokemonUpdated())
+    );
+  }
+
   getTeam() {
     return this.http.get<any[]>('/api/me/team');
   }
@@ -43,6 +69,13 @@ export class UserPokemonService {
     );
   }
 
+  // Substitui a equipe inteira (até 6); o backend grava só a diferença
+  setTeam(items: UserPokemonPayload[]) {
+    return this.http.put<any[]>('/api/me/team', items).pipe(
+      tap(() => this.eventService.emitPokemonUpdated())
+    );
+  }
+
   removeFromTeam(idPokemonUsuario: number) {
     return this.http.delete(`/api/me/team/${idPokemonUsuario}`).pipe(
       tap(() => this.eventService.emitPokemonUpdated())
@@ -17,8 +17,28 @@ sleep 3
 echo "🐍 Iniciando Flask Backend..."
 cd /app
 
-# Cria database se não existir
-python -c "from app import create_app, db; app = create_app(); app.app_context().push(); db.create_all(); print('✅ Database criado')"
+# Aplica as migrações uma única vez, antes do fork; os workers sobem sem DDL
+export DB_AUTO_MIGRATE=0
+CACHE_WARM="" python -m flask --app app db-upgrade
+echo "✅ Database atualizado"
 
 # Inicia Gunicorn
-exec gunicorn --bind 127.0.0.1:5000 --workers 2 --threads 4 --timeout 120 --access-logfile - --error-logfile - "app:create_app()"
+# CACHE_WARM=1: aquece o cache (listas, tipos, primeiros detalhes) antes de atender; no modo
+# threads isso roda uma vez no master com --preload e os workers herdam o cache (copy-on-write)
+PRELOAD=""
+# SERVER_MODE=async: worker gevent, em que cada requisição é um greenlet e as esperas
+# pela PokéAPI não prendem threads (centenas de requisições em voo por worker)
+if [ "${SERVER_MODE:-threads}" = "async" ]; then
+    echo "⚡ Modo assíncrono (gevent)"
+    export POKEAPI_POOL_SIZE="${POKEAPI_POOL_SIZE:-200}"
+    export POKEAPI_MAX_WORKERS="${POKEAPI_MAX_WORKERS:-64}"
+    # gevent aplica o monkey-patching só no worker: sem --preload, cada worker aquece em segundo plano
+    [ "${CACHE_WARM:-0}" != "0" ] && export CACHE_WARM=background
+    exec gunicorn --bind 127.0.0.1:5000 --workers 2 --worker-class gevent --worker-connections "${WORKER_CONNECTIONS:-1000}" --timeout 120 --access-logfile - --error-logfile - "app:create_app()"
+fi
+if [ "${CACHE_WARM:-0}" != "0" ]; then
+    echo "🔥 Aquecendo o cache antes do fork"
+    export CACHE_WARM=sync
+    PRELOAD="--preload"
+fi
+exec gunicorn --bind 127.0.0.1:5000 --workers 2 --threads 4 $PRELOAD --timeout 120 --access-logfile - --error-logfile - "app:create_app()"